@@ -1,4 +1,7 @@
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from optparse import Values
 
@@ -102,5 +105,69 @@ class TestDHCPConfigManager(unittest.TestCase):
             dhcp_manager.download_and_apply_configuration()
 
 
+class TestDHCPConfigManagerApplyConfiguration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp_dir, "entries.conf")
+        params = default_params.copy()
+        params.update({"restart": True, "dhcp_config_entries": self.config_path})
+        self.cache = Cache(self.tmp_dir)
+        self.manager = DHCPConfigManager(cache=self.cache, logger=logger, **params)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _mock_response(self, content, headers=None):
+        response = Mock()
+        response.read.return_value = content
+        response.headers = headers or {}
+        return response
+
+    @patch.object(DHCPConfigManager, "_send_sync_confirmation")
+    @patch.object(DHCPConfigManager, "_restart_dhcp_server")
+    @patch("dhcp_agent.urlopen")
+    def test_changed_config_is_written_and_server_restarted(
+        self, mocked_urlopen, mocked_restart, mocked_sync
+    ):
+        mocked_urlopen.return_value = self._mock_response(b"config")
+        self.manager.download_and_apply_configuration()
+        with open(self.config_path, "rb") as f:
+            self.assertEqual(f.read(), b"config")
+        self.assertTrue(mocked_restart.called)
+
+    @patch.object(DHCPConfigManager, "_send_sync_confirmation")
+    @patch.object(DHCPConfigManager, "_restart_dhcp_server")
+    @patch("dhcp_agent.urlopen")
+    def test_server_is_not_restarted_when_config_not_changed(
+        self, mocked_urlopen, mocked_restart, mocked_sync
+    ):
+        with open(self.config_path, "wb") as f:
+            f.write(b"config")
+        mocked_urlopen.return_value = self._mock_response(b"config")
+        self.manager.download_and_apply_configuration()
+        self.assertFalse(mocked_restart.called)
+        self.assertTrue(mocked_sync.called)
+
+    @patch("dhcp_agent.urlopen")
+    def test_etag_is_sent_in_next_request(self, mocked_urlopen):
+        mocked_urlopen.return_value = self._mock_response(
+            b"config", {"ETag": '"abc"', "Last-Modified": "date"}
+        )
+        self.manager._get_configuration("entries")
+        self.manager._get_configuration("entries")
+        request = mocked_urlopen.call_args[0][0]
+        self.assertEqual(request.get_header("If-none-match"), b'"abc"')
+        self.assertEqual(request.get_header("If-modified-since"), b"date")
+
+    @patch("dhcp_agent.urlopen")
+    def test_all_sections_are_fetched(self, mocked_urlopen):
+        mocked_urlopen.return_value = self._mock_response(b"config")
+        self.manager.sections = ["entries", "networks"]
+        configurations = self.manager._get_configurations()
+        self.assertEqual(configurations, {"entries": b"config", "networks": b"config"})
+        self.assertEqual(mocked_urlopen.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
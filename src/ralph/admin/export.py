@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Background export of admin changelists.
+
+Export of big changelists (ex. all data center assets) is run as a job in
+the internal service (RQ worker) instead of the web worker. Job selects
+objects using changelist filters and search of the export request. Objects
+are fetched in chunks (ordered by primary key) and written incrementally to
+the file, which could be downloaded from the job page after it's finished.
+File is removed together with the job (see `delete_expired_exports`
+command).
+"""
+
+import csv
+import logging
+import os
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.http import HttpRequest, QueryDict
+from openpyxl import Workbook
+
+from ralph.admin.sites import ralph_site
+from ralph.lib.external_services.models import Job
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_EXPORT_SERVICE_NAME = "ADMIN_EXPORT"
+
+
+class CSVExportWriter(object):
+    binary = False
+
+    def __init__(self, file):
+        self._writer = csv.writer(file)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class XLSXExportWriter(object):
+    binary = True
+
+    def __init__(self, file):
+        self._file = file
+        # in write-only mode rows are not kept in memory
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._sheet.append(row)
+
+    def close(self):
+        self._workbook.save(self._file)
+
+
+# export writers by file format extension
+BACKGROUND_EXPORT_WRITERS = {
+    "csv": CSVExportWriter,
+    "xlsx": XLSXExportWriter,
+}
+
+
+def get_export_file_path(job):
+    return os.path.join(
+        settings.ADMIN_EXPORT_ROOT,
+        "{}.{}".format(job.id, job.params["file_format"]),
+    )
+
+
+def _get_export_request(job):
+    """
+    Return request with changelist filters and search of the export request
+    (used to select exported objects in the same way as in the changelist).
+    """
+    request = HttpRequest()
+    request.GET = QueryDict(job.params["changelist_query"])
+    request.user = job.user
+    return request
+
+
+def _write_export_file(model_admin, job, file):
+    params = job.params
+    file_format = model_admin.get_export_formats()[params["format_index"]]()
+    resource = model_admin.get_export_resource_classes()[params["resource_index"]]()
+    writer = BACKGROUND_EXPORT_WRITERS[params["file_format"]](file)
+    writer.write_rows([resource.get_export_headers()])
+    queryset = model_admin.get_background_export_queryset(
+        _get_export_request(job)
+    ).order_by("pk")
+    chunk_size = settings.ADMIN_EXPORT_CHUNK_SIZE
+    exported_count = 0
+    last_pk = None
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if chunk:
+            dataset = resource.export(queryset=chunk)
+            if model_admin.should_escape_html:
+                file_format._escape_html(dataset)
+            if model_admin.should_escape_formulae:
+                file_format._escape_formulae(dataset)
+            writer.write_rows(dataset)
+            exported_count += len(chunk)
+            logger.debug(
+                "%d of %d objects exported (job %s)",
+                exported_count,
+                params["objects_count"],
+                job.id,
+            )
+        if len(chunk) < chunk_size:
+            break
+        last_pk = chunk[-1].pk
+    writer.close()
+
+
+def export_to_file(job):
+    """
+    Export objects to the file of the job.
+
+    File is written to temporary file first and moved to its final path when
+    it's complete.
+    """
+    params = job.params
+    model = apps.get_model(params["app_label"], params["model_name"])
+    model_admin = ralph_site._registry[model]
+    writer_class = BACKGROUND_EXPORT_WRITERS[params["file_format"]]
+    os.makedirs(settings.ADMIN_EXPORT_ROOT, exist_ok=True)
+    if writer_class.binary:
+        file_kwargs = {"mode": "wb"}
+    else:
+        file_kwargs = {
+            "mode": "w",
+            "encoding": model_admin.to_encoding or "utf-8",
+            "newline": "",
+        }
+    with tempfile.NamedTemporaryFile(
+        dir=settings.ADMIN_EXPORT_ROOT, delete=False, **file_kwargs
+    ) as file:
+        try:
+            _write_export_file(model_admin, job, file)
+        except Exception:
+            os.remove(file.name)
+            raise
+    os.replace(file.name, get_export_file_path(job))
+
+
+def run_background_export(job_id):
+    job = Job.objects.get(pk=job_id)
+    job.start()
+    try:
+        export_to_file(job)
+    except Exception as e:
+        logger.exception(e)
+        job.fail(str(e))
+    else:
+        job.success()
+
+
+@receiver(post_delete, sender=Job)
+def delete_export_file(sender, instance, **kwargs):
+    """
+    Remove exported file when background export job is deleted.
+    """
+    if instance.service_name != BACKGROUND_EXPORT_SERVICE_NAME:
+        return
+    try:
+        os.remove(get_export_file_path(instance))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import logging
+import textwrap
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ralph.admin.export import BACKGROUND_EXPORT_SERVICE_NAME
+from ralph.lib.external_services.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Delete ended background export jobs (together with exported files) not
+    modified for `ADMIN_EXPORT_EXPIRATION_DAYS` days. Run it periodically
+    (ex. daily).
+    """
+
+    help = textwrap.dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ADMIN_EXPORT_EXPIRATION_DAYS,
+            help="Delete exports older than given number of days",
+        )
+
+    def handle(self, days, *args, **kwargs):
+        jobs = Job.objects.inactive().filter(
+            service_name=BACKGROUND_EXPORT_SERVICE_NAME,
+            modified__lt=timezone.now() - timedelta(days=days),
+        )
+        # exported files are removed by `post_delete` signal receiver
+        deleted, _ = jobs.delete()
+        logger.info("%d expired exports deleted", deleted)
@@ -13,10 +13,13 @@ from django.contrib.auth import get_permission_codename
 from django.contrib.contenttypes.admin import GenericTabularInline
 from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.core import checks
-from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
 from django.db import models
-from django.http import HttpResponseRedirect
-from django.urls import reverse
+from django.db.transaction import non_atomic_requests
+from django.http import FileResponse, Http404, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView
 from import_export.admin import ImportExportModelAdmin
@@ -26,10 +29,16 @@ from reversion.admin import VersionAdmin
 
 from ralph.admin import widgets
 from ralph.admin.autocomplete import AjaxAutocompleteMixin
+from ralph.admin.export import (
+    BACKGROUND_EXPORT_SERVICE_NAME,
+    BACKGROUND_EXPORT_WRITERS,
+    get_export_file_path,
+)
 from ralph.admin.helpers import get_field_by_relation_path
 from ralph.admin.sites import ralph_site
 from ralph.admin.views.main import BULK_EDIT_VAR, BULK_EDIT_VAR_IDS
 from ralph.helpers import add_request_to_form
+from ralph.lib.external_services.models import Job, JobStatus
 from ralph.lib.mixins.fields import TicketIdField, TicketIdFieldWidget
 from ralph.lib.mixins.forms import RequestFormMixin
 from ralph.lib.mixins.models import AdminAbsoluteUrlMixin
@@ -382,11 +391,125 @@ class RalphAdminMixin(DashboardChangelistMixin, RalphAutocompleteMixin):
 
 class RalphAdminImportExportMixin(ImportExportModelAdmin):
     _export_queryset_manager = None
+    export_job_template_name = "admin/import_export/export_job.html"
+
+    def get_urls(self):
+        urls = super().get_urls()
+        info = self.get_model_info()
+        my_urls = [
+            path(
+                "export/<uuid:job_id>/",
+                self.admin_site.admin_view(self.export_job_view),
+                name="%s_%s_export_job" % info,
+            ),
+            path(
+                "export/<uuid:job_id>/download/",
+                self.admin_site.admin_view(self.export_job_download_view),
+                name="%s_%s_export_job_download" % info,
+            ),
+        ]
+        return my_urls + urls
+
+    @non_atomic_requests
+    def export_action(self, request, *args, **kwargs):
+        # request is not atomic, because background export job has to be
+        # commited before it's scheduled to the worker
+        if settings.ADMIN_EXPORT_IN_BACKGROUND and request.method == "POST":
+            response = self._run_background_export(request)
+            if response is not None:
+                return response
+        return super().export_action(request, *args, **kwargs)
+
+    def _run_background_export(self, request):
+        """
+        Schedule export of objects matching changelist filters to the file in
+        the background job. Return None if export has to be done in the
+        request (invalid form or format which can't be written incrementally).
+        """
+        if not self.has_export_permission(request):
+            raise PermissionDenied
+        formats = self.get_export_formats()
+        form = self.get_export_form_class()(
+            formats, request.POST, resources=self.get_export_resource_classes()
+        )
+        if not form.is_valid():
+            return None
+        format_index = int(form.cleaned_data["file_format"])
+        file_format = formats[format_index]()
+        if file_format.get_extension() not in BACKGROUND_EXPORT_WRITERS:
+            return None
 
-    def get_export_queryset(self, request):
+        queryset = self._get_export_queryset(request)
+        app_label, model_name = self.get_model_info()
+        job_id, job = Job.run(
+            BACKGROUND_EXPORT_SERVICE_NAME,
+            requester=request.user,
+            app_label=app_label,
+            model_name=model_name,
+            # changelist filters and search (queryset is rebuilt by the job)
+            changelist_query=request.GET.urlencode(),
+            objects_count=queryset.count(),
+            format_index=format_index,
+            resource_index=self.get_resource_index(form),
+            file_format=file_format.get_extension(),
+            filename=self.get_export_filename(request, queryset, file_format),
+        )
+        messages.info(request, _("Export has been scheduled."))
+        return HttpResponseRedirect(
+            reverse(
+                "admin:{}_{}_export_job".format(app_label, model_name),
+                args=(job_id,),
+            )
+        )
+
+    def _get_export_job(self, request, job_id):
+        if not self.has_export_permission(request):
+            raise PermissionDenied
+        job = get_object_or_404(
+            Job, pk=job_id, service_name=BACKGROUND_EXPORT_SERVICE_NAME
+        )
+        params = job.params
+        if (params["app_label"], params["model_name"]) != self.get_model_info():
+            raise Http404
+        if job.username != request.user.username and not request.user.is_superuser:
+            raise Http404
+        return job
+
+    def export_job_view(self, request, job_id):
+        job = self._get_export_job(request, job_id)
+        context = self.admin_site.each_context(request)
+        context.update(
+            {
+                "title": _("Export"),
+                "opts": self.model._meta,
+                "job": job,
+                "objects_count": job.params["objects_count"],
+                "is_finished": job.status == JobStatus.FINISHED.id,
+            }
+        )
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, [self.export_job_template_name], context)
+
+    def export_job_download_view(self, request, job_id):
+        job = self._get_export_job(request, job_id)
+        if job.status != JobStatus.FINISHED.id:
+            raise Http404
+        try:
+            file = open(get_export_file_path(job), "rb")
+        except FileNotFoundError:
+            raise Http404
+        return FileResponse(file, as_attachment=True, filename=job.params["filename"])
+
+    def _get_export_queryset(self, request):
         # mark request as "exporter" request
         request._is_export = True
-        queryset = super().get_export_queryset(request)
+        return super().get_export_queryset(request)
+
+    def _optimize_export_queryset(self, queryset):
+        """
+        Fetch related objects used by export resource together with
+        exported objects.
+        """
         resource = self.get_export_resource_classes()[0]
         fk_fields = []
         for name, field in resource.fields.items():
@@ -405,7 +528,19 @@ class RalphAdminImportExportMixin(ImportExportModelAdmin):
         resource_prefetch_related = getattr(resource._meta, "prefetch_related", [])
         if resource_prefetch_related:
             queryset = queryset.prefetch_related(*resource_prefetch_related)
-        return list(queryset)
+        return queryset
+
+    def get_export_queryset(self, request):
+        queryset = self._get_export_queryset(request)
+        return list(self._optimize_export_queryset(queryset))
+
+    def get_background_export_queryset(self, request):
+        """
+        Return queryset of objects exported in the background job (request is
+        rebuilt by the job from changelist filters and search of the export
+        request).
+        """
+        return self._optimize_export_queryset(self._get_export_queryset(request))
 
     def get_export_resource_classes(self):
         """
@@ -0,0 +1,184 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import override_settings, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from mock import patch
+from openpyxl import load_workbook
+
+from ralph.accounts.tests.factories import UserFactory
+from ralph.admin.export import get_export_file_path, run_background_export
+from ralph.admin.sites import ralph_site
+from ralph.data_center.models import DataCenterAsset
+from ralph.data_center.tests.factories import DataCenterAssetFactory
+from ralph.lib.external_services.models import Job, JobStatus
+from ralph.tests.mixins import ClientMixin
+
+
+@override_settings(ADMIN_EXPORT_IN_BACKGROUND=True, ADMIN_EXPORT_CHUNK_SIZE=3)
+@patch("ralph.lib.external_services.models.InternalService")
+class BackgroundExportTest(ClientMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_root)
+        settings_override = override_settings(ADMIN_EXPORT_ROOT=export_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.assets = DataCenterAssetFactory.create_batch(7)
+        self.login_as_user()
+        self.export_url = reverse("admin:data_center_datacenterasset_export")
+
+    def _get_format_index(self, extension):
+        formats = ralph_site._registry[DataCenterAsset].get_export_formats()
+        return next(
+            i for i, f in enumerate(formats) if f().get_extension() == extension
+        )
+
+    def _export(self, extension, query=""):
+        return self.client.post(
+            self.export_url + query,
+            {"file_format": self._get_format_index(extension)},
+        )
+
+    def _run_export(self, extension, query=""):
+        response = self._export(extension, query)
+        job = Job.objects.latest("created")
+        self.assertRedirects(
+            response,
+            reverse("admin:data_center_datacenterasset_export_job", args=(job.id,)),
+        )
+        run_background_export(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FINISHED.id)
+        return job
+
+    def _download(self, job):
+        response = self.client.get(
+            reverse(
+                "admin:data_center_datacenterasset_export_job_download",
+                args=(job.id,),
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_export_is_scheduled_in_background(self, internal_service_mock):
+        response = self._export("csv")
+        job = Job.objects.get()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(job.status, JobStatus.QUEUED.id)
+        self.assertEqual(job.username, self.user.username)
+        self.assertEqual(job.params["changelist_query"], "")
+        self.assertEqual(job.params["objects_count"], 7)
+        internal_service_mock.return_value.run_async.assert_called_once_with(
+            job_id=job.id
+        )
+
+    def test_export_respects_changelist_filters(self, internal_service_mock):
+        job = self._run_export("csv", "?id={}".format(self.assets[0].pk))
+        self.assertEqual(job.params["objects_count"], 1)
+        rows = list(csv.reader(io.StringIO(self._download(job).decode("utf-8"))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][rows[0].index("id")], str(self.assets[0].pk))
+
+    def test_export_respects_changelist_search(self, internal_service_mock):
+        job = self._run_export("csv", "?q={}".format(self.assets[1].hostname))
+        self.assertEqual(job.params["objects_count"], 1)
+        rows = list(csv.reader(io.StringIO(self._download(job).decode("utf-8"))))
+        self.assertEqual(rows[1][rows[0].index("id")], str(self.assets[1].pk))
+
+    def test_csv_export_in_background_is_same_as_in_request(
+        self, internal_service_mock
+    ):
+        job = self._run_export("csv")
+        with override_settings(ADMIN_EXPORT_IN_BACKGROUND=False):
+            response = self._export("csv")
+        self.assertEqual(response.status_code, 200)
+        expected = list(csv.reader(io.StringIO(response.content.decode("utf-8"))))
+        result = list(csv.reader(io.StringIO(self._download(job).decode("utf-8"))))
+        self.assertEqual(result[0], expected[0])
+        self.assertCountEqual(result[1:], expected[1:])
+        self.assertEqual(len(result), 8)
+
+    def test_xlsx_export_in_background(self, internal_service_mock):
+        job = self._run_export("xlsx")
+        workbook = load_workbook(io.BytesIO(self._download(job)), read_only=True)
+        rows = list(workbook.active.values)
+        self.assertEqual(len(rows), 8)
+        id_column = rows[0].index("id")
+        self.assertEqual(
+            [int(row[id_column]) for row in rows[1:]],
+            sorted(asset.pk for asset in self.assets),
+        )
+
+    def test_other_format_is_exported_in_request(self, internal_service_mock):
+        response = self._export("json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertFalse(Job.objects.exists())
+
+    def test_export_job_page(self, internal_service_mock):
+        job = self._run_export("csv")
+        response = self.client.get(
+            reverse("admin:data_center_datacenterasset_export_job", args=(job.id,))
+        )
+        self.assertContains(
+            response,
+            reverse(
+                "admin:data_center_datacenterasset_export_job_download",
+                args=(job.id,),
+            ),
+        )
+
+    def test_export_job_of_other_user_is_not_found(self, internal_service_mock):
+        job = self._run_export("csv")
+        user = UserFactory(is_staff=True)
+        user.set_password("ralph")
+        user.save()
+        self.login_as_user(user)
+        response = self.client.get(
+            reverse("admin:data_center_datacenterasset_export_job", args=(job.id,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_export_job(self, internal_service_mock):
+        self._export("csv")
+        job = Job.objects.get()
+        with patch(
+            "ralph.admin.export._write_export_file", side_effect=ValueError("error")
+        ):
+            run_background_export(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FAILED.id)
+        response = self.client.get(
+            reverse(
+                "admin:data_center_datacenterasset_export_job_download",
+                args=(job.id,),
+            )
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_file_is_removed_with_job(self, internal_service_mock):
+        job = self._run_export("csv")
+        file_path = get_export_file_path(job)
+        self.assertTrue(os.path.exists(file_path))
+        job.delete()
+        self.assertFalse(os.path.exists(file_path))
+
+    def test_delete_expired_exports(self, internal_service_mock):
+        expired_job = self._run_export("csv")
+        Job.objects.filter(pk=expired_job.pk).update(
+            modified=timezone.now() - timedelta(days=8)
+        )
+        job = self._run_export("xlsx")
+        call_command("delete_expired_exports", days=7)
+        self.assertEqual(list(Job.objects.all()), [job])
+        self.assertFalse(os.path.exists(get_export_file_path(expired_job)))
+        self.assertTrue(os.path.exists(get_export_file_path(job)))
@@ -10,9 +10,10 @@ from ralph.attachments.models import Attachment
 from ralph.back_office.models import BackOfficeAsset
 from ralph.back_office.tests.factories import BackOfficeAssetFactory
 from ralph.lib.transitions.models import TransitionsHistory
+from ralph.tests.mixins import TemporaryMediaRootMixin
 
 
-class RalphTagsTest(TestCase):
+class RalphTagsTest(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
         super().setUp()
         user = UserFactory()
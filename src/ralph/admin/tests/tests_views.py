@@ -10,6 +10,7 @@ from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ralph.admin.sites import ralph_site
+from ralph.tests.mixins import TemporaryMediaRootMixin
 from ralph.tests.models import Foo
 
 FACTORY_MAP = {
@@ -148,7 +149,7 @@ SQL_QUERY_LIMIT = 30
 
 
 @ddt
-class ViewsTest(TestCase):
+class ViewsTest(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
         self.request = RequestFactory().get("/")
         self.request.user = get_user_model().objects.create_superuser(
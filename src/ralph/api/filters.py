@@ -349,26 +349,39 @@ class LookupFilterBackend(BaseFilterBackend):
 class PolymorphicDescendantsFilterBackend(LookupFilterBackend):
     """
     Filter descendants of polymorphic models (especially by extended filters).
+
+    Lookups are applied to every descendant model separately and combined
+    into a single query (OR of subqueries), which is evaluated by the
+    database.
     """
 
     def _process_model(self, model, request, filterset_fields, extended_filter_fields):
-        ids = set()
-        is_lookup_used = False
-        lookups, kw_lookups = self._validate_query_lookups(
+        """
+        Returns tuple (lookups, kw_lookups) applicable to the model (both are
+        empty when none of the query params could be applied to it).
+        """
+        return self._validate_query_lookups(
             model, request, filterset_fields, extended_filter_fields
         )
-        if lookups or kw_lookups:
-            is_lookup_used = True
-            ids = set(
-                model.objects.filter(*lookups, **kw_lookups).values_list(
-                    "pk", flat=True
-                )
-            )
-        return ids, is_lookup_used
 
-    def _get_polymorphic_ids(self, base_model, polymorphic_models, request, view):
+    def _is_subsumed(self, model, lookups, kw_lookups, model_filters):
+        """
+        Returns True if objects of the model matching the lookups are already
+        matched by the filters of one of its ancestors (every filter of the
+        ancestor is also applied to the model).
         """
-        Returns ids of polymorphic objects based on query filters.
+        for other_model, other_lookups, other_kw_lookups in model_filters:
+            if (
+                issubclass(model, other_model)
+                and all(lookup in lookups for lookup in other_lookups)
+                and other_kw_lookups.items() <= kw_lookups.items()
+            ):
+                return True
+        return False
+
+    def _get_polymorphic_filters(self, base_model, polymorphic_models, request, view):
+        """
+        Returns filters of polymorphic objects based on query filters.
 
         Args:
             base_model: (polymorphic) parent model
@@ -377,24 +390,24 @@ class PolymorphicDescendantsFilterBackend(LookupFilterBackend):
             request: current request
             view: current view
 
-        Returns: tuple (
-            * set of ids,
-            * True if at least one of the lookups was applied
-        )
+        Returns: list of (model, lookups, kw_lookups) tuples for every model,
+            for which at least one of the lookups was applied. Descendants
+            without applicable lookups or which filters are subsumed by the
+            filters of their ancestor are skipped.
         """
-        ids = set()
-        is_lookup_used = False
-
+        model_filters = []
         # process base model
         # used only with extended filters
-        model_ids, model_is_lookup_used = self._process_model(
+        lookups, kw_lookups = self._process_model(
             base_model,
             request,
             view.filterset_fields,
             getattr(view, "extended_filter_fields", {}),
         )
-        ids |= model_ids
-        is_lookup_used |= model_is_lookup_used
+        if lookups or kw_lookups:
+            model_filters.append((base_model, lookups, kw_lookups))
+        # descendants are registered in order of definition, so ancestors are
+        # always processed before their descendants
         for model in polymorphic_models:
             filterset_fields = []
             model_viewset = view._viewsets_registry.get(model)
@@ -406,22 +419,39 @@ class PolymorphicDescendantsFilterBackend(LookupFilterBackend):
                 # from django model admin
                 filterset_fields = ralph_site._registry[model].search_fields
 
-            model_ids, model_is_lookup_used = self._process_model(
+            lookups, kw_lookups = self._process_model(
                 model, request, filterset_fields, {}
             )
-            ids |= model_ids
-            is_lookup_used |= model_is_lookup_used
-        return ids, is_lookup_used
+            if not (lookups or kw_lookups):
+                logger.debug("No lookups applicable to {}".format(model))
+                continue
+            if self._is_subsumed(model, lookups, kw_lookups, model_filters):
+                logger.debug("Lookups of {} subsumed by its ancestor".format(model))
+                continue
+            model_filters.append((model, lookups, kw_lookups))
+        return model_filters
 
     def filter_queryset(self, request, queryset, view):
         polymorphic_descendants = getattr(
             queryset.model, "_polymorphic_descendants", []
         )
         if polymorphic_descendants:
-            ids, is_lookup_used = self._get_polymorphic_ids(
+            model_filters = self._get_polymorphic_filters(
                 queryset.model, polymorphic_descendants, request, view
             )
-            if is_lookup_used:
+            if model_filters:
                 logger.debug("Applying PolymorphicDescendantsFilterBackend filters")
-                queryset = queryset.filter(pk__in=list(ids))
+                queryset = queryset.filter(
+                    reduce(
+                        operator.or_,
+                        [
+                            models.Q(
+                                pk__in=model.objects.filter(
+                                    *lookups, **kw_lookups
+                                ).values("pk")
+                            )
+                            for model, lookups, kw_lookups in model_filters
+                        ],
+                    )
+                )
         return queryset
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.pagination import CursorPagination
+
+
+def has_modified_field(model):
+    try:
+        model._meta.get_field("modified")
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class RalphCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination of objects ordered by last modification time.
+
+    Objects are fetched starting from the position (`modified` value) encoded
+    in the cursor, so fetching any page costs the same (contrary to
+    limit-offset pagination, which has to skip all previous rows). Total
+    count of objects is not calculated.
+
+    Enabled by `pagination=cursor` query param (every next page link
+    contains it, together with `cursor` param).
+    """
+
+    page_size_query_param = "limit"
+    mode_query_param = "pagination"
+    mode = "cursor"
+
+    @classmethod
+    def is_requested(cls, request):
+        return request.query_params.get(cls.mode_query_param) == cls.mode
+
+    def get_ordering(self, request, queryset, view):
+        # ordering from query params (OrderingFilter) is ignored - cursor
+        # is valid only for single, unchanging ordering
+        if has_modified_field(queryset.model):
+            return ("modified", "pk")
+        return ("pk",)
@@ -76,7 +76,7 @@ class TestRalphViewset(RalphTestCase):
         response = self.client.options("/api/manufacturers/")
         self.assertCountEqual(
             response.data["filtering"],
-            ["name", "manufacturer_kind"],
+            ["name", "manufacturer_kind", "modified"],
         )
 
 
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import inspect
 
 from django.contrib.admin import SimpleListFilter
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, relations, viewsets
 
@@ -14,6 +17,7 @@ from ralph.api.filters import (
     PolymorphicDescendantsFilterBackend,
     TagsFilterBackend,
 )
+from ralph.api.pagination import has_modified_field, RalphCursorPagination
 from ralph.api.serializers import RalphAPISaveSerializer, ReversedChoiceField
 from ralph.api.utils import QuerysetRelatedMixin
 from ralph.lib.custom_fields.api import CustomFieldsFilterBackend
@@ -82,11 +86,24 @@ class RalphAPIViewSetMixin(QuerysetRelatedMixin, AdminSearchFieldsMixin):
     #    'name': ['asset__hostname', 'service_environment__name', 'ip__address']
     # }
     extended_filter_fields = None
+    # used instead of default pagination when requested by `pagination=cursor`
+    # query param
+    cursor_pagination_class = RalphCursorPagination
+    # set to True to return weak ETag of the list of objects (and 304 Not
+    # Modified if it matches If-None-Match) - it costs one additional query
+    list_etag = False
 
     def __init__(self, *args, **kwargs):
         if self.extended_filter_fields is None:
             self.extended_filter_fields = {}
         super().__init__(*args, **kwargs)
+        # allow to fetch only objects changed since last fetch
+        # (ex. `?modified__gt=2024-01-01T12:00:00`)
+        if (
+            has_modified_field(self.queryset.model)
+            and "modified" not in self.filterset_fields
+        ):
+            self.filterset_fields.append("modified")
         # check if required permissions and filters classes are present
         if RalphPermission not in self.permission_classes:
             raise AttributeError("RalphPermission missing in permission_classes")
@@ -95,6 +112,56 @@ class RalphAPIViewSetMixin(QuerysetRelatedMixin, AdminSearchFieldsMixin):
                 "PermissionsForObjectFilter missing in filter_backends"
             )
 
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.cursor_pagination_class
+            and self.cursor_pagination_class.is_requested(self.request)
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+    def get_list_etag(self, queryset):
+        """
+        Return weak ETag of the list of objects, calculated from the number of
+        objects and the last modification time of them (or None if objects
+        are not timestamped).
+
+        Notice that changes of related objects (if not saved together with
+        the object) don't change the ETag.
+        """
+        if not has_modified_field(queryset.model):
+            return None
+        stats = queryset.order_by().aggregate(
+            last_modified=Max("modified"), count=Count("pk")
+        )
+        key = "|".join(
+            str(part)
+            for part in [
+                self.request.get_full_path(),
+                self.request.user.pk,
+                self.request.accepted_media_type,
+                self.request.version,
+                stats["last_modified"],
+                stats["count"],
+            ]
+        )
+        return 'W/"{}"'.format(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        etag = None
+        if self.list_etag:
+            etag = self.get_list_etag(self.filter_queryset(self.get_queryset()))
+        if etag:
+            # respond with 304 Not Modified if ETag from If-None-Match matches
+            response = get_conditional_response(request._request, etag=etag)
+            if response is None:
+                response = super().list(request, *args, **kwargs)
+            response["ETag"] = etag
+            return response
+        return super().list(request, *args, **kwargs)
+
     def get_serializer_class(self):
         """
         If it's not safe request (ex. POST) and there is `save_serializer_class`
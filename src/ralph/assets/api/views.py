@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
+import zlib
+
 import django_filters
+from django.conf import settings
 from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from django_filters import Filter
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import SAFE_METHODS
 
@@ -12,9 +18,20 @@ from ralph.api.utils import PolymorphicViewSetMixin
 from ralph.assets import models
 from ralph.assets.api import serializers
 from ralph.assets.api.filters import NetworkableObjectFilters
+from ralph.assets.inventory import (
+    get_snapshot,
+    get_snapshot_key,
+    iterate_inventory_rows,
+    set_snapshot,
+)
 from ralph.assets.models import BaseObject
 from ralph.data_center.models import Cluster, DataCenterAsset
-from ralph.lib.api.utils import renderer_classes_without_form
+from ralph.lib.api.utils import (
+    accepts_gzip,
+    JSONLinesRenderer,
+    MsgpackRenderer,
+    renderer_classes_without_form,
+)
 from ralph.lib.visibility_scope.filters import visibility_scope_filter
 from ralph.licences.api import BaseObjectLicenceViewSet
 from ralph.licences.models import BaseObjectLicence
@@ -301,6 +318,9 @@ class DCHostViewSet(BaseObjectViewSetMixin, RalphAPIViewSet):
         "env": ["service_env__environment__name"],
     }
     additional_filter_class = DCHostFilterSet
+    list_etag = True
+    # number of hosts (rows) of inventory snapshot fetched at once
+    snapshot_chunk_size = 1000
 
     def get_serializer_class(self, *args, **kwargs):
         if self.request.method not in SAFE_METHODS:
@@ -332,6 +352,74 @@ class DCHostViewSet(BaseObjectViewSetMixin, RalphAPIViewSet):
                 pass
         return ralph.assets.api.serializers_dchosts.DCHostSerializer
 
+    def _stream_snapshot(self, rows, renderer, cache_key=None):
+        """
+        Render rows (in chunks) and store gzipped snapshot in the cache (if
+        cache key is passed) after the last one is rendered.
+        """
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        compressed = []
+        chunk = []
+        for row in rows:
+            chunk.append(renderer.render(row))
+            if len(chunk) >= self.snapshot_chunk_size:
+                data = b"".join(chunk)
+                chunk = []
+                if cache_key:
+                    compressed.append(compressor.compress(data))
+                yield data
+        data = b"".join(chunk)
+        if cache_key:
+            compressed.extend([compressor.compress(data), compressor.flush()])
+            set_snapshot(cache_key, b"".join(compressed))
+        yield data
+
+    def _stream_cached_snapshot(self, gzipped_content):
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        chunk_size = 1024 * 1024
+        for start in range(0, len(gzipped_content), chunk_size):
+            yield decompressor.decompress(gzipped_content[start : start + chunk_size])
+        yield decompressor.flush()
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[JSONLinesRenderer, MsgpackRenderer],
+    )
+    def snapshot(self, request, *args, **kwargs):
+        """
+        Stream all (filtered) DC hosts as JSON lines (or MessagePack objects,
+        when requested by `format=msgpack` or Accept header), one per host.
+        """
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        cache_key = gzipped_content = None
+        if settings.INVENTORY_SNAPSHOT_CACHE_ENABLED:
+            cache_key = get_snapshot_key(request.user, request.get_full_path())
+            gzipped_content = get_snapshot(cache_key)
+        if gzipped_content is None:
+            queryset = self.filter_queryset(
+                self.queryset.dc_hosts().filter(visibility_scope_filter(request.user))
+            )
+            response = StreamingHttpResponse(
+                self._stream_snapshot(
+                    iterate_inventory_rows(queryset, self.snapshot_chunk_size),
+                    renderer,
+                    cache_key,
+                ),
+                content_type=content_type,
+            )
+        elif accepts_gzip(request):
+            response = HttpResponse(gzipped_content, content_type=content_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = StreamingHttpResponse(
+                self._stream_cached_snapshot(gzipped_content),
+                content_type=content_type,
+            )
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
+
     def get_queryset(self):
         return (
             self.queryset.dc_hosts()
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Inventory snapshot of DC hosts.
+
+Snapshot contains all DC hosts (data center assets, virtual servers, cloud
+hosts and clusters) with their network, tags and custom fields, for example
+to be consumed by configuration management tools (Puppet, Ansible).
+
+Rows are built from `values()` queries (run for chunks of hosts ordered by
+primary key) merged in Python, without instantiating models or serializers,
+so the whole inventory could be fetched in one (streamed) response.
+
+When `INVENTORY_SNAPSHOT_CACHE_ENABLED` is set, (gzipped) snapshot is kept in
+the cache under current generation of hosts data, which is changed (after
+commit) when any of this data is changed.
+"""
+
+import hashlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.admin.utils import get_model_from_relation
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models.functions import Coalesce
+
+from ralph.admin.helpers import get_field_by_relation_path
+from ralph.assets.models import BaseObject, Ethernet
+from ralph.lib.cache.generations import (
+    bump_generation,
+    get_generation,
+    schedule_once_on_commit,
+)
+from ralph.lib.custom_fields.models import CustomFieldValue
+
+GENERATION_CACHE_KEY = "inventory_snapshot_generation"
+
+HOSTNAME_FIELDS = [
+    "asset__hostname",
+    "virtualserver__hostname",
+    "cloudhost__hostname",
+    "cluster__hostname",
+]
+HOST_FIELDS = [
+    "pk",
+    "content_type_id",
+    "hostname",
+    "parent_id",
+    "remarks",
+    "created",
+    "modified",
+    "service_env_id",
+    "service_env__service__uid",
+    "service_env__service__name",
+    "service_env__environment__name",
+    "configuration_path_id",
+    "configuration_path__path",
+    "cloudhost__hypervisor_id",
+    "cloudhost__hypervisor__hostname",
+]
+
+
+def _get_ethernets(ids):
+    ethernets = defaultdict(list)
+    for base_object_id, mac, label, address in (
+        Ethernet.objects.filter(base_object_id__in=ids)
+        .order_by("base_object_id", "mac")
+        .values_list("base_object_id", "mac", "label", "ipaddress__address")
+    ):
+        ethernets[base_object_id].append(
+            {"mac": mac, "label": label, "ipaddress": address}
+        )
+    return ethernets
+
+
+def _get_tags(content_type_ids, ids):
+    tags = defaultdict(list)
+    for object_id, name in (
+        BaseObject.tags.through.objects.filter(
+            content_type_id__in=content_type_ids, object_id__in=ids
+        )
+        .order_by("tag__name")
+        .values_list("object_id", "tag__name")
+    ):
+        tags[object_id].append(name)
+    return tags
+
+
+def _get_custom_fields(hosts):
+    """
+    Return custom fields values of hosts (including inherited ones) as a
+    dict from host id to dict from custom field attribute name to tuple
+    (value, use_as_configuration_variable).
+
+    Inheritance is resolved the same way as for `custom_fields` relation:
+    values set directly on host have the highest priority, then values set
+    on first field from `custom_fields_inheritance` of host model and so on.
+    """
+    # sources (content type id and object id) of custom fields values of
+    # every host, sorted by priority
+    sources = {}
+    ids_by_content_type = defaultdict(list)
+    for host in hosts:
+        sources[host["pk"]] = [(host["content_type_id"], host["pk"])]
+        ids_by_content_type[host["content_type_id"]].append(host["pk"])
+    for content_type_id, ids in ids_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        field_paths = list(model.custom_fields_inheritance)
+        if not field_paths:
+            continue
+        paths_content_types = [
+            ContentType.objects.get_for_model(
+                get_model_from_relation(get_field_by_relation_path(model, path))
+            ).id
+            for path in field_paths
+        ]
+        for pk, *values in model._default_manager.filter(pk__in=ids).values_list(
+            "pk", *field_paths
+        ):
+            sources[pk].extend(
+                (path_content_type_id, value)
+                for path_content_type_id, value in zip(paths_content_types, values)
+                if value
+            )
+
+    all_sources = {
+        source for host_sources in sources.values() for source in host_sources
+    }
+    values_by_source = defaultdict(dict)
+    for (
+        content_type_id,
+        object_id,
+        attribute_name,
+        value,
+        is_variable,
+    ) in CustomFieldValue.objects.filter(
+        content_type_id__in={content_type_id for content_type_id, _ in all_sources},
+        object_id__in={object_id for _, object_id in all_sources},
+    ).values_list(
+        "content_type_id",
+        "object_id",
+        "custom_field__attribute_name",
+        "value",
+        "custom_field__use_as_configuration_variable",
+    ):
+        values_by_source[(content_type_id, object_id)][attribute_name] = (
+            value,
+            is_variable,
+        )
+
+    custom_fields = {}
+    for pk, host_sources in sources.items():
+        host_custom_fields = {}
+        # values with higher priority overwrite the ones with lower priority
+        for source in reversed(host_sources):
+            host_custom_fields.update(values_by_source.get(source, {}))
+        custom_fields[pk] = host_custom_fields
+    return custom_fields
+
+
+def _get_rows(hosts):
+    ids = [host["pk"] for host in hosts]
+    ethernets = _get_ethernets(ids)
+    tags = _get_tags({host["content_type_id"] for host in hosts}, ids)
+    custom_fields = _get_custom_fields(hosts)
+    for host in hosts:
+        pk = host["pk"]
+        service_env = None
+        if host["service_env_id"]:
+            service_env = {
+                "id": host["service_env_id"],
+                "service": host["service_env__service__name"],
+                "service_uid": host["service_env__service__uid"],
+                "environment": host["service_env__environment__name"],
+            }
+        hypervisor = None
+        if host["cloudhost__hypervisor_id"]:
+            hypervisor = {
+                "id": host["cloudhost__hypervisor_id"],
+                "hostname": host["cloudhost__hypervisor__hostname"],
+            }
+        host_custom_fields = custom_fields[pk]
+        yield {
+            "id": pk,
+            "object_type": ContentType.objects.get_for_id(
+                host["content_type_id"]
+            ).model,
+            "hostname": host["hostname"],
+            "service_env": service_env,
+            "configuration_path": host["configuration_path__path"],
+            "parent": host["parent_id"],
+            "hypervisor": hypervisor,
+            "ethernet": ethernets[pk],
+            "ipaddresses": [
+                eth["ipaddress"] for eth in ethernets[pk] if eth["ipaddress"]
+            ],
+            "tags": tags[pk],
+            "custom_fields": {
+                name: value for name, (value, _) in host_custom_fields.items()
+            },
+            "configuration_variables": {
+                name: value
+                for name, (value, is_variable) in host_custom_fields.items()
+                if is_variable
+            },
+            "remarks": host["remarks"],
+            "created": host["created"].isoformat(),
+            "modified": host["modified"].isoformat(),
+        }
+
+
+def iterate_inventory_rows(queryset, chunk_size=1000):
+    """
+    Iterate over rows of inventory snapshot of (DC hosts) queryset.
+
+    Hosts are fetched in chunks ordered by primary key (using keyset
+    pagination); related data (ethernets, tags and custom fields) are fetched
+    for every chunk in separate queries.
+    """
+    queryset = (
+        queryset.annotate(hostname=Coalesce(*HOSTNAME_FIELDS))
+        .order_by("pk")
+        .values(*HOST_FIELDS)
+    )
+    last_pk = None
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+        hosts = list(chunk_queryset[:chunk_size])
+        yield from _get_rows(hosts)
+        if len(hosts) < chunk_size:
+            break
+        last_pk = hosts[-1]["pk"]
+
+
+def get_snapshot_key(user, params):
+    """
+    Return cache key of snapshot for the user (visibility of hosts depends
+    on user) and request params in the current generation of hosts data.
+    """
+    digest = hashlib.sha1("{}|{}".format(user.pk, params).encode("utf-8"))
+    return "inventory_snapshot:{}:{}".format(
+        get_generation(GENERATION_CACHE_KEY), digest.hexdigest()
+    )
+
+
+def get_snapshot(key):
+    return cache.get(key)
+
+
+def set_snapshot(key, gzipped_content):
+    cache.set(key, gzipped_content, settings.INVENTORY_SNAPSHOT_CACHE_TIMEOUT)
+
+
+def invalidate_inventory_snapshots():
+    """
+    Change generation of hosts data (snapshots of previous generation will
+    never be served).
+    """
+    bump_generation(GENERATION_CACHE_KEY)
+
+
+def schedule_inventory_snapshots_invalidation():
+    """
+    Invalidate inventory snapshots after current transaction is committed
+    (at most once per transaction).
+    """
+    schedule_once_on_commit(invalidate_inventory_snapshots)
@@ -1,9 +1,13 @@
 import logging
 from functools import partial, wraps
 
+from django.apps import apps
+from django.conf import settings
 from django.contrib.admin.utils import get_model_from_relation
+from django.db.models.signals import post_delete, post_save
 
 from ralph.admin.helpers import get_field_by_relation_path
+from ralph.assets.inventory import schedule_inventory_snapshots_invalidation
 from ralph.assets.models import BaseObject
 from ralph.data_center.publishers import (
     publish_host_update,
@@ -48,3 +52,39 @@ for model_path in [
         ),
         model,
     )
+
+
+def invalidate_inventory_snapshots(sender, **kwargs):
+    """
+    Invalidate cached inventory snapshots after any of hosts data is changed.
+    """
+    if settings.INVENTORY_SNAPSHOT_CACHE_ENABLED:
+        schedule_inventory_snapshots_invalidation()
+
+
+for model in [
+    apps.get_model(app_label, model_name)
+    for app_label, model_name in [
+        ("assets", "ConfigurationClass"),
+        ("assets", "Environment"),
+        ("assets", "Ethernet"),
+        ("assets", "Service"),
+        ("assets", "ServiceEnvironment"),
+        ("custom_fields", "CustomField"),
+        ("custom_fields", "CustomFieldValue"),
+        ("data_center", "Cluster"),
+        ("data_center", "DataCenterAsset"),
+        ("networks", "IPAddress"),
+        ("virtual", "CloudHost"),
+        ("virtual", "VirtualServer"),
+        ("taggit", "Tag"),
+    ]
+] + [BaseObject.tags.through]:
+    for signal in [post_save, post_delete]:
+        signal.connect(
+            receiver=invalidate_inventory_snapshots,
+            sender=model,
+            dispatch_uid="invalidate_inventory_snapshots_{}".format(
+                model._meta.label_lower
+            ),
+        )
@@ -1,13 +1,27 @@
 # -*- coding: utf-8 -*-
+import gzip
+import json
+from datetime import timedelta
 from urllib.parse import urlencode
 
+import msgpack
 from ddt import data, ddt
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.test import APIRequestFactory
 
 from ralph.accounts.tests.factories import TeamFactory
+from ralph.api.filters import PolymorphicDescendantsFilterBackend
 from ralph.api.tests._base import RalphAPITestCase
+from ralph.assets.api.views import BaseObjectViewSet
 from ralph.assets.models import (
+    Asset,
     AssetModel,
     BaseObject,
     Category,
@@ -43,6 +57,7 @@ from ralph.data_center.tests.factories import (
 )
 from ralph.domains.models import Domain
 from ralph.domains.tests.factories import DomainFactory
+from ralph.lib.api.utils import MsgpackRenderer
 from ralph.lib.custom_fields.models import (
     CustomField,
     CustomFieldTypes,
@@ -619,6 +634,36 @@ class BaseObjectAPITests(RalphAPITestCase):
         response = self.client.get(url, format="json")
         self.assertEqual(len(response.data["results"]), 1)
 
+    def _get_polymorphic_filter_request(self, query):
+        request = APIRequestFactory().get("/")
+        request.query_params = QueryDict(urlencode(query))
+        view = BaseObjectViewSet()
+        view.request = request
+        return request, view
+
+    def test_polymorphic_filters_are_evaluated_by_database(self):
+        request, view = self._get_polymorphic_filter_request(
+            {"barcode__startswith": "12"}
+        )
+        with self.assertNumQueries(0):
+            queryset = PolymorphicDescendantsFilterBackend().filter_queryset(
+                request, BaseObject.objects.all(), view
+            )
+        self.assertCountEqual(
+            queryset, [self.bo_asset.baseobject_ptr, self.dc_asset.baseobject_ptr]
+        )
+
+    def test_polymorphic_filters_skip_subsumed_descendants(self):
+        request, view = self._get_polymorphic_filter_request(
+            {"barcode__startswith": "12"}
+        )
+        model_filters = PolymorphicDescendantsFilterBackend()._get_polymorphic_filters(
+            BaseObject, BaseObject._polymorphic_descendants, request, view
+        )
+        # filters of DataCenterAsset and BackOfficeAsset are the same as
+        # filters of Asset
+        self.assertEqual([model for model, _, _ in model_filters], [BaseObject, Asset])
+
     def test_is_lookup_used(self):
         url = "{}?{}".format(
             reverse("baseobject-list"),
@@ -929,6 +974,192 @@ class DCHostAPITests(RalphAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 1)
 
+    def test_cursor_pagination(self):
+        DataCenterAssetFullFactory.create_batch(3)
+        url = "{}?{}".format(
+            reverse("dchost-list"), urlencode({"pagination": "cursor", "limit": 2})
+        )
+        ids = []
+        while url:
+            response = self.client.get(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        hosts = [self.dc_asset, self.virtual, self.cloud_host] + list(
+            DataCenterAsset.objects.exclude(pk=self.dc_asset.pk)
+        )
+        hosts = BaseObject.objects.filter(pk__in=[host.pk for host in hosts])
+        self.assertEqual(
+            ids, list(hosts.order_by("modified", "pk").values_list("pk", flat=True))
+        )
+
+    def test_filter_by_modified_gt(self):
+        last_fetch = timezone.now() - timedelta(hours=1)
+        BaseObject.objects.update(modified=last_fetch - timedelta(days=1))
+        self.virtual.hostname = "changed"
+        self.virtual.save()
+        url = "{}?{}".format(
+            reverse("dchost-list"),
+            urlencode({"modified__gt": last_fetch.isoformat()}),
+        )
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], [self.virtual.id]
+        )
+
+    def test_list_etag(self):
+        url = reverse("dchost-list")
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        self.virtual.hostname = "changed"
+        self.virtual.save()
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def _get_snapshot(self, query=None, **kwargs):
+        url = reverse("dchost-snapshot")
+        if query:
+            url = "{}?{}".format(url, urlencode(query))
+        response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def _get_snapshot_rows(self, query=None, **kwargs):
+        response = self._get_snapshot(query, **kwargs)
+        content = b"".join(response.streaming_content)
+        return {row["id"]: row for row in map(json.loads, content.splitlines())}
+
+    def test_snapshot(self):
+        rows = self._get_snapshot_rows()
+        self.assertCountEqual(
+            rows.keys(), [self.dc_asset.id, self.virtual.id, self.cloud_host.id]
+        )
+        cloud_host = rows[self.cloud_host.id]
+        self.assertEqual(cloud_host["object_type"], "cloudhost")
+        self.assertEqual(cloud_host["hostname"], "aaaa")
+        self.assertEqual(cloud_host["ipaddresses"], ["10.20.30.40"])
+        self.assertEqual(cloud_host["configuration_variables"], {"test_cf": "xyz"})
+        self.assertEqual(
+            cloud_host["hypervisor"],
+            {"id": self.dc_asset.id, "hostname": self.dc_asset.hostname},
+        )
+
+    def test_snapshot_is_consistent_with_list(self):
+        self.dc_asset.tags.add("tag1", "tag2")
+        self.dc_asset.service_env.update_custom_field("test_cf", "inherited")
+        cf = CustomField.objects.create(name="other_cf")
+        self.dc_asset.service_env.update_custom_field("other_cf", "inherited")
+        self.virtual.update_custom_field("other_cf", "direct")
+        self.assertFalse(cf.use_as_configuration_variable)
+        rows = self._get_snapshot_rows()
+        response = self.client.get(reverse("dchost-list"), format="json")
+        self.assertEqual(len(response.data["results"]), len(rows))
+        for host in response.data["results"]:
+            row = rows[host["id"]]
+            for field in [
+                "hostname",
+                "object_type",
+                "ipaddresses",
+                "custom_fields",
+                "configuration_variables",
+                "remarks",
+            ]:
+                self.assertEqual(row[field], host[field], field)
+            self.assertCountEqual(row["tags"], host["tags"])
+            self.assertEqual(
+                row["service_env"]["service_uid"], host["service_env"]["service_uid"]
+            )
+            self.assertCountEqual(
+                [eth["mac"] for eth in row["ethernet"]],
+                [eth["mac"] for eth in host["ethernet"]],
+            )
+
+    def test_snapshot_msgpack(self):
+        response = self._get_snapshot({"format": "msgpack"})
+        self.assertEqual(response["Content-Type"], "application/x-msgpack")
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(b"".join(response.streaming_content))
+        self.assertEqual(
+            {row["id"]: row for row in unpacker}, self._get_snapshot_rows()
+        )
+
+    def test_msgpack_renderer_packs_strings_and_bytes_with_separate_types(self):
+        self.assertEqual(
+            MsgpackRenderer().render({"hostname": "s1", "raw": b"\x00"}),
+            b"\x82\xa8hostname\xa2s1\xa3raw\xc4\x01\x00",
+        )
+
+    def test_snapshot_filters(self):
+        rows = self._get_snapshot_rows({"service": "sc-222"})
+        self.assertEqual(list(rows), [self.virtual.id])
+
+    def test_snapshot_number_of_queries_does_not_depend_on_hosts_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._get_snapshot_rows()
+        DataCenterAssetFullFactory.create_batch(5)
+        VirtualServerFullFactory.create_batch(5, parent=self.dc_asset)
+        with CaptureQueriesContext(connection) as more_hosts_queries:
+            rows = self._get_snapshot_rows()
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(len(more_hosts_queries), len(queries))
+
+    @override_settings(INVENTORY_SNAPSHOT_CACHE_ENABLED=True)
+    def test_snapshot_cache(self):
+        cache.clear()
+        rows = self._get_snapshot_rows()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._get_snapshot_rows(), rows)
+            response = self._get_snapshot(HTTP_ACCEPT_ENCODING="gzip")
+            not_gzipped_response = self._get_snapshot(
+                HTTP_ACCEPT_ENCODING="gzip;q=0, identity"
+            )
+        # served from the cache (only savepoints of atomic requests are run)
+        self.assertFalse([query for query in queries if "SELECT" in query["sql"]])
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            {
+                row["id"]: row
+                for row in map(
+                    json.loads, gzip.decompress(response.content).splitlines()
+                )
+            },
+            rows,
+        )
+        self.assertFalse(not_gzipped_response.has_header("Content-Encoding"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.virtual.hostname = "changed"
+            self.virtual.save()
+        self.assertEqual(
+            self._get_snapshot_rows()[self.virtual.id]["hostname"], "changed"
+        )
+
+    @override_settings(INVENTORY_SNAPSHOT_CACHE_ENABLED=True)
+    def test_snapshot_cache_is_invalidated_after_service_rename(self):
+        cache.clear()
+        self.assertEqual(
+            self._get_snapshot_rows()[self.dc_asset.id]["service_env"]["service"],
+            "test-service",
+        )
+        service = self.dc_asset.service_env.service
+        with self.captureOnCommitCallbacks(execute=True):
+            service.name = "renamed-service"
+            service.save()
+        self.assertEqual(
+            self._get_snapshot_rows()[self.dc_asset.id]["service_env"]["service"],
+            "renamed-service",
+        )
+
     def test_patch_dchost_virtual_server(self):
         new_hypervisor = DataCenterAssetFullFactory()
         url = reverse("dchost-detail", args=(self.virtual.id,))
@@ -3,6 +3,7 @@ from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 
 from ralph.admin.helpers import get_content_type_for_model
+from ralph.attachments.helpers import get_checksums
 from ralph.attachments.models import Attachment, AttachmentItem
 from ralph.lib.mixins.forms import RequestModelForm
 
@@ -27,7 +28,7 @@ class AttachmentForm(RequestModelForm):
             * mime_type - uploaded file's content type.
         """
         obj = super().save(commit=False)
-        md5 = Attachment.get_md5_sum(obj.file)
+        md5, sha256 = get_checksums(obj.file)
         attachment = Attachment.objects.filter(md5=md5)
         if obj.pk:
             attachment = attachment.exclude(pk=obj.pk)
@@ -62,6 +63,8 @@ class AttachmentForm(RequestModelForm):
                 )
             return
         obj.md5 = md5
+        # file is not hashed again when it's stored
+        obj._checksums = md5, sha256
         obj.uploaded_by = self._request.user
         file = self.cleaned_data.get("file", None)
         if file and hasattr(file, "content_type"):
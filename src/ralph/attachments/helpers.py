@@ -1,8 +1,13 @@
+import hashlib
 import mimetypes
 import os
 from collections.abc import Iterable
 from uuid import uuid4
 
+from django.core.files import File
+
+CHECKSUM_CHUNK_SIZE = 64 * 1024
+
 
 def get_file_path(instance, filename, default_dir="attachments"):
     """Generates pseudo-random file path.
@@ -25,6 +30,48 @@ def get_file_path(instance, filename, default_dir="attachments"):
     return os.path.join(default_dir, name[:1], name[1:2], name)
 
 
+def get_content_file_path(digest, filename, default_dir="attachments"):
+    """Generates file path based on file's content.
+
+    Identical files get the same path, so they could be stored only once.
+
+    Args:
+        digest: Checksum (hex digest) of file's content.
+        filename: A original file name with extension.
+        default_dir: Something like namespace for files.
+
+    Returns:
+        A generated filename with schema:
+            {attachment}/{1st_digest_char}/{2nd_digest_char}/{digest}.{ext}
+    """
+    ext = os.path.splitext(filename)[1]
+    name = "".join([digest, ext])
+    return os.path.join(default_dir, name[:1], name[1:2], name)
+
+
+def get_checksums(file, chunk_size=CHECKSUM_CHUNK_SIZE):
+    """Calculates md5 and sha256 checksums of a file.
+
+    File is read in chunks, so it's never loaded to memory at once.
+
+    Args:
+        file: File (or file-like object).
+        chunk_size: Size (in bytes) of read chunks.
+
+    Returns:
+        A tuple with md5 and sha256 hex digests.
+    """
+    if not hasattr(file, "chunks"):
+        file = File(file)
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks(chunk_size):
+        md5.update(chunk)
+        sha256.update(chunk)
+    file.seek(0)
+    return md5.hexdigest(), sha256.hexdigest()
+
+
 def add_attachment_from_disk(objs, local_path_to_file, owner, description=""):
     """Create attachment from absolute file path.
 
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("attachments", "0003_auto_20160121_1346"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="attachment",
+            name="md5",
+            field=models.CharField(db_index=True, max_length=32),
+        ),
+    ]
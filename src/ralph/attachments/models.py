@@ -1,16 +1,19 @@
-import hashlib
 import os
 import string
 
 from django.conf import settings
 from django.contrib.contenttypes import fields
 from django.contrib.contenttypes.models import ContentType
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.db import models, transaction
 from unidecode import unidecode
 
 from ralph.admin.helpers import get_content_type_for_model
-from ralph.attachments.helpers import get_file_path
+from ralph.attachments.helpers import (
+    get_checksums,
+    get_content_file_path,
+    get_file_path,
+)
 from ralph.lib.mixins.models import TimeStampMixin
 
 
@@ -36,8 +39,8 @@ class AttachmentManager(models.Manager):
         filename = os.path.basename(file_path)
         attachment.original_filename = filename
         with open(file_path, "rb") as f:
-            content = ContentFile(f.read())
-            attachment.file.save(filename, content, save=True)
+            attachment.file = File(f, name=filename)
+            attachment.save()
         return attachment
 
 
@@ -103,14 +106,16 @@ class AttachmentItemManager(models.Manager):
 class Attachment(TimeStampMixin, models.Model):
     """
     Base model for attachment, it contains basic info about file:
+        * md5 - checksum of file's content,
         * original_filename - uploaded filename (before normalization),
-        * file - the file stored on disk,
+        * file - the file stored on disk (identical files are stored once and
+          shared by many attachments),
         * mime_type - mime type of file as a string, it used in HTTP response,
         * description - e.g., description of file's content or some comment,
         * uploaded_by - the user who added attachment.
     """
 
-    md5 = models.CharField(max_length=32, unique=True)
+    md5 = models.CharField(max_length=32, db_index=True)
     original_filename = models.CharField(
         max_length=255,
         unique=False,
@@ -125,6 +130,9 @@ class Attachment(TimeStampMixin, models.Model):
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
     objects = AttachmentManager()
+    # md5 and sha256 of the new (not stored yet) file, when they were already
+    # calculated (ex. by AttachmentForm), so the file is not read again
+    _checksums = None
 
     def __str__(self):
         return "{} ({}) uploaded by {}".format(
@@ -136,10 +144,7 @@ class Attachment(TimeStampMixin, models.Model):
         """
         Return md5 checksum of a file.
         """
-        file.seek(0)
-        md5 = hashlib.md5(file.read()).hexdigest()
-        file.seek(0)
-        return md5
+        return get_checksums(file)[0]
 
     def save(self, *args, **kwargs):
         """
@@ -150,9 +155,25 @@ class Attachment(TimeStampMixin, models.Model):
             self.original_filename = self._safe_filename(
                 self.original_filename or self.file.name
             )
-        self.md5 = self.get_md5_sum(self.file)
+        if not self.file._committed:
+            self._store_file()
+        elif not self.md5:
+            self.md5 = self.get_md5_sum(self.file)
         super().save(*args, **kwargs)
 
+    def _store_file(self):
+        """
+        Store new file under the path based on its content, unless identical
+        file is already stored.
+        """
+        checksums, self._checksums = self._checksums, None
+        self.md5, sha256 = checksums or get_checksums(self.file)
+        name = get_content_file_path(sha256, self.file.name)
+        storage = self.file.storage
+        if not storage.exists(name):
+            name = storage.save(name, self.file.file)
+        self.file = name
+
     @staticmethod
     def _safe_filename(filename):
         """
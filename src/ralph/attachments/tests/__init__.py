@@ -8,11 +8,12 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
 from ralph.attachments.models import Attachment, AttachmentItem
+from ralph.tests.mixins import TemporaryMediaRootMixin
 
 User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
 
 
-class AttachmentsTestCase(TestCase):
+class AttachmentsTestCase(TemporaryMediaRootMixin, TestCase):
     def create_attachment_for_object(
         self, obj, filename=None, user=None, content=b"some content"
     ):
@@ -1,7 +1,15 @@
+import hashlib
+import io
 import os
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
 
 from ralph.accounts.tests.factories import UserFactory
+from ralph.attachments.forms import AttachmentForm
+from ralph.attachments.helpers import get_checksums
 from ralph.attachments.models import Attachment, AttachmentItem
 from ralph.attachments.tests import AttachmentsTestCase
 from ralph.tests.models import Foo, TestManufacturer
@@ -34,3 +42,73 @@ class AttachmentTest(AttachmentsTestCase):
             )
             attachment.save()
             self.assertEqual(attachment.original_filename, "lozc.pdf")
+
+    def test_identical_files_are_stored_once(self):
+        user = UserFactory()
+        attachments = [
+            Attachment.objects.create(
+                file=SimpleUploadedFile(filename, b"identical content"),
+                uploaded_by=user,
+            )
+            for filename in ["a.txt", "b.txt"]
+        ]
+        self.assertNotEqual(attachments[0].pk, attachments[1].pk)
+        self.assertEqual(attachments[0].md5, attachments[1].md5)
+        self.assertEqual(attachments[0].file.name, attachments[1].file.name)
+        self.assertEqual(
+            [attachment.original_filename for attachment in attachments],
+            ["a.txt", "b.txt"],
+        )
+        with attachments[1].file.open("rb") as f:
+            self.assertEqual(f.read(), b"identical content")
+
+    def test_create_from_file_path_twice(self):
+        with TemporaryDirectory() as tmp_dir_name:
+            file_path = os.path.join(tmp_dir_name, "report.pdf")
+            with open(file_path, "wb") as f:
+                f.write(b"report")
+            first, second = [
+                Attachment.objects.create_from_file_path(file_path, UserFactory())
+                for _ in range(2)
+            ]
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.md5, hashlib.md5(b"report").hexdigest())
+
+    def test_get_checksums_in_chunks(self):
+        content = os.urandom(1000)
+        self.assertEqual(
+            get_checksums(io.BytesIO(content), chunk_size=64),
+            (
+                hashlib.md5(content).hexdigest(),
+                hashlib.sha256(content).hexdigest(),
+            ),
+        )
+
+
+class AttachmentFormTest(AttachmentsTestCase):
+    def test_uploaded_file_is_hashed_once(self):
+        request = RequestFactory().post("/")
+        request.user = UserFactory()
+        form = AttachmentForm(
+            data={"description": "report"},
+            files={"file": SimpleUploadedFile("report.txt", b"report")},
+            _request=request,
+        )
+        form._parent_object = Foo.objects.create(bar="test")
+        self.assertTrue(form.is_valid())
+        with (
+            patch(
+                "ralph.attachments.forms.get_checksums", wraps=get_checksums
+            ) as form_checksums_mock,
+            patch(
+                "ralph.attachments.models.get_checksums", wraps=get_checksums
+            ) as model_checksums_mock,
+        ):
+            attachment = form.save()
+        self.assertEqual(
+            form_checksums_mock.call_count + model_checksums_mock.call_count, 1
+        )
+        self.assertEqual(attachment.md5, hashlib.md5(b"report").hexdigest())
+        self.assertIn(hashlib.sha256(b"report").hexdigest(), attachment.file.name)
+        with attachment.file.open("rb") as f:
+            self.assertEqual(f.read(), b"report")
@@ -0,0 +1,93 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ralph.attachments.models import Attachment
+from ralph.attachments.views import parse_range
+from ralph.tests.mixins import ClientMixin, TemporaryMediaRootMixin
+
+
+class ParseRangeTest(TestCase):
+    def test_parse_range(self):
+        self.assertIsNone(parse_range(None, 10))
+        self.assertIsNone(parse_range("bytes=-", 10))
+        self.assertIsNone(parse_range("bytes=0-1,3-4", 10))
+        self.assertIsNone(parse_range("bytes=5-2", 10))
+        self.assertEqual(parse_range("bytes=2-5", 10), (2, 5))
+        self.assertEqual(parse_range("bytes=2-", 10), (2, 9))
+        self.assertEqual(parse_range("bytes=2-100", 10), (2, 9))
+        self.assertEqual(parse_range("bytes=-3", 10), (7, 9))
+        self.assertEqual(parse_range("bytes=-30", 10), (0, 9))
+
+    def test_parse_range_not_satisfiable(self):
+        for header in ["bytes=10-", "bytes=-0"]:
+            with self.assertRaises(ValueError):
+                parse_range(header, 10)
+
+
+class ServeAttachmentTest(ClientMixin, TemporaryMediaRootMixin, TestCase):
+    def setUp(self):
+        self.login_as_user()
+        self.attachment = Attachment.objects.create(
+            file=SimpleUploadedFile("file.txt", b"0123456789"),
+            uploaded_by=self.user,
+            mime_type="text/plain",
+        )
+        self.url = reverse(
+            "serve_attachment",
+            args=(self.attachment.id, self.attachment.original_filename),
+        )
+        self.etag = '"{}"'.format(self.attachment.md5)
+
+    def test_get_whole_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="file.txt"'
+        )
+
+    def test_get_not_modified(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], self.etag)
+
+    def test_get_modified_since(self):
+        response = self.client.get(
+            self.url,
+            HTTP_IF_MODIFIED_SINCE=http_date(self.attachment.modified.timestamp()),
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(response["Content-Length"], "4")
+
+    def test_get_suffix_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+    def test_get_range_not_satisfiable(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=20-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_get_range_of_changed_file(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"other"'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+    def test_get_range_if_file_not_changed(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE=self.etag
+        )
+        self.assertEqual(response.status_code, 206)
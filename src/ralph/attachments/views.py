@@ -1,8 +1,14 @@
-import time
+import re
 
 from django.forms.models import modelformset_factory
-from django.http import FileResponse, HttpResponseRedirect
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
 from django.utils.http import http_date
 from django.views.generic.base import View
 
@@ -11,6 +17,46 @@ from ralph.attachments.forms import AttachmentForm
 from ralph.attachments.models import Attachment, AttachmentItem
 from ralph.helpers import add_request_to_form
 
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    Return first and last (inclusive) byte of the range requested by `Range`
+    header or None when the whole file should be served (header is missing,
+    invalid or contains multiple ranges, which are not supported).
+
+    Raise ValueError when range is not satisfiable.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if not start:
+        # suffix range - last `end` bytes of the file
+        suffix_length = int(end)
+        if not suffix_length:
+            raise ValueError("Empty suffix range")
+        return max(size - suffix_length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts after the end of the file")
+    end = int(end) if end else size - 1
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, length, block_size=FileResponse.block_size):
+    with open(path, "rb") as fd:
+        fd.seek(start)
+        while length > 0:
+            data = fd.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
 
 class AttachmentsView(RalphDetailView):
     icon = "paperclip"
@@ -80,14 +126,48 @@ class ServeAttachment(View):
         """
         All attachments are serving by this view because we need full
         control (e.g., permissions, rename).
+
+        Conditional requests are supported (attachment's checksum is used as
+        ETag) as well as requests for single range of bytes.
         """
         # TODO: respect permissions
         obj = get_object_or_404(Attachment, id=id, original_filename=filename)
-        fd = open(obj.file.path, "rb")
-        response = FileResponse(fd, content_type=obj.mime_type)
-        response["Content-Disposition"] = 'attachment; filename="{}"'.format(
-            obj.original_filename
-        )  # noqa
-        http_modified = http_date(time.mktime(obj.modified.timetuple()))
-        response["Last-Modified"] = http_modified
+        etag = quote_etag(obj.md5)
+        last_modified = int(obj.modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self._get_file_response(request, obj, etag, last_modified)
+            response["Content-Disposition"] = 'attachment; filename="{}"'.format(
+                obj.original_filename
+            )  # noqa
+            response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def _get_file_response(self, request, obj, etag, last_modified):
+        if_range = request.headers.get("If-Range")
+        if if_range and if_range not in (etag, http_date(last_modified)):
+            # file has changed - serve the whole (new) file
+            byte_range = None
+        else:
+            size = obj.file.size
+            try:
+                byte_range = parse_range(request.headers.get("Range"), size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = "bytes */{}".format(size)
+                return response
+        if byte_range is None:
+            return FileResponse(open(obj.file.path, "rb"), content_type=obj.mime_type)
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(obj.file.path, start, end - start + 1),
+            status=206,
+            content_type=obj.mime_type,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = "bytes {}-{}/{}".format(start, end, size)
         return response
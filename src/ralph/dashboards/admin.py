@@ -87,6 +87,7 @@ class GraphAdmin(RalphAdmin):
                     "params",
                     "active",
                     "push_to_statsd",
+                    "cache_timeout",
                 )
             },
         ),
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import logging
+import textwrap
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ralph.dashboards.models import Graph, prefetch_graphs_data
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Calculate data of active graphs (and graphs pushed to statsd) and store
+    it in the cache, so it's read from the cache by dashboards and
+    `push_graphs_to_statsd` command. Run it periodically (more often than
+    cache timeout of graphs).
+    """
+
+    help = textwrap.dedent(__doc__).strip()
+
+    def handle(self, *args, **kwargs):
+        graphs = [
+            graph
+            for graph in Graph.objects.filter(Q(active=True) | Q(push_to_statsd=True))
+            if graph.get_cache_timeout()
+        ]
+        for graph in prefetch_graphs_data(graphs, refresh=True):
+            try:
+                graph.get_data()
+            except Exception as e:
+                logger.error(
+                    "Error while calculating data of graph %s: %s", graph.name, e
+                )
+        logger.info("Data of %d graphs precomputed", len(graphs))
@@ -6,7 +6,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils.text import slugify
 
-from ralph.dashboards.models import Graph
+from ralph.dashboards.models import Graph, prefetch_graphs_data
 from ralph.lib.metrics import build_statsd_client
 
 logger = logging.getLogger(__name__)
@@ -24,7 +24,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         statsd = build_statsd_client(prefix=settings.STATSD_GRAPHS_PREFIX)
-        graphs = Graph.objects.filter(push_to_statsd=True)
+        graphs = prefetch_graphs_data(Graph.objects.filter(push_to_statsd=True))
         for graph in graphs:
             graph_data = graph.get_data()
             graph_name = normalize(graph.name)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dashboards", "0008_auto_20250303_0923"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="graph",
+            name="cache_timeout",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text=(
+                    "Number of seconds for which graph's data is cached (0 to "
+                    "disable caching). Leave empty to use the default one."
+                ),
+                null=True,
+            ),
+        ),
+    ]
@@ -1,8 +1,12 @@
+import hashlib
+import json
 from functools import partial
 
 
 from ralph.lib.dj_choices import Choices
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db import connection, models
 from django.db.models import Case, Count, IntegerField, Max, Q, Sum, Value, When
 from django.db.models.functions import (
@@ -19,6 +23,7 @@ from django_extensions.db.fields.json import JSONField
 from ralph.dashboards.filter_parser import FilterParser
 from ralph.dashboards.renderers import HorizontalBar, PieChart, VerticalBar
 from ralph.lib.mixins.models import AdminAbsoluteUrlMixin, NamedMixin, TimeStampMixin
+from ralph.lib.parallel import map_in_separate_connections
 
 
 def _unpack_series(series):
@@ -202,6 +207,14 @@ class Graph(AdminAbsoluteUrlMixin, NamedMixin, TimeStampMixin, models.Model):
     push_to_statsd = models.BooleanField(
         default=False, help_text="Push graph's data to statsd."
     )
+    cache_timeout = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text=(
+            "Number of seconds for which graph's data is cached (0 to disable "
+            "caching). Leave empty to use the default one."
+        ),
+    )
 
     @property
     def changelist_model(self):
@@ -318,7 +331,50 @@ class Graph(AdminAbsoluteUrlMixin, NamedMixin, TimeStampMixin, models.Model):
             queryset = self.apply_limit(queryset)
         return queryset
 
-    def get_data(self):
+    def get_cache_timeout(self):
+        if self.cache_timeout is None:
+            return settings.DASHBOARD_GRAPH_CACHE_TIMEOUT
+        return self.cache_timeout
+
+    def get_cache_key(self):
+        """
+        Return cache key of graph's data. Key depends on the definition of
+        the graph, so its data is recalculated after graph is changed.
+        """
+        definition = json.dumps(
+            [self.model_id, self.aggregate_type, self.params],
+            sort_keys=True,
+            default=str,
+        )
+        return "dashboard_graph_data:{}:{}".format(
+            self.pk, hashlib.sha1(definition.encode("utf-8")).hexdigest()
+        )
+
+    def get_data(self, refresh=False):
+        """
+        Return graph's data (labels and series).
+
+        Data prefetched by `prefetch_graphs_data` is returned if available,
+        otherwise it's fetched from the cache or calculated (and cached).
+        """
+        prefetched = getattr(self, "_prefetched_data", None)
+        if prefetched is not None and not refresh:
+            if isinstance(prefetched, Exception):
+                raise prefetched
+            return prefetched
+        timeout = self.get_cache_timeout()
+        if not timeout:
+            return self.calculate_data()
+        cache_key = self.get_cache_key()
+        if not refresh:
+            data = cache.get(cache_key)
+            if data is not None:
+                return data
+        data = self.calculate_data()
+        cache.set(cache_key, data, timeout)
+        return data
+
+    def calculate_data(self):
         queryset = self.build_queryset()
         grouping_label = GroupingLabel(connection, self.params["labels"])
         label = grouping_label.label
@@ -358,3 +414,56 @@ class Graph(AdminAbsoluteUrlMixin, NamedMixin, TimeStampMixin, models.Model):
             if filters:
                 queryset = queryset.filter(**filters)
         return queryset
+
+
+def _calculate_data(graph):
+    try:
+        return graph.calculate_data()
+    except Exception as e:
+        return e
+
+
+def _calculate_graphs_data(graphs):
+    """
+    Calculate data of graphs (or exception raised while calculating it).
+
+    When `DASHBOARD_GRAPHS_WORKERS` setting is greater than 1, graphs are
+    calculated in parallel, each of them in separate database connection, but
+    only outside of transaction (dashboard view, `precompute_graphs` and
+    `push_graphs_to_statsd` commands). Inside transaction graphs are always
+    calculated sequentially.
+    """
+    return map_in_separate_connections(
+        _calculate_data, graphs, settings.DASHBOARD_GRAPHS_WORKERS
+    )
+
+
+def prefetch_graphs_data(graphs, refresh=False):
+    """
+    Prefetch data of graphs (returned later by `get_data` of every graph).
+
+    Data of all graphs is fetched from the cache at once, data of graphs
+    missing in the cache (or all of them, when `refresh` is set) is calculated
+    (see `_calculate_graphs_data`) and cached.
+
+    Returns list of graphs.
+    """
+    graphs = list(graphs)
+    cache_keys = {
+        graph.pk: graph.get_cache_key() for graph in graphs if graph.get_cache_timeout()
+    }
+    cached_data = {}
+    if not refresh and cache_keys:
+        cached_data = cache.get_many(cache_keys.values())
+    missing = []
+    for graph in graphs:
+        data = cached_data.get(cache_keys.get(graph.pk))
+        if data is None:
+            missing.append(graph)
+        else:
+            graph._prefetched_data = data
+    for graph, data in zip(missing, _calculate_graphs_data(missing)):
+        graph._prefetched_data = data
+        if graph.pk in cache_keys and not isinstance(data, Exception):
+            cache.set(cache_keys[graph.pk], data, graph.get_cache_timeout())
+    return graphs
@@ -1,12 +1,21 @@
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import override_settings, TestCase, TransactionTestCase
+from django.urls import reverse
+from mock import patch
 
 from ralph.assets.models import ServiceEnvironment
 from ralph.assets.tests.factories import ServiceEnvironmentFactory
-from ralph.dashboards.models import AggregateType
-from ralph.dashboards.tests.factories import GraphFactory
+from ralph.dashboards.models import (
+    AggregateType,
+    Graph,
+    prefetch_graphs_data,
+)
+from ralph.dashboards.tests.factories import DashboardFactory, GraphFactory
 from ralph.data_center.models import DataCenterAsset
 from ralph.data_center.tests.factories import DataCenterAssetFullFactory
+from ralph.lib.parallel import _call_in_separate_connection
 
 
 class GraphQuerysetForFilterTestCase(TestCase):
@@ -132,3 +141,110 @@ class GraphQuerysetForFilterTestCase(TestCase):
             list(filtered_qs.values_list("service_env__service__name", "invoice_no")),
             [("ServiceA", "12345")] * 2,
         )
+
+
+class GraphDataCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        DataCenterAssetFullFactory.create_batch(
+            2, service_env__service__name="ServiceA"
+        )
+        self.graph = GraphFactory(
+            aggregate_type=AggregateType.aggregate_count.id,
+            params={
+                "series": "id",
+                "labels": "service_env__service__name",
+            },
+        )
+
+    def _add_asset(self):
+        DataCenterAssetFullFactory(service_env__service__name="ServiceB")
+
+    def test_data_is_not_cached_by_default(self):
+        self.assertEqual(self.graph.get_data()["labels"], ["ServiceA"])
+        self._add_asset()
+        self.assertEqual(self.graph.get_data()["labels"], ["ServiceA", "ServiceB"])
+
+    @override_settings(DASHBOARD_GRAPH_CACHE_TIMEOUT=60)
+    def test_data_is_cached(self):
+        data = self.graph.get_data()
+        self._add_asset()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.graph.get_data(), data)
+        self.assertEqual(
+            self.graph.get_data(refresh=True)["labels"], ["ServiceA", "ServiceB"]
+        )
+
+    @override_settings(DASHBOARD_GRAPH_CACHE_TIMEOUT=60)
+    def test_cache_disabled_for_graph(self):
+        self.graph.cache_timeout = 0
+        self.graph.get_data()
+        self._add_asset()
+        self.assertEqual(self.graph.get_data()["labels"], ["ServiceA", "ServiceB"])
+
+    @override_settings(DASHBOARD_GRAPH_CACHE_TIMEOUT=60)
+    def test_data_is_recalculated_after_params_change(self):
+        self.graph.get_data()
+        self.graph.params["sort"] = "-series"
+        self._add_asset()
+        self.assertEqual(len(self.graph.get_data()["labels"]), 2)
+
+    @override_settings(DASHBOARD_GRAPH_CACHE_TIMEOUT=60)
+    def test_prefetch_graphs_data(self):
+        other_graph = GraphFactory(
+            aggregate_type=AggregateType.aggregate_count.id,
+            params={"series": "id", "labels": "hostname"},
+        )
+        self.graph.get_data()
+        graphs = prefetch_graphs_data(Graph.objects.order_by("pk"))
+        with self.assertNumQueries(0):
+            self.assertEqual(graphs[0].get_data()["labels"], ["ServiceA"])
+            self.assertEqual(graphs[1].get_data(), other_graph.get_data())
+        self.assertEqual(cache.get(other_graph.get_cache_key()), graphs[1].get_data())
+
+    def test_prefetch_graphs_data_error(self):
+        self.graph.params["series"] = ""
+        (graph,) = prefetch_graphs_data([self.graph])
+        with self.assertRaises(ValueError):
+            graph.get_data()
+
+
+@override_settings(DASHBOARD_GRAPHS_WORKERS=2)
+class GraphDataParallelCalculationTestCase(TransactionTestCase):
+    def setUp(self):
+        DataCenterAssetFullFactory.create_batch(
+            2, service_env__service__name="ServiceA"
+        )
+        self.graphs = [
+            GraphFactory(
+                aggregate_type=AggregateType.aggregate_count.id,
+                params={"series": "id", "labels": labels},
+            )
+            for labels in ["service_env__service__name", "hostname"]
+        ]
+
+    def test_graphs_data_calculated_in_parallel(self):
+        expected = [graph.get_data() for graph in self.graphs]
+        with patch(
+            "ralph.lib.parallel._call_in_separate_connection",
+            wraps=_call_in_separate_connection,
+        ) as calculate_mock:
+            graphs = prefetch_graphs_data(Graph.objects.order_by("pk"))
+        self.assertEqual([graph.get_data() for graph in graphs], expected)
+        self.assertEqual(calculate_mock.call_count, 2)
+
+    def test_graphs_data_calculated_in_parallel_in_dashboard_view(self):
+        dashboard = DashboardFactory()
+        dashboard.graphs.set(self.graphs)
+        get_user_model().objects.create_superuser(
+            username="root", password="password", email="email@email.pl"
+        )
+        self.client.login(username="root", password="password")
+        with patch(
+            "ralph.lib.parallel._call_in_separate_connection",
+            wraps=_call_in_separate_connection,
+        ) as calculate_mock:
+            response = self.client.get(reverse("dashboard_view", args=(dashboard.pk,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calculate_mock.call_count, 2)
@@ -1,11 +1,22 @@
+from django.db.transaction import non_atomic_requests
+from django.utils.decorators import classonlymethod
 from django.views.generic import TemplateView
 
-from ralph.dashboards.models import Dashboard
+from ralph.dashboards.models import Dashboard, prefetch_graphs_data
 
 
 class DashboardView(TemplateView):
     template_name = "dashboard/dashboard.html"
 
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        """
+        Don't run request atomically - dashboard is only read, and outside of
+        transaction data of graphs could be calculated in parallel (see
+        `DASHBOARD_GRAPHS_WORKERS` setting).
+        """
+        return non_atomic_requests(super().as_view(**initkwargs))
+
     def dispatch(self, request, dashboard_id, *args, **kwargs):
         self.dashboard = Dashboard.objects.get(id=dashboard_id, active=True)
         return super().dispatch(request, *args, **kwargs)
@@ -13,7 +24,10 @@ class DashboardView(TemplateView):
     def get(self, request, *args, **kwargs):
         kwargs["graphs"] = []
         rendered_graphs = ""
-        for graph in self.dashboard.graphs.filter(active=True).order_by("pk"):
+        graphs = prefetch_graphs_data(
+            self.dashboard.graphs.filter(active=True).order_by("pk")
+        )
+        for graph in graphs:
             rendered_graphs += graph.render(
                 name="dashboard_{}_graph_{}".format(self.dashboard.id, graph.id)
             )
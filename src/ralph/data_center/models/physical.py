@@ -870,9 +870,10 @@ class DataCenterAsset(
         network = Network.objects.get(pk=network_pk)
         env = network.network_environment
         with transaction.atomic():
-            for instance in instances:
+            ips = network.issue_next_free_ips(len(instances))
+            for instance, ip in zip(instances, ips):
                 ethernet = Ethernet.objects.create(base_object=instance)
-                ethernet.ipaddress = network.issue_next_free_ip()
+                ethernet.ipaddress = ip
                 ethernet.ipaddress.hostname = env.issue_next_free_hostname()
                 ethernet.ipaddress.save()
                 ethernet.save()
@@ -92,9 +92,10 @@ class Command(BaseCommand):
 
                 if line.get("report_filename_md5"):
                     try:
-                        history.attachment = Attachment.objects.get(
+                        # many attachments could share the same file
+                        history.attachment = Attachment.objects.filter(
                             md5=line.get("report_filename_md5")
-                        )
+                        ).earliest("pk")
                     except Attachment.DoesNotExist:
                         try:
                             attachment = add_attachment_from_disk(
@@ -143,7 +144,9 @@ class Command(BaseCommand):
                             username=line.get("uploaded_by")
                         )
                         try:
-                            attachment = Attachment.objects.get(md5=line.get("md5"))
+                            attachment = Attachment.objects.filter(
+                                md5=line.get("md5")
+                            ).earliest("pk")
                             content_type = ContentType.objects.get_for_model(
                                 obj._meta.model
                             )
@@ -4,9 +4,10 @@ from django.test import TestCase
 
 from ralph.back_office.models import BackOfficeAsset
 from ralph.data_center.models.physical import DataCenterAsset
+from ralph.tests.mixins import TemporaryMediaRootMixin
 
 
-class DemoDataTestCase(TestCase):
+class DemoDataTestCase(TemporaryMediaRootMixin, TestCase):
     def test_demo_data_command(self):
         management.call_command("demodata")
         self.assertEqual(DataCenterAsset.objects.count(), 422)
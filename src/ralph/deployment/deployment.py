@@ -21,14 +21,13 @@ Deployment order:
 
 import ipaddress
 import logging
-import time
 from datetime import datetime
 from functools import partial
 
 from django import forms
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -39,9 +38,11 @@ from ralph.dhcp.models import DHCPEntry, DHCPServer
 from ralph.dns.dnsaas import DNSaaS
 from ralph.dns.forms import RecordType
 from ralph.dns.views import DNSaaSIntegrationNotEnabledError
+from ralph.lib.external_services.models import JobStatus
 from ralph.lib.mixins.forms import ChoiceFieldWithOtherOption, OTHER
 from ralph.lib.transitions.decorators import transition_action
 from ralph.lib.transitions.exceptions import FreezeAsyncTransition
+from ralph.lib.transitions.models import TransitionJob, TransitionJobAction
 from ralph.networks.models import IPAddress, Network, NetworkEnvironment
 from ralph.virtual.models import VirtualServer
 
@@ -668,22 +669,71 @@ def _create_dhcp_entries_for_many_instances(instances, ip_or_network):
 def wait_for_dhcp_servers(cls, instances, **kwargs):
     """
     Wait until DHCP servers ping to Ralph.
+
+    If none of DHCP servers was synchronized since DHCP entries were created,
+    transition is frozen (releasing the worker) until the next synchronization
+    of any of them (see `unfreeze_jobs_waiting_for_dhcp_servers`).
     """
     created = kwargs["shared_params"]["dhcp_entry_created_date"]
-    # TODO: rescheduler instead of while
     network_environment_ids = []
     for ip in kwargs["shared_params"]["ip_addresses"].values():
         network_environment_ids.append(ip.network.network_environment_id)
 
-    while True:
-        servers_sync_list = DHCPServer.objects.filter(
-            Q(network_environment__isnull=True)
-            | Q(network_environment_id__in=network_environment_ids)
-        ).values_list("last_synchronized", flat=True)
-        for server_sync_date in servers_sync_list:
-            if created < server_sync_date:
-                return
-        time.sleep(1)
+    if DHCPServer.objects.filter(
+        Q(network_environment__isnull=True)
+        | Q(network_environment_id__in=network_environment_ids),
+        last_synchronized__gt=created,
+    ).exists():
+        return
+    kwargs["shared_params"]["dhcp_network_environment_ids"] = network_environment_ids
+    raise FreezeAsyncTransition()
+
+
+def _get_jobs_waiting_for_dhcp_servers():
+    """
+    Return frozen transition jobs which last action is waiting for DHCP
+    servers.
+    """
+    last_action_name = (
+        TransitionJobAction.objects.filter(transition_job=OuterRef("pk"))
+        .order_by("-pk")
+        .values("action_name")[:1]
+    )
+    return (
+        TransitionJob.objects.filter(status=JobStatus.FROZEN)
+        .annotate(last_action_name=Subquery(last_action_name))
+        .filter(last_action_name=wait_for_dhcp_servers.__name__)
+    )
+
+
+def unfreeze_jobs_waiting_for_dhcp_servers(network_environment_id=None):
+    """
+    Unfreeze all transition jobs waiting for synchronization of DHCP server
+    of network environment (every waiting job if server doesn't belong to
+    any network environment).
+
+    Returns number of unfrozen jobs.
+    """
+    unfrozen = 0
+    jobs = _get_jobs_waiting_for_dhcp_servers().select_related(
+        "transition__model__content_type"
+    )
+    for job in jobs:
+        waiting_for = job._dumped_params["shared_params"].get(
+            "dhcp_network_environment_ids", []
+        )
+        if network_environment_id is not None and (
+            network_environment_id not in waiting_for
+        ):
+            continue
+        # job could be unfrozen by synchronization of another DHCP server
+        # in the meantime
+        if TransitionJob.objects.filter(pk=job.pk, status=JobStatus.FROZEN).update(
+            status=JobStatus.QUEUED
+        ):
+            job.unfreeze()
+            unfrozen += 1
+    return unfrozen
 
 
 @deployment_action(
@@ -2,8 +2,10 @@ import datetime
 from unittest import mock
 
 from ddt import data, ddt, unpack
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.test import override_settings, TestCase
+from django.urls import reverse
 
 from ralph.assets.models import Ethernet
 from ralph.assets.tests.factories import ServiceEnvironmentFactory
@@ -11,11 +13,24 @@ from ralph.data_center.tests.factories import DataCenterAssetFactory, RackFactor
 from ralph.deployment.deployment import (
     autocomplete_service_env,
     check_if_network_environment_exists,
+    unfreeze_jobs_waiting_for_dhcp_servers,
     validate_ip_address,
 )
 from ralph.deployment.tests.factories import _get_deployment
-from ralph.deployment.utils import _render_configuration
+from ralph.deployment.utils import (
+    _get_template,
+    _render_configuration,
+    prefetch_deployment_object,
+)
 from ralph.dhcp.models import DHCPServer
+from ralph.lib.external_services.models import JobStatus
+from ralph.lib.transitions.exceptions import FreezeAsyncTransition
+from ralph.lib.transitions.models import (
+    TransitionJob,
+    TransitionJobAction,
+    TransitionJobActionStatus,
+)
+from ralph.lib.transitions.tests import TransitionTestCaseMixin
 from ralph.networks.models.networks import IPAddress, IPAddressStatus, Network
 from ralph.networks.tests.factories import (
     IPAddressFactory,
@@ -125,6 +140,34 @@ class _BaseTestDeploymentActionsTestCase(object):
         }
         self.instance.__class__.wait_for_dhcp_servers([self.instance], **kwargs)
 
+    def test_a_dhcp_servers_wait_freezes_transition(self):
+        start_date = datetime.datetime(2016, 8, 5, 1, 1, 1)
+        net = Network.objects.create(
+            name="net",
+            address="192.169.58.0/24",
+            network_environment=NetworkEnvironmentFactory(),
+        )
+        ip = IPAddress.objects.create(
+            address="192.169.58.1", status=IPAddressStatus.reserved
+        )
+        DHCPServer.objects.create(
+            ip="10.0.0.1",
+            network_environment=net.network_environment,
+            last_synchronized=start_date - datetime.timedelta(seconds=1),
+        )
+        kwargs = {
+            "shared_params": {
+                "dhcp_entry_created_date": start_date,
+                "ip_addresses": {self.instance.pk: ip},
+            }
+        }
+        with self.assertRaises(FreezeAsyncTransition):
+            self.instance.__class__.wait_for_dhcp_servers([self.instance], **kwargs)
+        self.assertEqual(
+            kwargs["shared_params"]["dhcp_network_environment_ids"],
+            [net.network_environment_id],
+        )
+
     def test_clean_ipaddresses(self):
         ip = IPAddressFactory(ethernet__base_object=self.instance)
         ip_mgmt = IPAddressFactory(
@@ -315,6 +358,90 @@ class VirtualServerDeploymentActionsTestCase(
         self.instance.parent.save()
 
 
+@mock.patch("ralph.lib.external_services.models.InternalService")
+class UnfreezeJobsWaitingForDHCPServersTestCase(TransitionTestCaseMixin, TestCase):
+    def setUp(self):
+        self.instance = DataCenterAssetFactory()
+        _, self.transition, _ = self._create_transition(
+            model=self.instance,
+            name="deploy",
+            actions=["wait_for_dhcp_servers", "deploy"],
+            async_service_name="ASYNC_TRANSITIONS",
+        )
+        self.net_env = NetworkEnvironmentFactory()
+        self.other_net_env = NetworkEnvironmentFactory()
+
+    def _create_job(self, network_environment_ids, actions=("wait_for_dhcp_servers",)):
+        job = TransitionJob.objects.create(
+            obj=self.instance,
+            transition=self.transition,
+            service_name="ASYNC_TRANSITIONS",
+            status=JobStatus.FROZEN.id,
+            _dumped_params={
+                "shared_params": {
+                    "dhcp_network_environment_ids": network_environment_ids
+                }
+            },
+        )
+        for action_name in actions:
+            TransitionJobAction.objects.create(
+                transition_job=job,
+                action_name=action_name,
+                status=TransitionJobActionStatus.FINISHED,
+            )
+        return job
+
+    def _assert_unfrozen(self, internal_service_mock, jobs):
+        self.assertCountEqual(
+            [c[1]["job_id"] for c in internal_service_mock().run_async.call_args_list],
+            [job.id for job in jobs],
+        )
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, JobStatus.QUEUED.id)
+
+    def test_jobs_waiting_for_network_environment_are_unfrozen(
+        self, internal_service_mock
+    ):
+        job = self._create_job([self.net_env.id])
+        job_of_other_env = self._create_job([self.other_net_env.id])
+        self.assertEqual(unfreeze_jobs_waiting_for_dhcp_servers(self.net_env.id), 1)
+        self._assert_unfrozen(internal_service_mock, [job])
+        job_of_other_env.refresh_from_db()
+        self.assertEqual(job_of_other_env.status, JobStatus.FROZEN.id)
+
+    def test_all_waiting_jobs_are_unfrozen_by_server_without_network_environment(
+        self, internal_service_mock
+    ):
+        jobs = [
+            self._create_job([self.net_env.id]),
+            self._create_job([self.other_net_env.id]),
+        ]
+        self.assertEqual(unfreeze_jobs_waiting_for_dhcp_servers(), 2)
+        self._assert_unfrozen(internal_service_mock, jobs)
+
+    def test_jobs_frozen_by_other_action_are_not_unfrozen(self, internal_service_mock):
+        self._create_job([self.net_env.id], actions=["wait_for_dhcp_servers", "deploy"])
+        self.assertEqual(unfreeze_jobs_waiting_for_dhcp_servers(self.net_env.id), 0)
+        internal_service_mock().run_async.assert_not_called()
+
+    def test_job_is_unfrozen_once(self, internal_service_mock):
+        job = self._create_job([self.net_env.id])
+        unfreeze_jobs_waiting_for_dhcp_servers(self.net_env.id)
+        self.assertEqual(unfreeze_jobs_waiting_for_dhcp_servers(), 0)
+        self._assert_unfrozen(internal_service_mock, [job])
+
+    def test_dhcp_sync_unfreezes_waiting_jobs(self, internal_service_mock):
+        get_user_model().objects.create_superuser("test", "test@test.test", "test")
+        self.client.login(username="test", password="test")
+        DHCPServer.objects.create(ip="127.0.0.1", network_environment=self.net_env)
+        job = self._create_job([self.net_env.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse("dhcp_config_sync"))
+        self.assertEqual(response.status_code, 200)
+        self._assert_unfrozen(internal_service_mock, [job])
+
+
 @ddt
 class AutocompleteFunctionsTestCase(TestCase):
     @unpack
@@ -371,6 +498,35 @@ class TestRender(TestCase):
         result = _render_configuration("{{service_uid}}", deploy)
         self.assertEqual(result, "None")
 
+    def test_domain_is_rendered(self):
+        deploy = _get_deployment()
+        network_environment = deploy.obj.network_environment
+        result = _render_configuration("{{domain}}", deploy)
+        self.assertEqual(
+            result, str(network_environment.domain if network_environment else None)
+        )
+
+    def test_template_is_compiled_once(self):
+        configuration = "{{hostname}} {{dc}}"
+        self.assertIs(_get_template(configuration), _get_template(configuration))
+
+    def test_related_objects_are_prefetched(self):
+        deploy = prefetch_deployment_object(_get_deployment())
+        with self.assertNumQueries(0):
+            result = _render_configuration(
+                "{{dc}} {{configuration_module}} {{service_env}} {{service_uid}}",
+                deploy,
+            )
+        self.assertEqual(
+            result,
+            "{} {} {} {}".format(
+                deploy.obj.rack.server_room.data_center.name,
+                deploy.obj.configuration_path.module.name,
+                deploy.obj.service_env,
+                deploy.obj.service_env.service.uid,
+            ),
+        )
+
 
 @ddt
 class TestRenderSlash(TestCase):
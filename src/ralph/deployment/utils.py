@@ -1,9 +1,54 @@
+from functools import lru_cache
 from urllib.parse import urljoin
 
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.template import Context, Template
 from django.urls import reverse
 
+# relations of deployed object used in rendered configuration
+DEPLOYMENT_OBJECT_RELATED_FIELDS = [
+    "configuration_path__module",
+    "service_env__service",
+    "service_env__environment",
+    "rack__server_room__data_center",
+]
+
+
+@lru_cache(maxsize=128)
+def _get_template(configuration):
+    """
+    Return compiled template of configuration (compiled templates are kept
+    by the content of configuration, so changed configuration is compiled
+    again).
+    """
+    return Template(configuration)
+
+
+def _has_field(model, field_name):
+    try:
+        model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def prefetch_deployment_object(deployment):
+    """
+    Fetch deployed object together with its relations used in configuration
+    (see `DEPLOYMENT_OBJECT_RELATED_FIELDS`) in single query.
+    """
+    model = deployment.content_type.model_class()
+    related_fields = [
+        field
+        for field in DEPLOYMENT_OBJECT_RELATED_FIELDS
+        if _has_field(model, field.split("__")[0])
+    ]
+    deployment.obj = model._base_manager.select_related(*related_fields).get(
+        pk=deployment.object_id
+    )
+    return deployment
+
 
 def _render_configuration(configuration, deployment, disable_reverse=False):
     def url(name, kwargs):
@@ -13,9 +58,14 @@ def _render_configuration(configuration, deployment, disable_reverse=False):
             )
         return reverse(name, kwargs=kwargs)
 
-    template = Template(configuration)
+    template = _get_template(configuration)
     ralph_instance = settings.RALPH_INSTANCE
     ethernet = deployment.params.get("create_dhcp_entries__ethernet")
+
+    def domain():
+        network_environment = deployment.obj.network_environment
+        return network_environment.domain if network_environment else None
+
     context = Context(
         {
             "configuration_path": str(deployment.obj.configuration_path),
@@ -107,11 +157,8 @@ def _render_configuration(configuration, deployment, disable_reverse=False):
                 ),
             ),
             "dc": deployment.obj.rack.server_room.data_center.name,
-            "domain": (
-                deployment.obj.network_environment.domain
-                if deployment.obj.network_environment
-                else None
-            ),
+            # network environment is looked up (by query) only when it's used
+            "domain": domain,
             "hostname": deployment.obj.hostname,
             "service_env": str(deployment.obj.service_env),
             "service_uid": (
@@ -6,7 +6,7 @@ from django.http import Http404, HttpResponse, HttpResponseRedirect
 from ralph.admin.helpers import get_client_ip
 from ralph.assets.models import Ethernet
 from ralph.deployment.models import Deployment, Preboot
-from ralph.deployment.utils import _render_configuration
+from ralph.deployment.utils import _render_configuration, prefetch_deployment_object
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +22,28 @@ def get_object_or_404_with_message(model, msg, logger_args, **kwargs):
         raise Http404(msg)
 
 
-def _get_preboot(deployment_id):
+def _get_deployment(deployment_id):
     error_msg = "Deployment with UUID: %s doesn't exist"
     try:
-        preboot_id = get_object_or_404_with_message(
+        return get_object_or_404_with_message(
             model=Deployment,
             msg=error_msg,
             logger_args=[deployment_id],
             id=deployment_id,
-        ).preboot
-        return Preboot.objects.get(id=preboot_id)
+        )
     except ValueError:
         logger.warning("Incorrect UUID: %s", deployment_id)
         raise SuspiciousOperation("Malformed UUID")
 
 
+def _get_deployment_preboot(deployment):
+    return Preboot.objects.get(id=deployment.preboot)
+
+
+def _get_preboot(deployment_id):
+    return _get_deployment_preboot(_get_deployment(deployment_id))
+
+
 def ipxe(request, deployment_id=None):
     """View returns boot's config for iPXE depends on client IP.
 
@@ -61,7 +68,8 @@ def ipxe(request, deployment_id=None):
     except Deployment.DoesNotExist:
         logger.warning(DEPLOYMENT_404_MSG, deployment_id)
         raise Http404
-    preboot = _get_preboot(deployment.id)
+    preboot = _get_deployment_preboot(deployment)
+    prefetch_deployment_object(deployment)
     configuration = _render_configuration(preboot.get_configuration("ipxe"), deployment)
     return HttpResponse(configuration, content_type="text/plain")
 
@@ -84,17 +92,13 @@ def config(request, deployment_id, config_type):
     Raises:
         Http404: if deployment with specified UUID doesn't exist
     """
-    preboot = _get_preboot(deployment_id)
+    deployment = _get_deployment(deployment_id)
+    preboot = _get_deployment_preboot(deployment)
     configuration = preboot.get_configuration(config_type.replace("-", "_"))
     if configuration is None:
         logger.warning("%s for deployment %s doesn't exist", config_type, deployment_id)
         raise Http404
-    deployment = get_object_or_404_with_message(
-        model=Deployment,
-        msg=DEPLOYMENT_404_MSG,
-        logger_args=[deployment_id],
-        id=deployment_id,
-    )
+    prefetch_deployment_object(deployment)
     configuration = _render_configuration(configuration, deployment)
     return HttpResponse(
         configuration.replace("\r\n", "\n").replace("\r", "\n"),
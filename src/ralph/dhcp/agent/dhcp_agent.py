@@ -5,12 +5,16 @@ import atexit
 import contextlib
 import errno
 import fcntl
+import gzip
 import hashlib
 import logging
 import os
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from io import BytesIO
 from logging import handlers as logging_handlers
 from optparse import OptionParser
 
@@ -38,6 +42,7 @@ PROTOS = ("http", "https")
 PROTO_HTTP, PROTO_HTTPS = PROTOS
 
 CACHE_LAST_MODIFIED_PREFIX = "http-last-modified"
+CACHE_ETAG_PREFIX = "http-etag"
 DEFAULT_DHCP_SERVICE_NAME = "isc-dhcp-server"
 
 
@@ -91,6 +96,34 @@ def get_url_hash(url):
     return hash_url.hexdigest()
 
 
+def get_file_hash(path):
+    """Return hash of file content or None if file doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def write_file_atomically(path, content):
+    """Write content to the file at once (using temporary file in the same
+    directory and renaming it), so DHCP server never reads partially
+    written config.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".dhcp-agent-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.rename(tmp_path, path)
+    except:  # noqa
+        os.unlink(tmp_path)
+        raise
+
+
 def convert_to_request_params(params):
     """Convert dict with into flat list.
 
@@ -297,6 +330,7 @@ class DHCPConfigManager(object):
         **kwargs,
     ):
         self.cache = cache
+        self._cache_lock = threading.Lock()
         self.logger = logger
         self.host = host
         self.key = key
@@ -312,22 +346,52 @@ class DHCPConfigManager(object):
         }
 
     def download_and_apply_configuration(self):
-        should_restart_dhcp_server = False
-        successful_list = []
+        start = time.time()
+        configurations = self._get_configurations()
+        self.logger.info("Configuration fetched in %.3fs", time.time() - start)
+        start = time.time()
+        changed_list = []
         for section in self.sections:
-            is_saved = False
-            dhcp_config = self._get_configuration(section)
+            dhcp_config = configurations[section]
             if dhcp_config:
-                is_saved = self._set_new_configuration(
+                is_changed = self._set_new_configuration(
                     dhcp_config, self.section_config_path_mapper[section]
                 )
-                successful_list.append(is_saved)
-        should_restart_dhcp_server = any(successful_list)
+                changed_list.append(is_changed)
+        self.logger.info("Configuration applied in %.3fs", time.time() - start)
 
-        if self.can_restart_dhcp_server and should_restart_dhcp_server:
+        if self.can_restart_dhcp_server and any(changed_list):
+            start = time.time()
             self._restart_dhcp_server()
+            self.logger.info("Service restarted in %.3fs", time.time() - start)
         self._send_sync_confirmation()
 
+    def _get_configurations(self):
+        """Fetches configuration of all sections concurrently.
+
+        Returns:
+            dict: configuration (or False if not fetched) for every section
+        """
+        configurations = {}
+        errors = []
+
+        def fetch(section):
+            try:
+                configurations[section] = self._get_configuration(section)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=fetch, args=(section,)) for section in self.sections
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return configurations
+
     def make_authorized_request(self, url):
         """Make request with extra headers like Authorization
         and If-Modified-Since.
@@ -335,13 +399,19 @@ class DHCPConfigManager(object):
         Headers send with request:
             - Authorization: contains token for autorization on the server,
             - If-Modified-Since: information for server about configuration's
-                last date.
+                last date,
+            - If-None-Match: ETag of the last fetched configuration,
+            - Accept-Encoding: server could send gzipped configuration.
 
         Returns:
             object: standard response object (file-like object)
         """
-        headers = {}
-        last = self.cache.get(prefix=CACHE_LAST_MODIFIED_PREFIX, key=url)
+        headers = {"Accept-Encoding": "gzip"}
+        with self._cache_lock:
+            last = self.cache.get(prefix=CACHE_LAST_MODIFIED_PREFIX, key=url)
+            etag = self.cache.get(prefix=CACHE_ETAG_PREFIX, key=url)
+        if etag:
+            headers["If-None-Match"] = etag
         if last:
             self.logger.info(
                 "Using If-Modified-Since with value {} for url {}".format(last, url)
@@ -366,6 +436,7 @@ class DHCPConfigManager(object):
         configuration = None
 
         self.logger.info("Sending request to {}".format(url))
+        start = time.time()
         try:
             response = self.make_authorized_request(url)
         except HTTPError as e:
@@ -382,14 +453,25 @@ class DHCPConfigManager(object):
             return False
         else:
             configuration = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                configuration = gzip.GzipFile(fileobj=BytesIO(configuration)).read()
             last_modified = response.headers.get("Last-Modified")
+            etag = response.headers.get("ETag")
             self.logger.info(
                 "Storing Last-Modified for url {} with value {}".format(
                     url, last_modified
                 )
             )
-            self.cache.set(
-                prefix=CACHE_LAST_MODIFIED_PREFIX, key=url, value=last_modified
+            with self._cache_lock:
+                if last_modified:
+                    self.cache.set(
+                        prefix=CACHE_LAST_MODIFIED_PREFIX, key=url, value=last_modified
+                    )
+                if etag:
+                    self.cache.set(prefix=CACHE_ETAG_PREFIX, key=url, value=etag)
+        finally:
+            self.logger.info(
+                "Request to {} finished in {:.3f}s".format(url, time.time() - start)
             )
         return configuration
 
@@ -420,22 +502,35 @@ class DHCPConfigManager(object):
     def _set_new_configuration(self, config, path_to_config=None):
         """Writes (or prints) config file.
 
+        Config file is replaced atomically and only if its content has
+        changed.
+
         Args:
-            config (string): Raw (i.e., in plain text) configuration for
+            config (bytes): Raw (i.e., in plain text) configuration for
                 DHCP server,
             path_to_config (string): The path to config file.
 
         Returns:
-            bool: True if config is saved successfully, otherwise False
+            bool: True if config is changed and saved successfully,
+                otherwise False
         """
-        try:
+        if not isinstance(config, bytes):
+            config = config.encode()
+        if path_to_config in ["-", None]:
             with open_file_or_stdout_to_writing(path_to_config) as f:
-                f.write(str(config))
+                f.write(config.decode())
+            self.logger.info("Configuration written to stdout")
+            return True
+        try:
+            if get_file_hash(path_to_config) == hashlib.md5(config).hexdigest():
                 self.logger.info(
-                    "Configuration written to {}".format(path_to_config or "stdout")
+                    "Configuration in {} not changed".format(path_to_config)
                 )
+                return False
+            write_file_atomically(path_to_config, config)
+            self.logger.info("Configuration written to {}".format(path_to_config))
             return True
-        except IOError as e:
+        except (IOError, OSError) as e:
             self.logger.error(
                 "Could not write new DHCP configuration. Error message: %s", e
             )
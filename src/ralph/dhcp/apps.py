@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+
+from ralph.apps import RalphAppConfig
+
+
+class DHCP(RalphAppConfig):
+    name = "ralph.dhcp"
+    default = True
+
+    def ready(self):
+        super().ready()
+        from ralph.dhcp.receivers import invalidate_dhcp_configs
+        from ralph.networks.signals import ip_addresses_reassigned
+
+        models = [
+            self.get_model(model_name)
+            for model_name in [
+                "DHCPEntry",
+                "DNSServer",
+                "DNSServerGroup",
+                "DNSServerGroupOrder",
+            ]
+        ] + [
+            self.apps.get_model(app_label, model_name)
+            for app_label, model_name in [
+                ("assets", "Ethernet"),
+                ("data_center", "DataCenter"),
+                ("deployment", "Deployment"),
+                ("networks", "IPAddress"),
+                ("networks", "Network"),
+                ("networks", "NetworkEnvironment"),
+            ]
+        ]
+        for model in models:
+            for signal in [post_save, post_delete]:
+                signal.connect(
+                    receiver=invalidate_dhcp_configs,
+                    sender=model,
+                    dispatch_uid="invalidate_dhcp_configs_{}".format(
+                        model._meta.label_lower
+                    ),
+                )
+        ip_addresses_reassigned.connect(receiver=invalidate_dhcp_configs)
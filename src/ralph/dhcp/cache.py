@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Materialized DHCP configs.
+
+Rendered DHCP configs (`entries.conf` and `networks.conf`) are kept in the
+(shared) cache per config type and requested DCs or environments, so polling
+DHCP servers could be answered without querying the database.
+
+Every config is stored under current generation of DHCP data. When any of
+this data (IP address, ethernet, network etc.) is changed, the generation is
+changed (after commit) and all configs requested so far are rebuilt in the
+background.
+"""
+
+import gzip
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ralph.lib.cache.generations import (
+    bump_generation,
+    get_generation,
+    schedule_once_on_commit,
+)
+from ralph.lib.external_services import InternalService
+
+logger = logging.getLogger(__name__)
+
+GENERATION_CACHE_KEY = "dhcp_config_generation"
+REGISTERED_CONFIGS_CACHE_KEY = "dhcp_config_registered"
+REBUILD_SERVICE_NAME = "DHCP_CONFIG_REBUILD"
+
+
+def _get_params_digest(config_name, dc_names, env_names):
+    params = "{}|{}|{}".format(
+        config_name, ",".join(sorted(dc_names)), ",".join(sorted(env_names))
+    )
+    return hashlib.sha1(params.encode("utf-8")).hexdigest()
+
+
+def get_config_key(config_name, dc_names, env_names):
+    """
+    Return cache key of config for given DCs or environments in the current
+    generation of DHCP data.
+
+    Notice that the generation has to be fetched before the config is rendered
+    - if DHCP data is changed in the meantime, the config is stored under
+    previous generation and will never be served.
+    """
+    return "dhcp_config:{}:{}".format(
+        get_generation(GENERATION_CACHE_KEY),
+        _get_params_digest(config_name, dc_names, env_names),
+    )
+
+
+def get_config(key):
+    return cache.get(key)
+
+
+def set_config(key, content, last_modified):
+    """
+    Store rendered config in the cache (together with its gzipped version and
+    ETag) and return it.
+    """
+    content = content.encode("utf-8")
+    config = {
+        "content": content,
+        "gzipped_content": gzip.compress(content),
+        "etag": '"{}"'.format(hashlib.sha1(content).hexdigest()),
+        "last_modified": last_modified,
+    }
+    cache.set(key, config, settings.DHCP_CONFIG_CACHE_TIMEOUT)
+    return config
+
+
+def register_config(config_name, dc_names, env_names):
+    """
+    Remember requested config to rebuild it in the background after DHCP data
+    is changed.
+    """
+    registered = cache.get(REGISTERED_CONFIGS_CACHE_KEY) or {}
+    digest = _get_params_digest(config_name, dc_names, env_names)
+    if digest not in registered:
+        registered[digest] = (config_name, sorted(dc_names), sorted(env_names))
+        cache.set(REGISTERED_CONFIGS_CACHE_KEY, registered, None)
+
+
+def rebuild_dhcp_configs():
+    """
+    Render all registered configs (missing in the current generation).
+    """
+    from ralph.dhcp.views import DHCP_CONFIG_VIEWS
+
+    registered = cache.get(REGISTERED_CONFIGS_CACHE_KEY) or {}
+    for config_name, dc_names, env_names in registered.values():
+        key = get_config_key(config_name, dc_names, env_names)
+        if get_config(key) is not None:
+            continue
+        view = DHCP_CONFIG_VIEWS[config_name]()
+        error = view.prepare(dc_names, env_names)
+        if error:
+            logger.warning("Skipping rebuild of DHCP config: %s", error)
+            continue
+        set_config(key, view.render_config(), view.last_modified)
+    logger.info("%d DHCP configs rebuilt", len(registered))
+
+
+def invalidate_dhcp_configs():
+    """
+    Change generation of DHCP data and rebuild configs in the background.
+    """
+    bump_generation(GENERATION_CACHE_KEY)
+    try:
+        InternalService(REBUILD_SERVICE_NAME).run_async()
+    except Exception:
+        # configs will be rebuilt on demand
+        logger.exception("Could not schedule rebuild of DHCP configs")
+
+
+def schedule_dhcp_configs_invalidation():
+    """
+    Invalidate DHCP configs after current transaction is committed (at most
+    once per transaction).
+    """
+    schedule_once_on_commit(invalidate_dhcp_configs)
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from ralph.dhcp.cache import schedule_dhcp_configs_invalidation
+
+
+def invalidate_dhcp_configs(sender, **kwargs):
+    """
+    Invalidate cached DHCP configs after any of DHCP data is changed.
+    """
+    if settings.DHCP_CONFIG_CACHE_ENABLED:
+        schedule_dhcp_configs_invalidation()
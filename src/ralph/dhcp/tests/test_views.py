@@ -1,13 +1,19 @@
+import gzip
 import re
+from unittest.mock import patch
 
 from ddt import data, ddt, unpack
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.http import http_date
 
 from ralph.assets.tests.factories import EthernetFactory
 from ralph.data_center.tests.factories import DataCenterAssetFactory
+from ralph.dhcp.cache import rebuild_dhcp_configs
 from ralph.dhcp.models import DHCPEntry
 from ralph.dhcp.views import DHCPEntriesView
 from ralph.networks.models.networks import Network
@@ -169,3 +175,111 @@ class DHCPEntriesViewTest(TestCase):
         self.assertEqual(DHCPEntry.objects.count(), 3)
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0].pk, ip.pk)
+
+
+@override_settings(DHCP_CONFIG_CACHE_ENABLED=True)
+@patch("ralph.dhcp.cache.InternalService")
+class DHCPConfigCacheTest(TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        get_user_model().objects.create_superuser("test", "test@test.test", "test")
+        self.client.login(username="test", password="test")
+        self.network = NetworkFactory(address="192.168.1.0/24")
+        self.ip = IPAddressFactory(
+            address="192.168.1.2", hostname="host1.mydc.net", dhcp_expose=True
+        )
+        self.url = "{}?env={}".format(
+            reverse("dhcp_config_entries"), self.network.network_environment
+        )
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def _get_dhcp_queries(self, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, **kwargs)
+        return response, [
+            query["sql"]
+            for query in queries
+            if "networks_" in query["sql"] or "assets_" in query["sql"]
+        ]
+
+    def test_cached_config_is_returned_without_querying_dhcp_data(self, service_mock):
+        response, queries = self._get_dhcp_queries()
+        self.assertTrue(queries)
+        cached_response, queries = self._get_dhcp_queries()
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertIn("host1.mydc.net", response.content.decode())
+        self.assertEqual(queries, [])
+
+    def test_cached_config_requires_authentication(self, service_mock):
+        self.client.get(self.url)
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_config_should_return_304_when_etag_matches(self, service_mock):
+        etag = self.client.get(self.url)["ETag"]
+        response, queries = self._get_dhcp_queries(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, [])
+
+    def test_config_should_return_304_when_weak_or_any_etag_matches(self, service_mock):
+        etag = self.client.get(self.url)["ETag"]
+        for if_none_match in ['"other", W/{}'.format(etag), "*"]:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(response.status_code, 304)
+
+    def test_config_should_return_200_when_etag_does_not_match(self, service_mock):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag[:-2] + '"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_config_is_not_gzipped_when_refused(self, service_mock):
+        content = self.client.get(self.url).content
+        for accept_encoding in ["gzip;q=0, deflate", "identity", "*;q=0"]:
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertEqual(response.content, content)
+
+    def test_config_is_gzipped_when_accepted(self, service_mock):
+        content = self.client.get(self.url).content
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), content)
+
+    def test_config_is_rebuilt_after_dhcp_data_change(self, service_mock):
+        etag = self.client.get(self.url)["ETag"]
+        service_mock.reset_mock()
+        with transaction.atomic():
+            self.ip.hostname = "host2.mydc.net"
+            self.ip.save()
+            self.ip.ethernet.save()
+        service_mock.assert_called_once_with("DHCP_CONFIG_REBUILD")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("host2.mydc.net", response.content.decode())
+
+    def test_config_is_not_invalidated_after_rollback(self, service_mock):
+        self.client.get(self.url)
+        service_mock.reset_mock()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.ip.hostname = "host2.mydc.net"
+                self.ip.save()
+                raise ValueError()
+        service_mock.assert_not_called()
+        response, queries = self._get_dhcp_queries()
+        self.assertEqual(queries, [])
+
+    def test_rebuild_dhcp_configs_renders_requested_configs(self, service_mock):
+        self.client.get(self.url)
+        self.ip.hostname = "host2.mydc.net"
+        self.ip.save()
+        rebuild_dhcp_configs()
+        response, queries = self._get_dhcp_queries()
+        self.assertIn("host2.mydc.net", response.content.decode())
+        self.assertEqual(queries, [])
@@ -1,5 +1,8 @@
 import logging
+from functools import partial
 
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Count, Prefetch
 from django.http import (
     HttpResponse,
@@ -7,6 +10,8 @@ from django.http import (
     HttpResponseNotFound,
     HttpResponseNotModified,
 )
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.utils.http import http_date, parse_http_date_safe
 from django.views.generic.base import TemplateView
 from rest_framework.views import APIView
@@ -14,8 +19,11 @@ from rest_framework.views import APIView
 from ralph.admin.helpers import get_client_ip
 from ralph.assets.models.components import Ethernet
 from ralph.data_center.models import DataCenter
+from ralph.deployment.deployment import unfreeze_jobs_waiting_for_dhcp_servers
 from ralph.deployment.models import Deployment
+from ralph.dhcp.cache import get_config, get_config_key, register_config, set_config
 from ralph.dhcp.models import DHCPEntry, DHCPServer, DNSServer
+from ralph.lib.api.utils import accepts_gzip
 from ralph.networks.models.networks import IPAddress, Network, NetworkEnvironment
 
 logger = logging.getLogger(__name__)
@@ -55,6 +63,7 @@ class LastModifiedMixin(object):
 
 class DHCPConfigMixin(object):
     content_type = "text/plain"
+    config_name = None
 
     @staticmethod
     def check_objects_existence_by_names(model_class, names):
@@ -62,28 +71,17 @@ class DHCPConfigMixin(object):
         not_found = set(names) - set([obj.name for obj in found])
         return found, not_found
 
-    def dispatch(self, request, *args, **kwargs):
-        dc_names = request.GET.getlist("dc", None)
-        env_names = request.GET.getlist("env", None)
-        if dc_names and env_names:
-            return HttpResponseBadRequest(
-                "Only DC or ENV mode available.", content_type=self.content_type
-            )
-
-        if not (dc_names or env_names):
-            return HttpResponseBadRequest(
-                "Please specify DC or ENV.", content_type=self.content_type
-            )
-
+    def prepare(self, dc_names, env_names):
+        """
+        Find networks (and their last modification date) for given DCs or
+        environments. Return error message if any of them doesn't exist.
+        """
         if dc_names:
             found, not_found = self.check_objects_existence_by_names(
                 DataCenter, dc_names
             )
             if not_found:
-                return HttpResponseNotFound(
-                    "DC: {} doesn't exists.".format(", ".join(not_found)),
-                    content_type="text/plain",
-                )
+                return "DC: {} doesn't exists.".format(", ".join(not_found))
 
             environments = NetworkEnvironment.objects.filter(data_center__in=found)
         elif env_names:
@@ -91,18 +89,67 @@ class DHCPConfigMixin(object):
                 NetworkEnvironment, env_names
             )
             if not_found:
-                return HttpResponseNotFound(
-                    "ENV: {} doesn't exists.".format(", ".join(not_found)),
-                    content_type="text/plain",
-                )
+                return "ENV: {} doesn't exists.".format(", ".join(not_found))
             environments = found
         self.networks = Network.objects.select_related("network_environment").filter(
             network_environment__in=environments,
             dhcp_broadcast=True,
         )
         self.last_modified = self.get_last_modified(self.networks)
+
+    def render_config(self):
+        return render_to_string(self.template_name, self.get_context_data())
+
+    def dispatch(self, request, *args, **kwargs):
+        dc_names = request.GET.getlist("dc", None)
+        env_names = request.GET.getlist("env", None)
+        if dc_names and env_names:
+            return HttpResponseBadRequest(
+                "Only DC or ENV mode available.", content_type=self.content_type
+            )
+
+        if not (dc_names or env_names):
+            return HttpResponseBadRequest(
+                "Please specify DC or ENV.", content_type=self.content_type
+            )
+
+        self.config = None
+        if settings.DHCP_CONFIG_CACHE_ENABLED:
+            self.config_key = get_config_key(self.config_name, dc_names, env_names)
+            self.config = get_config(self.config_key)
+        if self.config is not None:
+            # served from the cache, without querying the database
+            self.last_modified = self.config["last_modified"]
+        else:
+            error = self.prepare(dc_names, env_names)
+            if error:
+                return HttpResponseNotFound(error, content_type="text/plain")
+            if settings.DHCP_CONFIG_CACHE_ENABLED:
+                register_config(self.config_name, dc_names, env_names)
         return super().dispatch(request, *args, **kwargs)
 
+    def get(self, request, *args, **kwargs):
+        if not settings.DHCP_CONFIG_CACHE_ENABLED:
+            return super().get(request, *args, **kwargs)
+        if self.config is None:
+            self.config = set_config(
+                self.config_key, self.render_config(), self.last_modified
+            )
+        # respond with 304 Not Modified if ETag from If-None-Match matches
+        response = get_conditional_response(request, etag=self.config["etag"])
+        if response is None and accepts_gzip(request):
+            response = HttpResponse(
+                self.config["gzipped_content"], content_type=self.content_type
+            )
+            response["Content-Encoding"] = "gzip"
+        elif response is None:
+            response = HttpResponse(
+                self.config["content"], content_type=self.content_type
+            )
+        response["ETag"] = self.config["etag"]
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
 
 class DHCPSyncView(APIView):
     def get(self, request, *args, **kwargs):
@@ -112,11 +159,22 @@ class DHCPSyncView(APIView):
             return HttpResponseNotFound(
                 "DHCP server doesn't exist.", content_type="text/plain"
             )
+        network_environment_id = (
+            DHCPServer.objects.filter(ip=ip)
+            .values_list("network_environment_id", flat=True)
+            .first()
+        )
+        # resume transitions waiting for this server when synchronization
+        # date is already committed
+        transaction.on_commit(
+            partial(unfreeze_jobs_waiting_for_dhcp_servers, network_environment_id)
+        )
         return HttpResponse("OK", content_type="text/plain")
 
 
 class DHCPEntriesView(DHCPConfigMixin, LastModifiedMixin, TemplateView, APIView):
     http_method_names = ["get"]
+    config_name = "entries"
     template_name = "dhcp/entries.conf"
 
     def get_last_modified(self, networks):
@@ -179,6 +237,7 @@ class DHCPEntriesView(DHCPConfigMixin, LastModifiedMixin, TemplateView, APIView)
 
 
 class DHCPNetworksView(DHCPConfigMixin, LastModifiedMixin, TemplateView, APIView):
+    config_name = "networks"
     template_name = "dhcp/networks.conf"
 
     def get_last_modified(self, networks):
@@ -226,3 +285,8 @@ class DHCPNetworksView(DHCPConfigMixin, LastModifiedMixin, TemplateView, APIView
             }
         )
         return context
+
+
+DHCP_CONFIG_VIEWS = {
+    view.config_name: view for view in [DHCPEntriesView, DHCPNetworksView]
+}
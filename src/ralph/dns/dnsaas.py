@@ -3,7 +3,7 @@ import json
 import logging
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import List, Optional, Tuple, Union
+from typing import Iterable, List, Optional, Set, Tuple, Union
 from urllib.parse import parse_qs, urlencode, urljoin, urlsplit
 
 import requests
@@ -165,6 +165,25 @@ class DNSaaS:
                 )
         return sorted(dns_records, key=lambda x: x["type"])
 
+    def get_ips_with_a_records(self, ipaddresses: Iterable[str]) -> Set[str]:
+        """
+        Return addresses (out of `ipaddresses`) which have A record in DNSaaS.
+        All addresses are checked using single (paginated) API call.
+        """
+        ipaddresses = set(ipaddresses)
+        if not ipaddresses:
+            return set()
+        url = self.build_url(
+            "records",
+            get_params=[("size", "100"), ("type", "A")]
+            + [("ip", ip) for ip in sorted(ipaddresses)],
+        )
+        return {
+            item["content"]
+            for item in self.get_api_result(url)
+            if item["type"] == "A" and item["content"] in ipaddresses
+        }
+
     def update_dns_record(self, record: dict) -> Optional[dict]:
         """
         Update DNS Record in DNSAAS
@@ -342,3 +361,17 @@ class DNSaaS:
                 str(response_data),
                 ip_record_data,
             )
+
+
+_shared_client = None
+
+
+def get_shared_dnsaas_client() -> DNSaaS:
+    """
+    Return DNSaaS client shared within the process, to reuse its OAuth token
+    (renewed when expired) and HTTP connections between calls.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = DNSaaS()
+    return _shared_client
@@ -41,6 +41,25 @@ class TestGetDnsRecords(TestCase):
         self.assertEqual(found_dns[0]["name"], data["name"])
         self.assertEqual(found_dns[0]["type"], RecordType.a)
 
+    @override_settings(DNSAAS_URL="http://dnsaas.com/")
+    @patch.object(DNSaaS, "get_api_result")
+    def test_get_ips_with_a_records(self, mocked):
+        mocked.return_value = [
+            {"content": "192.168.0.1", "name": "1.test.pl", "type": "A", "id": 1},
+            {"content": "1.test.pl", "name": "192.168.0.2", "type": "PTR", "id": 2},
+        ]
+        found_ips = self.dnsaas.get_ips_with_a_records(["192.168.0.2", "192.168.0.1"])
+        self.assertEqual(found_ips, {"192.168.0.1"})
+        mocked.assert_called_once_with(
+            "http://dnsaas.com/api/records/"
+            "?size=100&type=A&ip=192.168.0.1&ip=192.168.0.2"
+        )
+
+    @patch.object(DNSaaS, "get_api_result")
+    def test_get_ips_with_a_records_when_no_ipaddress(self, mocked):
+        self.assertEqual(self.dnsaas.get_ips_with_a_records([]), set())
+        mocked.assert_not_called()
+
     @override_settings(DNSAAS_URL="http://dnsaas.com/")
     def test_build_url(self):
         self.assertEqual(
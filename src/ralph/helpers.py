@@ -43,6 +43,29 @@ def generate_pdf_response(pdf_data, file_name):
     return response
 
 
+def iterate_in_chunks(queryset, chunk_size=1000):
+    """
+    Iterate over queryset in chunks ordered by primary key.
+
+    Every chunk is fetched in a separate (keyset-paginated) query, together
+    with related objects prefetched for it, so memory usage doesn't depend
+    on the number of objects (unlike iterating over the queryset, which
+    fetches all rows at once when server-side cursors are not used, ex. on
+    MySQL).
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            break
+        last_pk = chunk[-1].pk
+
+
 CACHE_DEFAULT = object()
 
 
@@ -1,16 +1,41 @@
+import json
 import logging
 from collections import OrderedDict
 
+import msgpack
+from django.core.serializers.json import DjangoJSONEncoder
 from django.urls import NoReverseMatch
 from django.utils.encoding import force_str
 from rest_framework.metadata import SimpleMetadata
 from rest_framework.relations import ManyRelatedField, RelatedField
-from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
 from rest_framework.reverse import reverse
 
 logger = logging.getLogger(__name__)
 
 
+def accepts_gzip(request):
+    """
+    Return True if gzip content coding is acceptable for the client, according
+    to (q-values of) Accept-Encoding header.
+    """
+    qvalues = {}
+    for item in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding.lower()] = qvalue
+    return qvalues.get("gzip", qvalues.get("x-gzip", qvalues.get("*", 0))) > 0
+
+
 def get_list_view_name(model):
     """
     Return list view name for model.
@@ -129,3 +154,34 @@ def renderer_classes_without_form(renderer_classes):
                 yield OnlyRawBrowsableAPIRenderer
 
     return [rc for rc in _gen()]
+
+
+class JSONLinesRenderer(BaseRenderer):
+    """
+    Render single object as a line of JSON (used to stream many objects, one
+    per line).
+    """
+
+    media_type = "application/x-ndjson"
+    format = "jsonl"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (
+            json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
+        ).encode("utf-8")
+
+
+class MsgpackRenderer(BaseRenderer):
+    """
+    Render single object using MessagePack (used to stream many objects, one
+    after another).
+    """
+
+    media_type = "application/x-msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return msgpack.packb(data, use_bin_type=True)
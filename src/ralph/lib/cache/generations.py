@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Generations of cached data.
+
+Data derived from the database (rendered configs, snapshots etc.) is kept in
+the cache under keys containing current generation of the source data. When
+source data is changed, the generation is bumped (after commit), so data
+cached in the previous generation will never be used (and expires).
+"""
+
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_generation(key):
+    """
+    Return current generation stored in the cache under `key` (new one is
+    created when it's missing).
+    """
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key):
+    """
+    Change generation stored in the cache under `key`.
+    """
+    cache.set(key, uuid4().hex, None)
+
+
+def _is_scheduled_on_commit(connection, func):
+    # every callback is stored by Django as (savepoint ids, func, robust)
+    return any(callback[1] is func for callback in connection.run_on_commit)
+
+
+def schedule_once_on_commit(func):
+    """
+    Call `func` after current transaction is committed, unless it's already
+    scheduled in this transaction (outside of transaction `func` is called
+    immediately).
+    """
+    connection = transaction.get_connection()
+    # callbacks are discarded by Django when transaction is rolled back
+    if connection.in_atomic_block and _is_scheduled_on_commit(connection, func):
+        return
+    transaction.on_commit(func)
@@ -30,6 +30,7 @@ from __future__ import unicode_literals
 
 from functools import partial
 from textwrap import dedent
+from types import MappingProxyType
 
 import six
 
@@ -177,24 +178,25 @@ class Choice(ChoicesEntry):
         return result
 
 
-def _getter(name, given, returns, found, getter):
+def _getter(name, given, returns, index, getter):
     def impl(
         cls,
         id,
-        found=lambda id, k, v: False,
+        index="__ids__",
         getter=lambda id, k, v: None,
         fallback=unset,
     ):
         """Unless `fallback` is set, raises ValueError if name not present."""
-        for k, v in cls.__dict__.items():
-            if isinstance(v, ChoicesEntry) and found(id, k, v):
-                return getter(id, k, v)
-        if fallback is unset:
-            raise ValueError("Nothing found for '{}'.".format(id))
-        else:
+        try:
+            k, v = getattr(cls, index)[id]
+        except (KeyError, TypeError):
+            # TypeError is raised for unhashable `id`
+            if fallback is unset:
+                raise ValueError("Nothing found for '{}'.".format(id))
             return fallback
+        return getter(id, k, v)
 
-    function = partial(impl, found=found, getter=getter)
+    function = partial(impl, index=index, getter=getter)
     function.__name__ = name
     function.__doc__ = (
         "Choices.{name}({given}, fallback=unset) -> {returns}"
@@ -244,6 +246,17 @@ class _ChoicesMeta(type):
                 classDict[choice._ChoicesEntry__raw_name] = choice
         classDict["__groups__"] = groups
         classDict["__choices__"] = values
+        # indexes of entries (choices and groups) declared in the class by id
+        # and attribute name, for getters; when many entries have the same id,
+        # the first declared one is used
+        ids = {}
+        names = {}
+        for k, v in classDict.items():
+            if isinstance(v, ChoicesEntry):
+                ids.setdefault(v.id, (k, v))
+                names[k] = (k, v)
+        classDict["__ids__"] = MappingProxyType(ids)
+        classDict["__names__"] = MappingProxyType(names)
         return type.__new__(meta, classname, bases, classDict)
 
 
@@ -293,7 +306,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "from_name",
         given="name",
         returns="choice object",
-        found=lambda id, k, v: k == id,
+        index="__names__",
         getter=lambda id, k, v: v,
     )
 
@@ -301,7 +314,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "id_from_name",
         given="name",
         returns="id",
-        found=lambda id, k, v: k == id,
+        index="__names__",
         getter=lambda id, k, v: v.id,
     )
 
@@ -309,7 +322,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "desc_from_name",
         given="name",
         returns="localized description string",
-        found=lambda id, k, v: k == id,
+        index="__names__",
         getter=lambda id, k, v: v.desc,
     )
 
@@ -317,7 +330,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "raw_from_name",
         given="name",
         returns="raw description string",
-        found=lambda id, k, v: k == id,
+        index="__names__",
         getter=lambda id, k, v: v.raw,
     )
 
@@ -325,7 +338,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "from_id",
         given="id",
         returns="choice object",
-        found=lambda id, k, v: v.id == id,
+        index="__ids__",
         getter=lambda id, k, v: v,
     )
 
@@ -333,7 +346,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "name_from_id",
         given="id",
         returns="attribute name",
-        found=lambda id, k, v: v.id == id,
+        index="__ids__",
         getter=lambda id, k, v: k,
     )
 
@@ -341,7 +354,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "desc_from_id",
         given="id",
         returns="localized description string",
-        found=lambda id, k, v: v.id == id,
+        index="__ids__",
         getter=lambda id, k, v: v.desc,
     )
 
@@ -349,7 +362,7 @@ class Choices(six.with_metaclass(_ChoicesMeta, list)):
         "raw_from_id",
         given="id",
         returns="raw description string",
-        found=lambda id, k, v: v.id == id,
+        index="__ids__",
         getter=lambda id, k, v: v.raw,
     )
 
@@ -659,16 +672,11 @@ def _language_lookup_getter(overrides, getter):
         attempted) before raising ValueError or returning the fallback value.
         """
         name = name.replace("-", "_")
-        name_generic = name.split("_")[0]
-        if name_generic == name:
-            name_generic = None
-        for k, v in cls.__dict__.items():
-            exact_match = k == name
-            generic_match = name_generic and k == name_generic
-            if isinstance(v, ChoicesEntry) and exact_match or generic_match:
-                return getter(v)
+        for lookup_name in (name, name.split("_")[0]):
+            if lookup_name in cls.__names__:
+                return getter(cls.__names__[lookup_name][1])
         if fallback is unset:
-            raise ValueError("Nothing found for '{}'.".format(id))
+            raise ValueError("Nothing found for '{}'.".format(name))
         else:
             return fallback
 
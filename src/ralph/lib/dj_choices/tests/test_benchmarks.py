@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from django.test import SimpleTestCase
+
+from ralph.lib.dj_choices import ChoicesEntry, Country, Language
+from ralph.tests.benchmarks import benchmark, measure
+
+
+def legacy_from_id(choices_class, id):
+    """
+    Previous implementation of `Choices.from_id` (linear scan over class
+    attributes).
+    """
+    for k, v in choices_class.__dict__.items():
+        if isinstance(v, ChoicesEntry) and v.id == id:
+            return v
+    raise ValueError("Nothing found for '{}'.".format(id))
+
+
+@benchmark
+class ChoicesGettersBenchmark(SimpleTestCase):
+    """
+    Compare lookups of all choices of big choices classes (ex. in every cell
+    of a table) using previous implementation of getters and current one.
+    """
+
+    repeat = 100
+
+    def _lookup(self, name, choices_class, from_id):
+        ids = [choice.id for choice in choices_class.__choices__]
+        with measure(
+            "{} {} lookup".format(choices_class.__name__, name),
+            scale=1 / (self.repeat * len(ids)),
+        ):
+            for _ in range(self.repeat):
+                result = [from_id(id) for id in ids]
+        return result
+
+    def test_from_id(self):
+        for choices_class in [Country, Language]:
+            legacy = self._lookup(
+                "legacy", choices_class, lambda id: legacy_from_id(choices_class, id)
+            )
+            current = self._lookup("current", choices_class, choices_class.from_id)
+            self.assertEqual(current, legacy)
+            self.assertEqual(current, list(choices_class.__choices__))
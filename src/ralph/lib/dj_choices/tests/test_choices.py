@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from django.test import SimpleTestCase
+
+from ralph.lib.dj_choices import ChoicesEntry, Country, Gender, Language
+
+
+def scan(choices_class, found):
+    """
+    Find entry of choices class by scanning all its attributes (as getters
+    did before indexes were introduced).
+    """
+    for k, v in choices_class.__dict__.items():
+        if isinstance(v, ChoicesEntry) and found(k, v):
+            return k, v
+    raise ValueError()
+
+
+class ChoicesGettersTest(SimpleTestCase):
+    def test_getters_by_id(self):
+        for choices_class in [Country, Gender, Language]:
+            for choice in choices_class.__choices__ + choices_class.__groups__:
+                k, v = scan(choices_class, lambda k, v: v.id == choice.id)
+                self.assertIs(choices_class.from_id(choice.id), v)
+                self.assertEqual(choices_class.name_from_id(choice.id), k)
+                self.assertEqual(choices_class.raw_from_id(choice.id), v.raw)
+
+    def test_getters_by_name(self):
+        for choices_class in [Country, Gender]:
+            for choice in choices_class.__choices__:
+                _, v = scan(choices_class, lambda k, v: k == choice.name)
+                self.assertIs(choices_class.from_name(choice.name), v)
+                self.assertEqual(choices_class.id_from_name(choice.name), v.id)
+
+    def test_group_is_returned_for_shared_id(self):
+        self.assertIs(Country.from_id(300), Country.UNITED_KINGDOM)
+
+    def test_getter_with_choice_as_id(self):
+        self.assertIs(Gender.from_id(Gender.male), Gender.male)
+
+    def test_not_found(self):
+        for lookup in [
+            lambda **kwargs: Gender.from_id(100, **kwargs),
+            lambda **kwargs: Gender.from_id("1", **kwargs),
+            lambda **kwargs: Gender.from_id([1], **kwargs),
+            lambda **kwargs: Gender.from_name("other", **kwargs),
+            lambda **kwargs: Gender.desc_from_name(None, **kwargs),
+            lambda **kwargs: Language.from_name("xx-yy", **kwargs),
+        ]:
+            with self.assertRaises(ValueError):
+                lookup()
+            self.assertIsNone(lookup(fallback=None))
+
+    def test_language_from_name(self):
+        self.assertIs(Language.from_name("pl"), Language.pl)
+        self.assertIs(Language.from_name("pl-pl"), Language.pl)
+        self.assertIs(Language.from_name("pt-br"), Language.pt_br)
+        self.assertEqual(Language.id_from_name("zh-tw"), Language.zh_tw.id)
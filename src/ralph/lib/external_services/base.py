@@ -1,4 +1,5 @@
 import time
+from datetime import timedelta
 
 from rq import job
 import pickle
@@ -55,6 +56,21 @@ class ExternalService(object):
         job = self.queue.enqueue(self.method, kwargs=kwargs)
         return job
 
+    def run_async_in(self, delay, **kwargs):
+        """Run function asynchronously after `delay` seconds.
+
+        Job is put into the scheduled jobs registry of the queue and enqueued
+        by the RQ scheduler when it's due (worker has to be started with
+        `--with-scheduler` option). If delay is not positive or queue is not
+        asynchronous, job is enqueued immediately.
+        """
+        if delay <= 0 or not self.queue.is_async:
+            return self.run_async(**kwargs)
+        job = self.queue.enqueue_in(
+            timedelta(seconds=delay), self.method, kwargs=kwargs
+        )
+        return job
+
 
 class InternalService(ExternalService):
     """
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("external_services", "0003_auto_20160804_1447"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="rescheduled",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import logging
+import random
 import uuid
+from collections import defaultdict
 from datetime import date
 
 from dateutil.parser import parse
@@ -11,7 +13,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import models, transaction
 from django.db.models.query import QuerySet
 from django.utils.translation import gettext_lazy as _
-from django_extensions.db.fields.json import JSONField
+from django_extensions.db.fields.json import dumps, JSONField, loads
 
 from ralph.lib.external_services.base import InternalService
 from ralph.lib.metrics import statsd
@@ -53,15 +55,18 @@ class JobQuerySet(models.QuerySet):
         return self.exclude(status__in=JOB_NOT_ENDED_STATUSES)
 
 
+def _get_metric_name(job, action):
+    return EXTERNAL_JOBS_METRIC_NAME_TMPL.format(
+        prefix=EXTERNAL_JOBS_METRIC_PREFIX,
+        job_name=job._get_metric_name(),
+        action=action,
+    )
+
+
 def collect_metrics(action):
     def wrapper(func):
         def wrapped(job, *args, **kwargs):
-            metric_name = EXTERNAL_JOBS_METRIC_NAME_TMPL.format(
-                prefix=EXTERNAL_JOBS_METRIC_PREFIX,
-                job_name=job._get_metric_name(),
-                action=action,
-            )
-            statsd.incr(metric_name)
+            statsd.incr(_get_metric_name(job, action))
             return func(job, *args, **kwargs)
 
         return wrapped
@@ -69,6 +74,23 @@ def collect_metrics(action):
     return wrapper
 
 
+def get_reschedule_delay(rescheduled):
+    """
+    Return delay (in seconds) of the next run of job already rescheduled
+    `rescheduled` times.
+
+    Delay grows exponentially (starting from `JOB_RESCHEDULE_BASE_DELAY`, up to
+    `JOB_RESCHEDULE_MAX_DELAY`) and is randomly shortened by at most
+    `JOB_RESCHEDULE_JITTER` part of it, so jobs rescheduled at the same time
+    are not run again all at once.
+    """
+    delay = min(
+        settings.JOB_RESCHEDULE_BASE_DELAY * 2 ** min(rescheduled, 32),
+        settings.JOB_RESCHEDULE_MAX_DELAY,
+    )
+    return delay * (1 - settings.JOB_RESCHEDULE_JITTER * random.random())
+
+
 class Job(TimeStampMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     username = NullableCharField(max_length=200, null=True, blank=True)
@@ -79,6 +101,8 @@ class Job(TimeStampMixin):
         choices=JobStatus(),
         default=JobStatus.QUEUED.id,
     )
+    # number of subsequent reschedules of the job (used for backoff)
+    rescheduled = models.PositiveIntegerField(default=0, editable=False)
     _params = None
     objects = JobQuerySet.as_manager()
 
@@ -138,10 +162,30 @@ class Job(TimeStampMixin):
         return self.service_name
 
     def _update_dumped_params(self):
-        # re-save job to store updated params in DB
-        self._dumped_params = self.prepare_params(**self.params)
+        """
+        Update dumped params with params changed by the job.
+
+        Returns True if dumped params were changed (and have to be saved).
+        """
+        if self._params is None:
+            # params weren't even restored, so they couldn't be changed
+            return False
+        dumped_params = self.prepare_params(**self.params)
+        # compare params as they are stored in DB
+        if loads(dumps(dumped_params)) == loads(dumps(self._dumped_params)):
+            return False
+        self._dumped_params = dumped_params
         logger.debug("Updating _dumped_params to {}".format(self._dumped_params))
-        self.save()
+        return True
+
+    def _save_with_params(self, *fields):
+        """
+        Save fields of the job (and dumped params, if they were changed).
+        """
+        update_fields = ["modified", *fields]
+        if self._update_dumped_params():
+            update_fields.append("_dumped_params")
+        self.save(update_fields=update_fields)
 
     @collect_metrics("start")
     def start(self):
@@ -155,21 +199,30 @@ class Job(TimeStampMixin):
     @collect_metrics("reschedule")
     def reschedule(self):
         """
-        Reschedule the same job again.
+        Reschedule the same job again (delayed with exponential backoff).
         """
-        # TODO: use rq scheduler
-        self._update_dumped_params()
-        logger.info("Rescheduling {}".format(self))
+        delay = get_reschedule_delay(self.rescheduled)
+        self.rescheduled += 1
+        self._save_with_params("rescheduled")
+        statsd.timing(_get_metric_name(self, "reschedule_depth"), self.rescheduled)
+        logger.info("Rescheduling {} in {:.1f}s".format(self, delay))
         service = InternalService(self.service_name)
-        job = service.run_async(job_id=self.id)
+        job = service.run_async_in(delay, job_id=self.id)
         return job
 
+    def reset_reschedules(self):
+        """
+        Reset backoff of rescheduling job (when it makes progress).
+        """
+        if self.rescheduled:
+            self.rescheduled = 0
+            type(self)._default_manager.filter(pk=self.pk).update(rescheduled=0)
+
     @collect_metrics("freeze")
     def freeze(self):
-        self._update_dumped_params()
         logger.info("Freezing job {}".format(self))
         self.status = JobStatus.FROZEN
-        self.save()
+        self._save_with_params("status")
 
     @collect_metrics("unfreeze")
     def unfreeze(self):
@@ -189,20 +242,18 @@ class Job(TimeStampMixin):
         """
         Mark job as failed.
         """
-        self._update_dumped_params()
         logger.info("Job {} has failed. Reason: {}".format(self, reason))
         self.status = JobStatus.FAILED
-        self.save()
+        self._save_with_params("status")
 
     @collect_metrics("success")
     def success(self):
         """
         Mark job as successfuly ended.
         """
-        self._update_dumped_params()
         logger.info("Job {} has succeeded".format(self))
         self.status = JobStatus.FINISHED
-        self.save()
+        self._save_with_params("status")
 
     @classmethod
     def prepare_params(cls, **kwargs):
@@ -240,9 +291,13 @@ class Job(TimeStampMixin):
         if isinstance(obj, (list, tuple, set)):
             result = [cls.dump_obj_to_jsonable(p) for p in obj]
         elif isinstance(obj, QuerySet):
+            if obj._result_cache is None:
+                pks = list(obj.values_list("pk", flat=True))
+            else:
+                pks = [i.pk for i in obj]
             result = {
                 "__django_queryset": True,
-                "value": [i.pk for i in obj],
+                "value": pks,
                 "content_type_id": ContentType.objects.get_for_model(obj.model).pk,
             }
         elif isinstance(obj, date):
@@ -265,13 +320,57 @@ class Job(TimeStampMixin):
         return cls._restore_django_models(obj)
 
     @classmethod
-    def _restore_django_models(cls, obj):
+    def _collect_django_models(cls, obj, references):
+        """
+        Collect primary keys of Django objects (by content type id) from dump
+        created with `dump_obj_to_jsonable`.
+        """
+        if isinstance(obj, (list, tuple)):
+            for p in obj:
+                cls._collect_django_models(p, references)
+        elif isinstance(obj, dict):
+            if obj.get("__django_model") is True:
+                references[obj["content_type_id"]].add(obj["object_pk"])
+            elif obj.get("__date") is not True and (
+                obj.get("__django_queryset") is not True
+            ):
+                for v in obj.values():
+                    cls._collect_django_models(v, references)
+        return references
+
+    @classmethod
+    def _load_django_models(cls, obj):
+        """
+        Load all Django objects from dump, using single query for every
+        content type.
+
+        Returns dict from (content type id, dumped pk) to object.
+        """
+        objects = {}
+        references = cls._collect_django_models(obj, defaultdict(set))
+        for content_type_id, pks in references.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            pk_field = model._meta.pk
+            loaded = model._base_manager.in_bulk([pk_field.to_python(pk) for pk in pks])
+            for pk in pks:
+                instance = loaded.get(pk_field.to_python(pk))
+                if instance is not None:
+                    objects[(content_type_id, pk)] = instance
+        return objects
+
+    @classmethod
+    def _restore_django_models(cls, obj, objects=None):
         """
         Restore Django objects from dump created with `dump_obj_to_jsonable`
+
+        All objects are loaded at once (see `_load_django_models`), so the same
+        object dumped in many places is restored as single instance.
         """
+        if objects is None:
+            objects = cls._load_django_models(obj)
         result = obj
         if isinstance(obj, (list, tuple)):
-            result = [cls._restore_django_models(p) for p in obj]
+            result = [cls._restore_django_models(p, objects) for p in obj]
         elif isinstance(obj, dict):
             if obj.get("__date") is True:
                 result = parse(obj.get("value")).date()
@@ -279,10 +378,13 @@ class Job(TimeStampMixin):
                 ct = ContentType.objects.get_for_id(obj["content_type_id"])
                 result = ct.model_class().objects.filter(pk__in=obj.get("value"))
             elif obj.get("__django_model") is True:
-                ct = ContentType.objects.get_for_id(obj["content_type_id"])
-                result = ct.get_object_for_this_type(pk=obj["object_pk"])
+                result = objects.get((obj["content_type_id"], obj["object_pk"]))
+                if result is None:
+                    # raise DoesNotExist for not existing object
+                    ct = ContentType.objects.get_for_id(obj["content_type_id"])
+                    result = ct.get_object_for_this_type(pk=obj["object_pk"])
             else:
                 result = {}
                 for k, v in obj.items():
-                    result[k] = cls._restore_django_models(v)
+                    result[k] = cls._restore_django_models(v, objects)
         return result
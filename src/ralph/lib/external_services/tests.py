@@ -3,10 +3,20 @@ import json
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test import (
+    override_settings,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+)
 from djmoney.money import Money
+from mock import patch
 
-from ralph.lib.external_services.models import Job, JobStatus
+from ralph.lib.external_services.models import (
+    get_reschedule_delay,
+    Job,
+    JobStatus,
+)
 from ralph.tests.models import Bar, Foo
 
 
@@ -74,6 +84,46 @@ class JobDumpParamsTestCase(TestCase):
         result = Job._restore_django_models(self.sample_obj_dump)
         self.assertEqual(result, self.sample_obj)
 
+    def test_restore_params_loads_objects_once_per_content_type(self):
+        Foo.objects.create(bar="def")
+        dump = dict(
+            self.sample_obj_dump,
+            foos=Job.dump_obj_to_jsonable(list(Foo.objects.all())),
+        )
+        with self.assertNumQueries(2):
+            result = Job._restore_django_models(dump)
+        self.assertEqual(result["foos"], list(Foo.objects.all()))
+        # the same object is restored as single instance
+        self.assertIs(result["foo1"], result["l"][0])
+        self.assertIs(result["l"][1]["d"], result["d"]["d1"][0])
+
+    def test_restore_not_existing_object(self):
+        dump = dict(self.foo_dump, object_pk=self.foo.pk + 1000)
+        with self.assertRaises(Foo.DoesNotExist):
+            Job._restore_django_models({"foo": dump})
+
+    def test_dump_queryset(self):
+        result = Job.dump_obj_to_jsonable(Foo.objects.filter(pk=self.foo.pk))
+        self.assertEqual(
+            result,
+            {
+                "__django_queryset": True,
+                "value": [self.foo.pk],
+                "content_type_id": self.foo_content_type_id,
+            },
+        )
+
+    def test_unchanged_params_are_not_saved(self):
+        job = Job.objects.create(service_name="JOB_TEST", _dumped_params={})
+        dumped_params = dict(self.sample_obj_dump, _request__user=None)
+        Job.objects.filter(pk=job.pk).update(_dumped_params=dumped_params)
+        job.refresh_from_db()
+        job.params
+        self.assertFalse(job._update_dumped_params())
+        job.params["foo1"] = self.bar
+        self.assertTrue(job._update_dumped_params())
+        self.assertEqual(job._dumped_params["foo1"], self.bar_dump)
+
 
 class JobRunTestCase(TransactionTestCase):
     def setUp(self):
@@ -98,3 +148,55 @@ class JobRunTestCase(TransactionTestCase):
         self.assertEqual(Bar.objects.count(), prev_bar_count + 1)
         self.assertEqual(self.foo.bar, "barbar")
         self.assertTrue(Bar.objects.filter(name="test1").exists())
+
+
+@override_settings(
+    JOB_RESCHEDULE_BASE_DELAY=10,
+    JOB_RESCHEDULE_MAX_DELAY=60,
+    JOB_RESCHEDULE_JITTER=0,
+)
+class JobRescheduleTestCase(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(
+            service_name="JOB_TEST", _dumped_params={"foo": "bar"}
+        )
+
+    def test_reschedule_delay_grows_exponentially_up_to_max_delay(self):
+        self.assertEqual(
+            [get_reschedule_delay(i) for i in range(5)], [10, 20, 40, 60, 60]
+        )
+
+    def test_reschedule_delay_with_jitter(self):
+        with override_settings(JOB_RESCHEDULE_JITTER=0.5):
+            delays = [get_reschedule_delay(1) for _ in range(100)]
+        self.assertTrue(all(10 <= delay <= 20 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_reschedule_delay_of_long_rescheduled_job(self):
+        self.assertEqual(get_reschedule_delay(10**6), 60)
+
+    @override_settings(JOB_RESCHEDULE_BASE_DELAY=0)
+    def test_reschedule_without_delay(self):
+        self.assertEqual(get_reschedule_delay(3), 0)
+
+    @patch("ralph.lib.external_services.models.InternalService")
+    def test_reschedule_is_delayed_with_backoff(self, internal_service_mock):
+        run_async_in = internal_service_mock.return_value.run_async_in
+        self.job.reschedule()
+        self.job.reschedule()
+        self.assertEqual([c[0] for c in run_async_in.call_args_list], [(10,), (20,)])
+        run_async_in.assert_called_with(20, job_id=self.job.id)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.rescheduled, 2)
+        self.assertEqual(self.job._dumped_params["foo"], "bar")
+
+    @patch("ralph.lib.external_services.models.InternalService")
+    def test_reset_reschedules(self, internal_service_mock):
+        self.job.reschedule()
+        self.job.reset_reschedules()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.rescheduled, 0)
+        self.job.reschedule()
+        internal_service_mock.return_value.run_async_in.assert_called_with(
+            10, job_id=self.job.id
+        )
@@ -10,6 +10,8 @@ class RalphWorker(Worker):
     ```
     ralph rqworker --worker-class=ralph.lib.external_services.worker.RalphWorker default  # noqa
     ```
+
+    Add `--with-scheduler` param to enqueue delayed (rescheduled) jobs.
     """
 
     def perform_job(self, *args, **kwargs):
@@ -127,13 +127,58 @@ class TaggableMixin(models.Model):
         abstract = True
 
 
+class _Missing(object):
+    """
+    Marker of field missing in previous state (kept as singleton when object
+    is pickled).
+    """
+
+    def __reduce__(self):
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
 class PreviousStateMixin(models.Model):
+    """
+    Keep values of fields as they were when the object was loaded (or
+    created) in `_previous_state`.
+
+    Values are stored as a tuple (in the order of fields cached per model),
+    the dict is built only when previous state is read.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        fields = [
-            getattr(f, "attname", None) or f.name for f in self._meta.get_fields()
-        ]
-        self._previous_state = {k: v for k, v in self.__dict__.items() if k in fields}
+        fields, missing = self._get_previous_state_fields()
+        # deferred fields are not in __dict__
+        self._previous_values = tuple(map(self.__dict__.get, fields, missing))
+
+    @classmethod
+    def _get_previous_state_fields(cls):
+        # cached separately for every model (fields of subclasses differ)
+        try:
+            return cls.__dict__["_previous_state_fields"]
+        except KeyError:
+            pass
+        names = {getattr(f, "attname", None) or f.name for f in cls._meta.get_fields()}
+        # keep order of fields in which they are set in model's __init__
+        fields = tuple(
+            [f.attname for f in cls._meta.concrete_fields if f.attname in names]
+            + sorted(names.difference(f.attname for f in cls._meta.concrete_fields))
+        )
+        cls._previous_state_fields = fields, (_MISSING,) * len(fields)
+        return cls._previous_state_fields
+
+    @property
+    def _previous_state(self):
+        fields, _ = self._get_previous_state_fields()
+        return {
+            name: value
+            for name, value in zip(fields, self._previous_values)
+            if value is not _MISSING
+        }
 
     class Meta:
         abstract = True
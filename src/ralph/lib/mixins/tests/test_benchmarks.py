@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ralph.lib.mixins.models import PreviousStateMixin
+from ralph.networks.models import IPAddress
+from ralph.tests.benchmarks import benchmark, measure
+
+
+def legacy_previous_state_init(self, *args, **kwargs):
+    """
+    Previous implementation of `PreviousStateMixin.__init__` (fields resolved
+    and state copied to dict for every instance).
+    """
+    super(PreviousStateMixin, self).__init__(*args, **kwargs)
+    fields = [getattr(f, "attname", None) or f.name for f in self._meta.get_fields()]
+    self.__dict__["_previous_state"] = {
+        k: v for k, v in self.__dict__.items() if k in fields
+    }
+
+
+@benchmark
+class PreviousStateBenchmark(TestCase):
+    """
+    Compare loading big queryset of IP addresses using previous
+    implementation of `PreviousStateMixin` and current one.
+    """
+
+    objects_count = 20000
+    repeat = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        IPAddress.objects.bulk_create(
+            [
+                IPAddress(address="10.{}.{}.1".format(i // 256, i % 256), number=i)
+                for i in range(cls.objects_count)
+            ]
+        )
+
+    def _load(self, name):
+        with measure(name, scale=1 / self.repeat, memory=True):
+            for _ in range(self.repeat):
+                objects = list(IPAddress.objects.all())
+        self.assertEqual(len(objects), self.objects_count)
+        return objects
+
+    def test_load_objects_with_previous_state(self):
+        with (
+            patch.object(PreviousStateMixin, "_previous_state", None, create=True),
+            patch.object(PreviousStateMixin, "__init__", legacy_previous_state_init),
+        ):
+            legacy = self._load("legacy")
+        current = self._load("current")
+        self.assertEqual(
+            [obj._previous_state for obj in current],
+            [obj.__dict__["_previous_state"] for obj in legacy],
+        )
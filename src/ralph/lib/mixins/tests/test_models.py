@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
+import pickle
+
 from django.test import TestCase
 
+from ralph.data_center.models import DataCenterAsset
+from ralph.data_center.tests.factories import DataCenterAssetFactory
+from ralph.networks.models import IPAddress
 from ralph.tests.models import Foo
 
 
@@ -8,3 +13,43 @@ class AdminUrlTestCase(TestCase):
     def test_returned_url(self):
         obj = Foo.objects.create(bar="test")
         self.assertEqual("/tests/foo/{}/change/".format(obj.pk), obj.get_absolute_url())
+
+
+class PreviousStateTestCase(TestCase):
+    def setUp(self):
+        self.ip = IPAddress.objects.create(address="10.0.0.1", hostname="h1")
+
+    def test_previous_state_keeps_loaded_values(self):
+        ip = IPAddress.objects.get(pk=self.ip.pk)
+        ip.hostname = "h2"
+        ip.save()
+        self.assertEqual(ip._previous_state["hostname"], "h1")
+        self.assertEqual(ip._previous_state["address"], "10.0.0.1")
+        self.assertEqual(ip._previous_state["id"], self.ip.pk)
+
+    def test_previous_state_contains_values_set_in_init(self):
+        ip = IPAddress.objects.get(pk=self.ip.pk)
+        self.assertEqual(
+            list(ip._previous_state.items()),
+            [
+                (key, value)
+                for key, value in ip.__dict__.items()
+                if key in ip._previous_state
+            ],
+        )
+        self.assertIn("ethernet_id", ip._previous_state)
+
+    def test_previous_state_skips_deferred_fields(self):
+        ip = IPAddress.objects.only("id", "address").get(pk=self.ip.pk)
+        self.assertNotIn("hostname", ip._previous_state)
+        self.assertEqual(ip._previous_state["address"], "10.0.0.1")
+
+    def test_previous_state_fields_are_cached_per_model(self):
+        DataCenterAssetFactory()
+        asset = DataCenterAsset.objects.get()
+        self.assertIn("rack_id", asset._previous_state)
+        self.assertNotIn("rack_id", IPAddress.objects.get()._previous_state)
+
+    def test_previous_state_after_pickling(self):
+        ip = pickle.loads(pickle.dumps(IPAddress.objects.only("id").get()))
+        self.assertEqual(ip._previous_state, {"id": self.ip.pk})
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Running database work in parallel threads, each with its own connection.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List
+
+from django.db import connections, DEFAULT_DB_ALIAS
+
+
+def _call_in_separate_connection(func: Callable, item: object) -> object:
+    try:
+        return func(item)
+    finally:
+        # connections are opened per thread - close them when work is done
+        connections.close_all()
+
+
+def map_in_separate_connections(
+    func: Callable, items: Iterable, workers: int, using: str = DEFAULT_DB_ALIAS
+) -> List[object]:
+    """
+    Return results of `func` called for every item (in the order of items).
+
+    When `workers` is greater than 1, `func` is called in (at most `workers`)
+    threads, each of them using separate database connection. It's possible
+    only outside of transaction (changes made in it are not visible in other
+    connections), so inside transaction (for example in web requests, when
+    `ATOMIC_REQUESTS` is set) `func` is always called sequentially.
+    """
+    items = list(items)
+    if workers > 1 and len(items) > 1 and not connections[using].in_atomic_block:
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+            return list(
+                executor.map(
+                    lambda item: _call_in_separate_connection(func, item), items
+                )
+            )
+    return [func(item) for item in items]
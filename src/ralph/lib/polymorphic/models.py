@@ -14,8 +14,7 @@ Example:
 """
 
 from collections import defaultdict
-from itertools import groupby
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
@@ -23,6 +22,37 @@ from django.core import exceptions
 from django.db import models
 from django.db.models import QuerySet
 from django.db.models.base import ModelBase
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+from ralph.lib.parallel import map_in_separate_connections
+
+# content type id -> descendant model (or None if objects of this content
+# type are not fetched from descendant model)
+_descendant_models_cache = {}  # type: Dict[int, Optional[ModelBase]]
+
+
+def get_descendant_model(content_type_id: int) -> Optional[ModelBase]:
+    """
+    Return polymorphic descendant model for content type (or None if it's not
+    a descendant of polymorphic model). Result is cached in the process.
+    """
+    try:
+        return _descendant_models_cache[content_type_id]
+    except KeyError:
+        pass
+    model = ContentType.objects.get_for_id(id=content_type_id).model_class()
+    polymorphic_models = getattr(model, "_polymorphic_models", [])
+    if not (polymorphic_models and model not in polymorphic_models):
+        model = None
+    _descendant_models_cache[content_type_id] = model
+    return model
+
+
+@receiver(post_migrate)
+def clear_descendant_models_cache(**kwargs):
+    # content types could be recreated (with different ids)
+    _descendant_models_cache.clear()
 
 
 class PolymorphicQuerySet(models.QuerySet):
@@ -35,16 +65,14 @@ class PolymorphicQuerySet(models.QuerySet):
         self._extra_kwargs = {}
         self._polymorphic_filter_args = []
         self._polymorphic_filter_kwargs = {}
-        self._my_cache = None
-        self._pks_order = None
+        self._polymorphic_result = None
         super().__init__(*args, **kwargs)
 
     def _fetch_all(self):
         if self._result_cache is not None:
             return
         self._result_cache = None
-        self._my_cache = None
-        self._pks_order = None
+        self._polymorphic_result = None
 
         if self.query.select_related:
             self._select_related = self.query.select_related
@@ -54,41 +82,64 @@ class PolymorphicQuerySet(models.QuerySet):
 
         super()._fetch_all()
         try:
-            self._pks_order = [obj.pk for obj in self._result_cache]  # type: ignore
+            ids_by_content_type = defaultdict(list)  # type: Dict[int, List[int]]
+            for obj in self._result_cache:  # type: ignore
+                ids_by_content_type[obj.content_type_id].append(obj.pk)
         except AttributeError:
             return self._result_cache
 
-        result = groupby(
-            sorted(self._result_cache, key=lambda x: x.content_type_id),
-            lambda x: x.content_type_id,
-        )  # type: Iterable[Tuple[int, object]]
-        self._my_cache = self._subquery_for_children_models(result)
+        result_mapping = self._subquery_for_children_models(ids_by_content_type)
+        # base objects are replaced by their descendants (in the same order)
+        polymorphic_result = []
+        for obj in self._result_cache:  # type: ignore
+            # objects are removed from mapping to return each of them once
+            # (even if base object is returned more than once)
+            polymorphic_result.extend(reversed(result_mapping.pop(obj.pk, [])))
+        self._polymorphic_result = polymorphic_result
+
+    def _get_subquery(self, model: ModelBase, ids: List[int]) -> QuerySet:
+        model_name = model._meta.object_name
+        model_query = model.objects.using(self.db).filter(pk__in=ids)
+        model_query = self._add_select_related_to_subquery(model_query)
+        model_query = self._add_polymorphic_select_related_to_subquery(
+            model_query, model_name
+        )
+        model_query = self._add_polymorphic_prefetch_related_to_subquery(
+            model_query, model_name
+        )
+        model_query = self._add_polymorphic_filter_to_subquery(model_query)
+        model_query = model_query.annotate(
+            *self._annotate_args, **self._annotate_kwargs
+        )
+        return self._add_extra_to_subquery(model_query)
 
-    def _subquery_for_children_models(self, result) -> Dict[int, List[object]]:
-        result_mapping = defaultdict(list)
-        for ct_id, objects_of_type in result:
-            content_type = ContentType.objects.get_for_id(id=ct_id)
-            model = content_type.model_class()
-            polymorphic_models = getattr(model, "_polymorphic_models", [])
-            if not (polymorphic_models and model not in polymorphic_models):
+    def _evaluate_subqueries(self, queries: List[QuerySet]) -> Iterable[List[object]]:
+        """
+        Evaluate subqueries for descendant models.
+
+        When `POLYMORPHIC_PARALLEL_FETCH_WORKERS` setting is greater than 1,
+        subqueries are run in parallel, each of them in separate database
+        connection, but only outside of transaction (in management commands
+        and workers). Inside transaction, including web requests (admin
+        changelists, API lists) with `ATOMIC_REQUESTS`, subqueries are always
+        run sequentially.
+        """
+        workers = getattr(settings, "POLYMORPHIC_PARALLEL_FETCH_WORKERS", 0)
+        return map_in_separate_connections(list, queries, workers, using=self.db)
+
+    def _subquery_for_children_models(
+        self, ids_by_content_type: Dict[int, List[int]]
+    ) -> Dict[int, List[object]]:
+        queries = []
+        for ct_id, ids in ids_by_content_type.items():
+            model = get_descendant_model(ct_id)
+            if model is None:
                 continue
-            model_name = model._meta.object_name
-            ids = {obj.id for obj in objects_of_type}  # type: set[int]
-            model_query = model.objects.filter(pk__in=ids)
-            model_query = self._add_select_related_to_subquery(model_query)
-            model_query = self._add_polymorphic_select_related_to_subquery(
-                model_query, model_name
-            )
-            model_query = self._add_polymorphic_prefetch_related_to_subquery(
-                model_query, model_name
-            )
-            model_query = self._add_polymorphic_filter_to_subquery(model_query)
-            model_query = model_query.annotate(
-                *self._annotate_args, **self._annotate_kwargs
-            )
-            model_query = self._add_extra_to_subquery(model_query)
+            queries.append(self._get_subquery(model, ids))
 
-            for obj in model_query:
+        result_mapping = defaultdict(list)
+        for objects in self._evaluate_subqueries(queries):
+            for obj in objects:
                 result_mapping[obj.pk].append(obj)
         return result_mapping
 
@@ -222,15 +273,9 @@ class PolymorphicQuerySet(models.QuerySet):
 
     def __iter__(self):
         self._fetch_all()
-        try:
-            cache_ = self._my_cache.copy()
-            pks = [pk for pk in self._pks_order]
-        except AttributeError:
-            yield from self._result_cache
-        else:
-            for pk in pks:
-                while cache_[pk]:
-                    yield cache_[pk].pop()
+        if self._polymorphic_result is None:
+            return iter(self._result_cache)
+        return iter(self._polymorphic_result)
 
     def iterator(self, chunk_size=None):
         yield from self.__iter__()
@@ -255,8 +300,6 @@ class PolymorphicQuerySet(models.QuerySet):
         clone._extra_kwargs = self._extra_kwargs.copy()
         clone._polymorphic_filter_args = self._polymorphic_filter_args.copy()
         clone._polymorphic_filter_kwargs = self._polymorphic_filter_kwargs.copy()
-        clone._my_cache = self._my_cache.clone() if self._my_cache else None
-        clone._pks_order = self._pks_order.clone() if self._pks_order else None
         return clone
 
     def get(self, *args, **kwargs):
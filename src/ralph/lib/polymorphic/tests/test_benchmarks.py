@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+from itertools import groupby
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import override_settings, TransactionTestCase
+
+from ralph.assets.models import BaseObject
+from ralph.back_office.tests.factories import BackOfficeAssetFactory
+from ralph.data_center.tests.factories import (
+    ClusterFactory,
+    DataCenterAssetFactory,
+)
+from ralph.tests.benchmarks import benchmark, measure
+from ralph.virtual.tests.factories import VirtualServerFactory
+
+
+def legacy_polymorphic_iterator(queryset):
+    """
+    Previous implementation of fetching descendants of polymorphic objects
+    (base objects sorted and grouped by content type, cache copied when
+    iterating).
+    """
+    objects = list(queryset.model.objects.all())
+    pks_order = [obj.pk for obj in objects]
+    result = groupby(
+        sorted(objects, key=lambda x: x.content_type_id),
+        lambda x: x.content_type_id,
+    )
+    result_mapping = defaultdict(list)
+    for ct_id, objects_of_type in result:
+        model = ContentType.objects.get_for_id(id=ct_id).model_class()
+        polymorphic_models = getattr(model, "_polymorphic_models", [])
+        if not (polymorphic_models and model not in polymorphic_models):
+            continue
+        ids = {obj.id for obj in objects_of_type}
+        for obj in model.objects.filter(pk__in=ids):
+            result_mapping[obj.pk].append(obj)
+    cache_ = result_mapping.copy()
+    for pk in pks_order:
+        while cache_[pk]:
+            yield cache_[pk].pop()
+
+
+@benchmark
+class PolymorphicFetchBenchmark(TransactionTestCase):
+    """
+    Compare fetching mixed set of base objects (DC assets, back office
+    assets, virtual servers and clusters) using previous implementation,
+    current one and current one with parallel subqueries.
+    """
+
+    objects_per_type = 250
+    repeat = 5
+
+    def setUp(self):
+        for factory in [
+            DataCenterAssetFactory,
+            BackOfficeAssetFactory,
+            VirtualServerFactory,
+            ClusterFactory,
+        ]:
+            factory.create_batch(self.objects_per_type)
+
+    def _fetch(self, name, fetch):
+        # only queries run in the main connection are counted
+        with measure(name, scale=1 / self.repeat, queries=True):
+            for _ in range(self.repeat):
+                result = fetch()
+        self.assertEqual(len(result), BaseObject.objects.count())
+        return result
+
+    def test_fetch_polymorphic_objects(self):
+        legacy = self._fetch(
+            "legacy",
+            lambda: list(legacy_polymorphic_iterator(BaseObject.polymorphic_objects)),
+        )
+        sequential = self._fetch(
+            "sequential", lambda: list(BaseObject.polymorphic_objects.all())
+        )
+        with override_settings(POLYMORPHIC_PARALLEL_FETCH_WORKERS=4):
+            parallel = self._fetch(
+                "parallel", lambda: list(BaseObject.polymorphic_objects.all())
+            )
+        self.assertEqual(sequential, legacy)
+        self.assertEqual(parallel, legacy)
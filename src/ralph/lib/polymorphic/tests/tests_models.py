@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
+from unittest.mock import patch
+
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.db import transaction
+from django.test import override_settings, TestCase, TransactionTestCase
 
-from ralph.lib.polymorphic.models import Polymorphic
+from ralph.lib.parallel import _call_in_separate_connection
+from ralph.lib.polymorphic.models import (
+    clear_descendant_models_cache,
+    get_descendant_model,
+    Polymorphic,
+)
 from ralph.lib.polymorphic.tests.models import (
     PolymorphicModelBaseTest,
     PolymorphicModelTest,
@@ -92,6 +100,27 @@ class PolymorphicTestCase(TestCase):
         with self.assertNumQueries(2):
             list(PolymorphicModelTest.polymorphic_objects.all())
 
+    def test_polymorphic_queryset_iterated_many_times(self):
+        queryset = PolymorphicModelBaseTest.polymorphic_objects.order_by("name")
+        with self.assertNumQueries(3):
+            first = list(queryset)
+            second = list(queryset)
+        self.assertEqual(first, [self.pol_1, self.pol_2, self.pol_3])
+        self.assertEqual(second, first)
+        self.assertIsInstance(second[2], PolymorphicModelTest2)
+
+    def test_descendant_model_is_resolved_once_for_content_type(self):
+        clear_descendant_models_cache()
+        with patch.object(
+            ContentType.objects, "get_for_id", wraps=ContentType.objects.get_for_id
+        ) as get_for_id_mock:
+            list(PolymorphicModelBaseTest.polymorphic_objects.all())
+            list(PolymorphicModelBaseTest.polymorphic_objects.all())
+        self.assertEqual(get_for_id_mock.call_count, 2)
+        self.assertEqual(
+            get_descendant_model(self.pol_3.content_type_id), PolymorphicModelTest2
+        )
+
     def test_m2m_with_prefetch_related_on_polymorphic_object(self):
         sm2mm_1 = SomeM2MModel.objects.create(name="abc")
         sm2mm_1.polymorphics.set([self.pol_1, self.pol_2])
@@ -240,3 +269,31 @@ class PolymorphicTestCaseNew(TestCase):
                 ).prefetch_related("sth_related")
             ]
             self.assertEqual(item.sth_related.name, "Rel1")
+
+
+@override_settings(POLYMORPHIC_PARALLEL_FETCH_WORKERS=2)
+class PolymorphicParallelFetchTestCase(TransactionTestCase):
+    def setUp(self):
+        self.pol_1 = PolymorphicModelTest.objects.create(name="Pol1")
+        self.pol_2 = PolymorphicModelTest2.objects.create(name="Pol2")
+        self.pol_3 = PolymorphicModelTest.objects.create(name="Pol3")
+
+    def test_descendants_fetched_in_parallel(self):
+        with patch(
+            "ralph.lib.parallel._call_in_separate_connection",
+            wraps=_call_in_separate_connection,
+        ) as evaluate_mock:
+            result = list(PolymorphicModelBaseTest.polymorphic_objects.order_by("name"))
+        self.assertEqual(result, [self.pol_1, self.pol_2, self.pol_3])
+        self.assertEqual(
+            [type(obj) for obj in result],
+            [PolymorphicModelTest, PolymorphicModelTest2, PolymorphicModelTest],
+        )
+        self.assertEqual(evaluate_mock.call_count, 2)
+
+    def test_descendants_fetched_sequentially_in_transaction(self):
+        with patch("ralph.lib.parallel._call_in_separate_connection") as evaluate_mock:
+            with transaction.atomic():
+                result = list(PolymorphicModelBaseTest.polymorphic_objects.all())
+        self.assertEqual(len(result), 3)
+        self.assertFalse(evaluate_mock.called)
@@ -1,7 +1,11 @@
+from functools import lru_cache
+
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
 from django.db.models import QuerySet
 from django.forms.utils import flatatt
+from django.http import QueryDict
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.html import escape
@@ -9,7 +13,6 @@ from django.utils.html import escape
 from ralph.admin.helpers import (
     get_field_by_relation_path,
     get_field_title_by_relation_path,
-    getattr_dunder,
 )
 
 try:
@@ -21,6 +24,111 @@ except ImportError:
     use_choices = False
 
 
+class Column(object):
+    """
+    Table column with resolved way of getting its value and title.
+
+    Value of model's field (which may be nested using __ notation) is
+    decoded using field's Choices, which are found once for every model of
+    the table's items.
+    """
+
+    def __init__(self, table_class, field, title=None):
+        self.field = field
+        self.title = title
+        # custom field (method of the table)
+        self.is_method = hasattr(table_class, field)
+        self._path = field.split("__")
+        self._choices_decoders = {}
+
+    def get_title(self, table):
+        if self.title is not None:
+            return self.title
+        try:
+            return getattr(table, self.field).title
+        except AttributeError:
+            return get_field_title_by_relation_path(table.queryset.model, self.field)
+
+    def _get_choices_decoder(self, model):
+        try:
+            return self._choices_decoders[model]
+        except KeyError:
+            pass
+        try:
+            choice_class = get_field_by_relation_path(model, self.field).choices
+        except FieldDoesNotExist:
+            choice_class = None
+        decoder = None
+        if use_choices and choice_class and isinstance(choice_class, Choices):
+            decoder = choice_class.name_from_id
+        self._choices_decoders[model] = decoder
+        return decoder
+
+    def get_value(self, table, item):
+        if self.is_method:
+            return getattr(table, self.field)(item)
+        value = item
+        for attr in self._path:
+            value = getattr(value, attr, None)
+        decoder = self._get_choices_decoder(item._meta.model)
+        if decoder:
+            value = decoder(value)
+        return value
+
+
+class ColumnPlan(object):
+    """
+    Columns of the table compiled once per table class and list display.
+    """
+
+    def __init__(self, table_class, list_display):
+        self.table_class = table_class
+        self.columns = [
+            Column(table_class, field[0], field[1])
+            if isinstance(field, (tuple, list))
+            else Column(table_class, field)
+            for field in list_display
+        ]
+        self.columns_by_field = {column.field: column for column in self.columns}
+        self._titles = {}
+
+    def get_column(self, field):
+        try:
+            return self.columns_by_field[field]
+        except KeyError:
+            # field outside of list display
+            column = self.columns_by_field[field] = Column(self.table_class, field)
+            return column
+
+    def get_titles(self, table):
+        model = getattr(table.queryset, "model", None)
+        try:
+            return self._titles[model]
+        except KeyError:
+            titles = self._titles[model] = [
+                column.get_title(table) for column in self.columns
+            ]
+            return titles
+
+
+@lru_cache(maxsize=512)
+def _get_column_plan(table_class, list_display):
+    return ColumnPlan(table_class, list_display)
+
+
+def get_column_plan(table_class, list_display):
+    """
+    Return (cached) column plan of the table class for given list display.
+    """
+    return _get_column_plan(
+        table_class,
+        tuple(
+            tuple(field) if isinstance(field, (tuple, list)) else field
+            for field in list_display
+        ),
+    )
+
+
 class Table(object):
     """
     Generating contents for table based on predefined columns and queryset.
@@ -29,7 +137,7 @@ class Table(object):
         >>> table = Table(queryset, ['id', ('name', 'My field name')])
         >>> table.get_table_content()
         [
-            [{'value': id'}, {'value': 'My field name'}],
+            [{'value': 'ID'}, {'value': 'My field name'}],
             [
                 {'value': '1', 'html_attributes': ''},
                 {'value': 'Test', 'html_attributes': ''}
@@ -48,6 +156,8 @@ class Table(object):
         additional_row_method=None,
         request=None,
         transpose=False,
+        paginate_by=None,
+        page_param="page",
     ):
         """
         Initialize table class
@@ -60,6 +170,9 @@ class Table(object):
             additional_row_method: list of additional method for each row
             transpose: set to True if table should be transposed (rows swapped
                 with columns)
+            paginate_by: number of rows displayed on single page; when set,
+                only rows of the page selected by `page_param` GET param
+                of the request are fetched and rendered
         """
         self.queryset = queryset
         self.list_display_raw = list_display
@@ -69,6 +182,10 @@ class Table(object):
         self.additional_row_method = additional_row_method
         self.request = request
         self.transpose = transpose
+        self.paginate_by = paginate_by
+        self.page_param = page_param
+        self.column_plan = get_column_plan(type(self), list_display)
+        self._page = None
 
     @property
     def headers_count(self):
@@ -76,26 +193,32 @@ class Table(object):
 
     @property
     def rows_count(self):
+        if self.paginate_by:
+            return self.page.paginator.count
         if isinstance(self.queryset, QuerySet):
             return self.queryset.count()
         else:
             return len(self.queryset)
 
+    @property
+    def page(self):
+        """
+        Current page of the table (if `paginate_by` is set).
+        """
+        if self._page is None:
+            page_number = None
+            if self.request is not None:
+                page_number = self.request.GET.get(self.page_param)
+            self._page = Paginator(self.queryset, self.paginate_by).get_page(
+                page_number
+            )
+        return self._page
+
     def get_headers(self):
         """
         Return headers for table.
         """
-        headers = []
-        for field in self.list_display_raw:
-            if isinstance(field, (list, tuple)):
-                headers.append({"value": field[1]})
-            else:
-                try:
-                    name = getattr(self, field).title
-                except AttributeError:
-                    name = get_field_title_by_relation_path(self.queryset.model, field)
-                headers.append({"value": name})
-        return headers
+        return [{"value": title} for title in self.column_plan.get_titles(self)]
 
     def get_field_value(self, item, field):
         """
@@ -108,40 +231,24 @@ class Table(object):
         :param item: row from dict
         :param field: field name
         """
-        value = None
-        if hasattr(self, field):
-            value = getattr(self, field)(item)
-        else:
-            value = getattr_dunder(item, field)
-            try:
-                choice_class = get_field_by_relation_path(
-                    item._meta.model, field
-                ).choices
-            except FieldDoesNotExist:
-                choice_class = None
-            if use_choices and choice_class and isinstance(choice_class, Choices):
-                value = choice_class.name_from_id(value)
-        return value
+        return self.column_plan.get_column(field).get_value(self, item)
 
     def get_table_content(self):
         """
         Return content of table.
         """
         result = [self.get_headers()]
-        # Remove fields which are not in model
-        list_display = [
-            field for field in self.list_display if not hasattr(self, field)
-        ]
-        if "id" not in list_display:
-            list_display.append("id")
         if self.additional_row_method:
             colspan = len(self.list_display)
+        get_field_value = self.get_field_value
+        list_display = self.list_display
+        items = self.page if self.paginate_by else self.queryset
 
-        for item in self.queryset:
+        for item in items:
             result.append(
                 [
-                    {"value": self.get_field_value(item, field), "html_attributes": ""}
-                    for field in self.list_display
+                    {"value": get_field_value(item, field), "html_attributes": ""}
+                    for field in list_display
                 ]
             )
             if self.additional_row_method:
@@ -156,7 +263,17 @@ class Table(object):
             result = list(zip(*result))
         return result
 
+    def _get_page_url(self, page_number):
+        if self.request is not None:
+            params = self.request.GET.copy()
+        else:
+            params = QueryDict(mutable=True)
+        params[self.page_param] = page_number
+        return "?{}".format(params.urlencode())
+
     def render(self, request=None):
+        if self.request is None:
+            self.request = request
         content = self.get_table_content()
         context = {
             "show_header": not self.transpose,
@@ -164,6 +281,25 @@ class Table(object):
             "rows_count": self.rows_count,
             "LIMIT": 5,
         }
+        if self.paginate_by:
+            page = self.page
+            context.update(
+                {
+                    "page": page,
+                    # all rows of the page are displayed
+                    "LIMIT": None,
+                    "previous_page_url": (
+                        self._get_page_url(page.previous_page_number())
+                        if page.has_previous()
+                        else None
+                    ),
+                    "next_page_url": (
+                        self._get_page_url(page.next_page_number())
+                        if page.has_next()
+                        else None
+                    ),
+                }
+            )
         if self.transpose:
             context.update({"rows": content})
         else:
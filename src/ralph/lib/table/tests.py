@@ -1,7 +1,9 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+from mock import patch
 
-from ralph.lib.table.table import Table
-from ralph.tests.models import Foo
+from ralph.admin.helpers import get_field_by_relation_path
+from ralph.lib.table.table import _get_column_plan, get_column_plan, Table
+from ralph.tests.models import Foo, Order, OrderStatus
 
 
 class TableRenderTestCase(TestCase):
@@ -74,3 +76,54 @@ class TableRenderTestCase(TestCase):
             [{"value": "custom_bar", "html_attributes": ' colspan="2"'}],
         ]
         self.assertTablesEqual(table.get_table_content(), result)
+
+    def test_choices_field(self):
+        order = Order.objects.create(status=OrderStatus.to_send.id)
+        table = Table(Order.objects.all(), ["id", "status"])
+        self.assertTablesEqual(
+            table.get_table_content(),
+            [
+                [{"value": "ID"}, {"value": "status"}],
+                [
+                    {"value": order.id, "html_attributes": ""},
+                    {"value": "to_send", "html_attributes": ""},
+                ],
+            ],
+        )
+
+    def test_column_plan_is_compiled_once(self):
+        Foo.objects.create(bar="Test2")
+        _get_column_plan.cache_clear()
+        with patch(
+            "ralph.lib.table.table.get_field_by_relation_path",
+            side_effect=get_field_by_relation_path,
+        ) as get_field_mock:
+            for _ in range(3):
+                Table(Foo.objects.all(), ["id", ("bar", "Bar")]).get_table_content()
+        # choices are looked up once for every field
+        self.assertEqual(get_field_mock.call_count, 2)
+        self.assertIs(
+            get_column_plan(Table, ["id", ["bar", "Bar"]]),
+            get_column_plan(Table, ("id", ("bar", "Bar"))),
+        )
+
+    def test_pagination(self):
+        foos = [self.foo_1] + [
+            Foo.objects.create(bar="Test{}".format(i)) for i in range(2, 6)
+        ]
+        request = RequestFactory().get("/", {"page": 2, "other": "x"})
+        table = Table(
+            Foo.objects.order_by("id"), ["bar"], request=request, paginate_by=2
+        )
+        self.assertTablesEqual(
+            table.get_table_content(),
+            [
+                [{"value": "bar"}],
+                [{"value": foos[2].bar, "html_attributes": ""}],
+                [{"value": foos[3].bar, "html_attributes": ""}],
+            ],
+        )
+        self.assertEqual(table.rows_count, 5)
+        content = table.render()
+        self.assertIn("?page=1&amp;other=x", content)
+        self.assertIn("?page=3&amp;other=x", content)
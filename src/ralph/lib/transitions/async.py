@@ -143,6 +143,8 @@ def _perform_async_transition(transition_job):
             raise FailedActionError("Action {} has failed".format(action.name)) from e  # noqa
         else:
             tja.status = TransitionJobActionStatus.FINISHED
+            # start backoff of the next action from scratch
+            transition_job.reset_reschedules()
         finally:
             tja.save()
         completed_actions_names.add(action.name)
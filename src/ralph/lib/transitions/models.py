@@ -11,7 +11,7 @@ from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import FieldDoesNotExist, ValidationError
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.db.models.base import ModelBase
 from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 from django.dispatch import receiver
@@ -54,10 +54,29 @@ SYNCHRONOUS_JOBS_METRIC_PREFIX = getattr(
 SYNCHRONOUS_JOBS_METRIC_NAME_TMPL = getattr(
     settings, "SYNCHRONOUS_JOBS_METRIC_NAME_TMPL", "{prefix}.{job_name}.{action}"
 )
+TRANSITION_PHASE_METRIC_PREFIX = getattr(
+    settings, "TRANSITION_PHASE_METRIC_PREFIX", "transitions.phases"
+)
+TRANSITION_PHASE_METRIC_NAME_TMPL = getattr(
+    settings,
+    "TRANSITION_PHASE_METRIC_NAME_TMPL",
+    "{prefix}.{transition_name}.{phase}",
+)
+
+
+def _transition_phase_timer(transition, phase):
+    """Return statsd timer measuring given phase of the transition."""
+    return statsd.timer(
+        TRANSITION_PHASE_METRIC_NAME_TMPL.format(
+            prefix=TRANSITION_PHASE_METRIC_PREFIX,
+            transition_name=transition._get_metric_name(),
+            phase=phase,
+        )
+    )
 
 
 def _generate_transition_history(
-    instance, transition, requester, attachments, history_kwargs, action_names, field
+    instance, transition, requester, history_kwargs, action_names, field
 ):
     """Return history object (without saving it) based on parameters."""
     field_value = getattr(instance, field, None)
@@ -73,7 +92,7 @@ def _generate_transition_history(
     except ValueError:
         source = None
 
-    transition_history = TransitionsHistory.objects.create(
+    return TransitionsHistory(
         transition_name=transition.name,
         content_type=get_content_type_for_model(instance._meta.model),
         object_id=instance.pk,
@@ -83,8 +102,6 @@ def _generate_transition_history(
         source=source,
         target=target,
     )
-    transition_history.attachments.add(*attachments)
-    return transition_history
 
 
 def _get_history_dict(data, instance, runned_funcs):
@@ -334,53 +351,93 @@ def _prepare_action_data(
     return defaults
 
 
-def _save_instance_after_transition(instance, transition, user=None):
-    # don't save object if any of actions have `disable_save_object` flag set
+def _save_instances_after_transition(instances, transition, user=None):
+    # don't save objects if any of actions have `disable_save_object` flag set
     if not any([a.disable_save_object for a in transition.get_pure_actions()]):
         with transaction.atomic(), reversion.create_revision():
-            instance.save()
+            for instance in instances:
+                instance.save()
             # TODO: store changed fields
             reversion.set_comment("Transition {}".format(transition))
             if user:
                 reversion.set_user(user)
 
 
-def _create_instance_history_entry(
-    instance, transition, data, history_kwargs, requester=None, attachments=None
+def _create_instances_history_entries(
+    instances, transition, data, history_kwargs, requester=None, attachments=None
 ):
+    if not instances:
+        return
     funcs = transition.get_pure_actions()
     action_names = [
         str(getattr(func, "verbose_name", func.__name__.replace("_", " ").capitalize()))
         for func in funcs
     ]
-    history = _get_history_dict(data, instance, funcs)
-    history.update(history_kwargs.get(instance.pk, {}))
-    _generate_transition_history(
-        instance=instance,
-        transition=transition,
-        requester=requester,
-        attachments=attachments,
-        history_kwargs=history,
-        action_names=action_names,
-        field=transition.model.field_name,
-    )
+    # history of actions params is the same for every instance (instances are
+    # of the same type), so related objects are fetched only once
+    common_history = _get_history_dict(data, instances[0], funcs)
+    histories = []
+    for instance in instances:
+        history = common_history.copy()
+        history.update(history_kwargs.get(instance.pk, {}))
+        histories.append(
+            _generate_transition_history(
+                instance=instance,
+                transition=transition,
+                requester=requester,
+                history_kwargs=history,
+                action_names=action_names,
+                field=transition.model.field_name,
+            )
+        )
+    if connection.features.can_return_rows_from_bulk_insert:
+        TransitionsHistory.objects.bulk_create(histories)
+    else:
+        # primary keys are required to link attachments
+        for transition_history in histories:
+            transition_history.save()
+    if attachments:
+        through = TransitionsHistory.attachments.through
+        through.objects.bulk_create(
+            [
+                through(transitionshistory=transition_history, attachment=attachment)
+                for transition_history in histories
+                for attachment in attachments
+            ]
+        )
 
 
-def _post_transition_instance_processing(
-    instance, transition, data, history_kwargs, requester=None, attachments=None
+def _post_transition_instances_processing(
+    instances, transition, data, history_kwargs, requester=None, attachments=None
 ):
     # change transition field (ex. status) if not keeping orignial
     if not int(transition.target) == TRANSITION_ORIGINAL_STATUS[0]:
-        setattr(instance, transition.model.field_name, int(transition.target))
-    _create_instance_history_entry(
-        instance,
+        for instance in instances:
+            setattr(instance, transition.model.field_name, int(transition.target))
+    with _transition_phase_timer(transition, "history"):
+        _create_instances_history_entries(
+            instances,
+            transition,
+            data,
+            history_kwargs,
+            requester=requester,
+            attachments=attachments,
+        )
+    with _transition_phase_timer(transition, "save"):
+        _save_instances_after_transition(instances, transition, requester)
+
+
+def _post_transition_instance_processing(
+    instance, transition, data, history_kwargs, requester=None, attachments=None
+):
+    _post_transition_instances_processing(
+        [instance],
         transition,
         data,
         history_kwargs,
         requester=requester,
         attachments=attachments,
     )
-    _save_instance_after_transition(instance, transition, requester)
 
 
 @transaction.atomic
@@ -415,7 +472,8 @@ def run_field_transition(
             **kwargs,
         )
         try:
-            result = func(instances=instances, requester=requester, **defaults)
+            with _transition_phase_timer(transition, "actions.{}".format(action.name)):
+                result = func(instances=instances, requester=requester, **defaults)
         except Exception as e:
             logger.exception(e)
             return False, None
@@ -427,15 +485,14 @@ def run_field_transition(
                 if isinstance(item, Attachment):
                     attachments.append(item)
 
-    for instance in instances:
-        _post_transition_instance_processing(
-            instance,
-            transition,
-            data,
-            history_kwargs=history_kwargs,
-            requester=requester,
-            attachments=attachments,
-        )
+    _post_transition_instances_processing(
+        instances,
+        transition,
+        data,
+        history_kwargs=history_kwargs,
+        requester=requester,
+        attachments=attachments,
+    )
     return True, attachments
 
 
@@ -8,6 +8,7 @@ from ralph.lib.transitions.models import (
     Transition,
     TransitionModel,
 )
+from ralph.tests.mixins import TemporaryMediaRootMixin
 from ralph.tests.models import Order
 
 
@@ -47,5 +48,5 @@ class TransitionTestCaseMixin(object):
         return transition_model, transition, actions
 
 
-class TransitionTestCase(TransitionTestCaseMixin, TestCase):
+class TransitionTestCase(TransitionTestCaseMixin, TemporaryMediaRootMixin, TestCase):
     pass
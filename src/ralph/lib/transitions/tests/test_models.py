@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.test import RequestFactory
@@ -11,9 +13,11 @@ from ralph.lib.transitions.exceptions import (
 from ralph.lib.transitions.models import (
     _check_and_get_transition,
     _create_graph_from_actions,
+    _create_instances_history_entries,
     run_field_transition,
     Transition,
     TransitionModel,
+    TransitionsHistory,
 )
 from ralph.lib.transitions.tests import TransitionTestCase
 from ralph.tests.models import Foo, Order, OrderStatus
@@ -99,6 +103,69 @@ class TransitionsTest(TransitionTestCase):
         )
         self.assertTrue(order.go_to_post_office.runned)
 
+    def test_transition_history_is_created_for_all_instances(self):
+        orders = [Order.objects.create() for _ in range(3)]
+        _, transition, _ = self._create_transition(
+            model=orders[0],
+            name="prepare",
+            source=[OrderStatus.new.id],
+            target=OrderStatus.to_send.id,
+            actions=["go_to_post_office", "pack"],
+        )
+        success, attachments = run_field_transition(
+            orders, transition, requester=self.request.user, field="status"
+        )
+        self.assertTrue(success)
+        self.assertEqual(len(attachments), 1)
+        history = TransitionsHistory.objects.filter(
+            object_id__in=[order.pk for order in orders]
+        )
+        self.assertEqual(len(history), 3)
+        for transition_history in history:
+            self.assertEqual(transition_history.transition_name, "prepare")
+            self.assertIn("Pack", transition_history.actions)
+            self.assertEqual(list(transition_history.attachments.all()), attachments)
+        for order in orders:
+            order.refresh_from_db()
+            self.assertEqual(order.status, OrderStatus.to_send.id)
+
+    def test_history_is_not_created_for_empty_instances(self):
+        order = Order.objects.create()
+        _, transition, _ = self._create_transition(
+            model=order,
+            name="prepare",
+            source=[OrderStatus.new.id],
+            target=OrderStatus.to_send.id,
+            actions=["go_to_post_office"],
+        )
+        with self.assertNumQueries(0):
+            _create_instances_history_entries(
+                [], transition, {}, {}, requester=self.request.user
+            )
+        self.assertFalse(TransitionsHistory.objects.exists())
+
+    @patch("ralph.lib.transitions.models.statsd")
+    def test_transition_phases_are_timed(self, statsd_mock):
+        order = Order.objects.create()
+        _, transition, _ = self._create_transition(
+            model=order,
+            name="prepare",
+            source=[OrderStatus.new.id],
+            target=OrderStatus.to_send.id,
+            actions=["go_to_post_office"],
+        )
+        run_field_transition(
+            [order], transition, requester=self.request.user, field="status"
+        )
+        self.assertEqual(
+            [call[0][0] for call in statsd_mock.timer.call_args_list],
+            [
+                "transitions.phases.prepare.order.actions.go_to_post_office",
+                "transitions.phases.prepare.order.history",
+                "transitions.phases.prepare.order.save",
+            ],
+        )
+
     def test_action_is_added_to_model_when_registered_on_model(self):
         # action is registered in tests/models.py
         self.assertTrue(hasattr(Order, "action_registered_on_model"))
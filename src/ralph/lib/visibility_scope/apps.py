@@ -1,5 +1,40 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class VisibilityScopeConfig(AppConfig):
     name = "ralph.lib.visibility_scope"
+
+    def ready(self):
+        from ralph.lib.visibility_scope.receivers import invalidate_visible_services
+
+        scope_model = self.get_model("ServiceBasedVisibilityScope")
+        user_model = get_user_model()
+        for model in [scope_model, self.apps.get_model("assets", "Service")]:
+            for signal in [post_save, post_delete]:
+                signal.connect(
+                    receiver=invalidate_visible_services,
+                    sender=model,
+                    dispatch_uid="invalidate_visible_services_{}".format(
+                        model._meta.label_lower
+                    ),
+                )
+        # user's id could be reused by new user
+        post_delete.connect(
+            receiver=invalidate_visible_services,
+            sender=user_model,
+            dispatch_uid="invalidate_visible_services_user",
+        )
+        for through in [
+            scope_model.services.through,
+            user_model.service_visibility_scopes.through,
+            user_model.groups.through,
+        ]:
+            m2m_changed.connect(
+                receiver=invalidate_visible_services,
+                sender=through,
+                dispatch_uid="invalidate_visible_services_{}".format(
+                    through._meta.label_lower
+                ),
+            )
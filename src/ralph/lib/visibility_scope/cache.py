@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Cached ids of services visible to users.
+
+When `VISIBILITY_SCOPE_CACHE_ENABLED` is set, ids of services visible to the
+user (through service-based visibility scopes of the user or user's groups)
+are kept in the cache under current generation of visibility scopes data,
+which is changed (after commit) when any of this data is changed.
+
+Cache hits and misses are counted in metrics collector (statsd).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ralph.lib.cache.generations import (
+    bump_generation,
+    get_generation,
+    schedule_once_on_commit,
+)
+from ralph.lib.metrics import statsd
+
+GENERATION_CACHE_KEY = "visibility_scope_generation"
+CACHE_HIT_METRIC_NAME = "visibility_scope.cache.hit"
+CACHE_MISS_METRIC_NAME = "visibility_scope.cache.miss"
+
+# returned by `get_cached_service_ids` when ids are not cached (None is valid
+# value - user is not limited by any visibility scope)
+MISSING = object()
+
+
+def get_service_ids_key(user):
+    return "visibility_scope_services:{}:{}".format(
+        get_generation(GENERATION_CACHE_KEY), user.pk
+    )
+
+
+def get_cached_service_ids(user):
+    cached = cache.get(get_service_ids_key(user))
+    if cached is None:
+        statsd.incr(CACHE_MISS_METRIC_NAME)
+        return MISSING
+    statsd.incr(CACHE_HIT_METRIC_NAME)
+    # ids are wrapped in tuple to distinguish None from missing value
+    return cached[0]
+
+
+def set_cached_service_ids(user, service_ids):
+    cache.set(
+        get_service_ids_key(user),
+        (service_ids,),
+        settings.VISIBILITY_SCOPE_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_visible_services():
+    """
+    Change generation of visibility scopes data (ids cached in previous
+    generation will never be used).
+    """
+    bump_generation(GENERATION_CACHE_KEY)
+
+
+def schedule_visible_services_invalidation():
+    """
+    Invalidate cached ids of visible services after current transaction is
+    committed (at most once per transaction).
+    """
+    schedule_once_on_commit(invalidate_visible_services)
@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.db.models import Q
 
 from ralph.assets.models import Service
+from ralph.lib.visibility_scope.cache import (
+    get_cached_service_ids,
+    MISSING,
+    set_cached_service_ids,
+)
 from ralph.lib.visibility_scope.models import ServiceBasedVisibilityScope
 
 
@@ -10,17 +16,42 @@ def visibility_scopes_for_user(user):
     )
 
 
+def _get_visible_service_ids(user):
+    scope_ids = list(visibility_scopes_for_user(user).values_list("id", flat=True))
+    if not scope_ids:
+        return None
+    return sorted(
+        set(
+            Service.objects.filter(visibility_scopes__in=scope_ids).values_list(
+                "id", flat=True
+            )
+        )
+    )
+
+
+def get_visible_service_ids(user):
+    """
+    Return ids of services visible to the user or None if user is not limited
+    by any visibility scope.
+    """
+    if not settings.VISIBILITY_SCOPE_CACHE_ENABLED:
+        return _get_visible_service_ids(user)
+    service_ids = get_cached_service_ids(user)
+    if service_ids is MISSING:
+        service_ids = _get_visible_service_ids(user)
+        set_cached_service_ids(user, service_ids)
+    return service_ids
+
+
 def visibility_scope_filter(user):
     if user.is_superuser:
         return Q()
 
-    scopes = visibility_scopes_for_user(user)
-    if not scopes:
+    service_ids = get_visible_service_ids(user)
+    if service_ids is None:
         return Q()
 
-    return Q(
-        service_env__service__in=Service.objects.filter(visibility_scopes__in=scopes)
-    )
+    return Q(service_env__service_id__in=service_ids)
 
 
 def visibility_scope_asset_support_filter(user):
@@ -28,12 +59,8 @@ def visibility_scope_asset_support_filter(user):
     if user.is_superuser:
         return Q()
 
-    scopes = visibility_scopes_for_user(user)
-    if not scopes:
+    service_ids = get_visible_service_ids(user)
+    if service_ids is None:
         return Q()
 
-    return Q(
-        baseobject__service_env__service__in=Service.objects.filter(
-            visibility_scopes__in=scopes
-        )
-    )
+    return Q(baseobject__service_env__service_id__in=service_ids)
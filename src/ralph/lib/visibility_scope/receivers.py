@@ -0,0 +1,15 @@
+from django.conf import settings
+
+from ralph.lib.visibility_scope.cache import schedule_visible_services_invalidation
+
+
+def invalidate_visible_services(sender, action=None, **kwargs):
+    """
+    Invalidate cached ids of services visible to users after visibility
+    scopes data (scopes, their services, users or groups) is changed.
+    """
+    # m2m_changed signal is sent before and after every change
+    if action is not None and not action.startswith("post_"):
+        return
+    if settings.VISIBILITY_SCOPE_CACHE_ENABLED:
+        schedule_visible_services_invalidation()
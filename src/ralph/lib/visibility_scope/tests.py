@@ -1,16 +1,24 @@
 import factory
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Permission
+from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from django.test import TransactionTestCase
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import override_settings, TransactionTestCase
 from django.urls import reverse
 from factory.django import DjangoModelFactory
+from mock import call, patch
 from rest_framework.test import APITestCase
 
 from ralph.accounts.tests.factories import UserFactory
 from ralph.assets.tests.factories import ServiceEnvironmentFactory, ServiceFactory
 from ralph.data_center.models import DataCenterAsset
 from ralph.data_center.tests.factories import DataCenterAssetFactory
+from ralph.lib.visibility_scope.cache import (
+    CACHE_HIT_METRIC_NAME,
+    CACHE_MISS_METRIC_NAME,
+)
+from ralph.lib.visibility_scope.filters import visibility_scope_filter
 from ralph.lib.visibility_scope.models import ServiceBasedVisibilityScope
 from ralph.supports.models import BaseObjectsSupport, Support
 from ralph.virtual.models import VirtualServer
@@ -100,3 +108,58 @@ class TestDataCenterAssetVisibilityInVisibilityScope(
         url = reverse("datacenterasset-list")
         response = self.client.get(url)
         self.assertEqual(response.json()["count"], 3)
+
+
+@override_settings(VISIBILITY_SCOPE_CACHE_ENABLED=True)
+class TestVisibleServicesCache(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.service = ServiceFactory()
+        self.visibility_scope = ServiceBasedVisibilityScopeFactory(name="foo")
+        self.visibility_scope.services.set([self.service])
+        self.user = UserFactory()
+        self.user.service_visibility_scopes.set([self.visibility_scope])
+
+    def _assert_filter(self, user, service_ids):
+        self.assertEqual(
+            visibility_scope_filter(user),
+            Q(service_env__service_id__in=service_ids),
+        )
+
+    def test_filter_is_cached(self):
+        with patch("ralph.lib.visibility_scope.cache.statsd") as statsd_mock:
+            self._assert_filter(self.user, [self.service.id])
+            with self.assertNumQueries(0):
+                self._assert_filter(self.user, [self.service.id])
+        self.assertEqual(
+            statsd_mock.incr.call_args_list,
+            [call(CACHE_MISS_METRIC_NAME), call(CACHE_HIT_METRIC_NAME)],
+        )
+
+    def test_user_without_visibility_scope_is_cached(self):
+        user = UserFactory()
+        self.assertEqual(visibility_scope_filter(user), Q())
+        with self.assertNumQueries(0):
+            self.assertEqual(visibility_scope_filter(user), Q())
+
+    def test_cache_is_invalidated_when_services_are_changed(self):
+        self._assert_filter(self.user, [self.service.id])
+        other_service = ServiceFactory()
+        self.visibility_scope.services.add(other_service)
+        self._assert_filter(self.user, sorted([self.service.id, other_service.id]))
+
+    def test_cache_is_invalidated_when_group_membership_is_changed(self):
+        group = Group.objects.create(name="group")
+        other_service = ServiceFactory()
+        ServiceBasedVisibilityScopeFactory(name="bar", group=group).services.set(
+            [other_service]
+        )
+        self._assert_filter(self.user, [self.service.id])
+        self.user.groups.add(group)
+        self._assert_filter(self.user, sorted([self.service.id, other_service.id]))
+
+    def test_cache_is_invalidated_when_scope_is_deleted(self):
+        self._assert_filter(self.user, [self.service.id])
+        self.visibility_scope.delete()
+        self.assertEqual(visibility_scope_filter(self.user), Q())
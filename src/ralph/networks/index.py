@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+from django.db import transaction
+
+from ralph.lib.cache.generations import (
+    bump_generation,
+    get_generation,
+    schedule_once_on_commit,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class NetworksIndex(object):
+    """
+    Process-level index of networks ranges (`min_ip`-`max_ip`), used to find
+    the smallest network containing IP address (or range of IP addresses)
+    without querying the database. IPv4 and IPv6 networks are kept in the
+    same index (as their numbers).
+
+    Networks (as CIDR ranges) are either nested or disjoint, so the index is
+    kept as sorted list of segments boundaries, each segment pointing to the
+    smallest network covering it, and parent of every network.
+
+    Index is invalidated in the current process when network is saved or
+    deleted. Other processes are notified (after commit) by changing version
+    stored in the (shared) cache, which is checked at most once per
+    `NETWORKS_INDEX_VERSION_CHECK_INTERVAL` seconds. When
+    networks were changed in the current, not committed yet, transaction,
+    the index is not used at all (see `is_usable`).
+    """
+
+    version_cache_key = "networks_index_version"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (version, segments starts, segments networks ids, networks ranges,
+        # networks parents) - replaced at once when index is rebuilt
+        self._index = None
+        # time (monotonic) of the last check of the version in the cache
+        self._version_checked_at = float("-inf")
+
+    def invalidate(self):
+        """
+        Invalidate index after network was changed.
+        """
+        self._index = None
+        connection = transaction.get_connection()
+        if connection.in_atomic_block:
+            self._local.pending_block = connection.atomic_blocks[0]
+        # scheduled once per transaction (ex. when networks are saved in bulk)
+        schedule_once_on_commit(_clear_networks_index)
+
+    def clear(self):
+        """
+        Clear index in the current process and notify other processes to
+        rebuild their indexes.
+        """
+        self._local.pending_block = None
+        self._index = None
+        bump_generation(self.version_cache_key)
+
+    def is_usable(self):
+        """
+        Return False if networks were changed in the current (not committed
+        yet) transaction - index could be built using these changes, which
+        could still be rolled back.
+        """
+        pending_block = getattr(self._local, "pending_block", None)
+        if pending_block is None:
+            return True
+        connection = transaction.get_connection()
+        if connection.atomic_blocks and connection.atomic_blocks[0] is pending_block:
+            return False
+        # transaction in which networks were changed was rolled back
+        self._local.pending_block = None
+        self._index = None
+        return True
+
+    def _build(self, version):
+        from ralph.networks.models import Network
+
+        networks = sorted(
+            (
+                (pk, int(min_ip), int(max_ip))
+                for pk, min_ip, max_ip in Network.objects.values_list(
+                    "pk", "min_ip", "max_ip"
+                )
+            ),
+            key=lambda net: (net[1], -net[2]),
+        )
+        starts = []
+        network_ids = []
+        ranges = {}
+        parents = {}
+
+        def add_segment(start, network_id):
+            if starts and starts[-1] == start:
+                network_ids[-1] = network_id
+            else:
+                starts.append(start)
+                network_ids.append(network_id)
+
+        def pop_network():
+            _, _, max_ip = stack.pop()
+            add_segment(max_ip + 1, stack[-1][0] if stack else None)
+
+        stack = []
+        for network in networks:
+            pk, min_ip, max_ip = network
+            while stack and stack[-1][2] < min_ip:
+                pop_network()
+            ranges[pk] = (min_ip, max_ip)
+            parents[pk] = stack[-1][0] if stack else None
+            stack.append(network)
+            add_segment(min_ip, pk)
+        while stack:
+            pop_network()
+
+        logger.debug("Networks index built (%d networks)", len(networks))
+        return version, starts, network_ids, ranges, parents
+
+    def _get_index(self):
+        index = self._index
+        if (
+            index is not None
+            and time.monotonic() - self._version_checked_at
+            < settings.NETWORKS_INDEX_VERSION_CHECK_INTERVAL
+        ):
+            return index
+        version_checked_at = time.monotonic()
+        version = get_generation(self.version_cache_key)
+        if index is None or index[0] != version:
+            with self._lock:
+                index = self._index
+                if index is None or index[0] != version:
+                    index = self._index = self._build(version)
+        self._version_checked_at = version_checked_at
+        return index
+
+    def find_network_id(self, min_ip, max_ip=None, exclude_id=None):
+        """
+        Return id of the smallest network containing whole `min_ip`-`max_ip`
+        range (or single `min_ip`), other than network with `exclude_id`.
+        """
+        if max_ip is None:
+            max_ip = min_ip
+        _, starts, network_ids, ranges, parents = self._get_index()
+        position = bisect_right(starts, min_ip) - 1
+        network_id = network_ids[position] if position >= 0 else None
+        while network_id is not None and (
+            network_id == exclude_id or ranges[network_id][1] < max_ip
+        ):
+            network_id = parents[network_id]
+        return network_id
+
+
+networks_index = NetworksIndex()
+
+
+def _clear_networks_index():
+    # module-level function (not bound method, which is new object on every
+    # access) - it's scheduled once per transaction
+    networks_index.clear()
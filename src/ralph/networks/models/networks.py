@@ -3,18 +3,23 @@ import ipaddress
 import logging
 import socket
 import struct
+from collections import defaultdict
+from itertools import islice
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
-from django.db.models.signals import post_migrate, pre_save
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 from django.db.utils import ProgrammingError
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from mptt.models import MPTTModel, TreeForeignKey
 
 from ralph.assets.models import AssetLastHostname, Ethernet
-from ralph.dns.dnsaas import DNSaaS
+from ralph.dns.dnsaas import get_shared_dnsaas_client
 from ralph.lib import network as network_tools
 from ralph.lib.mixins.fields import NullableCharField, NullableCharFieldWithAutoStrip
 from ralph.lib.mixins.models import (
@@ -26,17 +31,50 @@ from ralph.lib.mixins.models import (
 )
 from ralph.lib.polymorphic.fields import PolymorphicManyToManyField
 from ralph.networks.fields import IPNetwork
+from ralph.networks.index import networks_index
 from ralph.networks.models.choices import IPAddressStatus
+from ralph.networks.signals import ip_addresses_reassigned
 
 logger = logging.getLogger(__name__)
 
+# number of IPs fetched at once when looking for free IPs in the network
+FREE_IP_SEARCH_WINDOW = 256
+# number of free IP candidates checked at once in DNSaaS
+FREE_IP_DNSAAS_LOOKAHEAD = 32
+# number of IPs updated with single query when reassigning them to networks
+IP_REASSIGN_BATCH_SIZE = 500
+
+
+def _get_dnsaas_negative_cache_key(ip):
+    return "dnsaas_missing_ip:{}".format(ip)
+
+
+def get_ips_in_dnsaas(ips):
+    """
+    Return addresses (out of `ips`) which already have A record in DNSaaS.
+
+    All not cached addresses are checked using single DNSaaS call. Addresses
+    confirmed to be missing in DNSaaS are cached for a short time, so they
+    are not checked again when looking for free IPs in the network.
+    """
+    ips = [str(ip) for ip in ips]
+    if not settings.ENABLE_DNSAAS_INTEGRATION or not ips:
+        return set()
+    cache_keys = {ip: _get_dnsaas_negative_cache_key(ip) for ip in ips}
+    missing_in_cache = cache.get_many(cache_keys.values())
+    ips_to_check = [ip for ip in ips if cache_keys[ip] not in missing_in_cache]
+    if not ips_to_check:
+        return set()
+    ips_in_dnsaas = get_shared_dnsaas_client().get_ips_with_a_records(ips_to_check)
+    cache.set_many(
+        {cache_keys[ip]: True for ip in ips_to_check if ip not in ips_in_dnsaas},
+        timeout=settings.DNSAAS_NEGATIVE_CACHE_TTL,
+    )
+    return ips_in_dnsaas
+
 
 def is_in_dnsaas(ip):
-    if not settings.ENABLE_DNSAAS_INTEGRATION:
-        return False
-    dnsaas_client = DNSaaS()
-    url = dnsaas_client.build_url("records", get_params=[("ip", ip), ("type", "A")])
-    return len(dnsaas_client.get_api_result(url)) > 0
+    return str(ip) in get_ips_in_dnsaas([ip])
 
 
 class NetworkKind(AdminAbsoluteUrlMixin, NamedMixin, models.Model):
@@ -208,21 +246,72 @@ class NetworkEnvironment(
         return hostname.formatted_hostname(self.hostname_template_counter_length)
 
 
+def get_smallest_network_containing_range(min_ip, max_ip, networks, exclude_id=None):
+    """
+    Return id of the smallest network (out of `networks` - list of
+    (id, min_ip, max_ip) tuples) containing whole `min_ip`-`max_ip` range.
+    """
+    containing = [
+        (net_min_ip, -net_max_ip, pk)
+        for pk, net_min_ip, net_max_ip in networks
+        if net_min_ip <= min_ip and net_max_ip >= max_ip and pk != exclude_id
+    ]
+    return max(containing)[2] if containing else None
+
+
+def get_smallest_networks_containing_numbers(numbers, networks):
+    """
+    Return dict with id of the smallest network (out of `networks` - list of
+    (id, min_ip, max_ip) tuples) containing IP for every number in `numbers`.
+
+    Networks (as CIDR ranges) are either nested or disjoint, so numbers and
+    networks are swept once in ascending order, keeping stack of networks
+    containing current number (the smallest one at the top).
+    """
+    networks = sorted(networks, key=lambda net: (net[1], -net[2]))
+    result = {}
+    stack = []
+    next_network = 0
+    for number in sorted(set(numbers)):
+        while next_network < len(networks) and networks[next_network][1] <= number:
+            network = networks[next_network]
+            while stack and stack[-1][2] < network[1]:
+                stack.pop()
+            stack.append(network)
+            next_network += 1
+        while stack and stack[-1][2] < number:
+            stack.pop()
+        result[number] = stack[-1][0] if stack else None
+    return result
+
+
 class NetworkMixin(object):
     _parent_attr = None
 
     def _assign_parent(self):
-        setattr(self, self._parent_attr, self.get_network())
+        setattr(self, self._parent_attr + "_id", self.get_network_id())
+
+    def _get_search_range(self):
+        """
+        Return (min_ip, max_ip, excluded network id) used to search for
+        the smallest network containing current object.
+        """
+        raise NotImplementedError()
 
     def search_networks(self):
         raise NotImplementedError()
 
+    def get_network_id(self):
+        if settings.NETWORKS_INDEX_ENABLED and networks_index.is_usable():
+            min_ip, max_ip, exclude_id = self._get_search_range()
+            return networks_index.find_network_id(min_ip, max_ip, exclude_id=exclude_id)
+        return self.search_networks().values_list("pk", flat=True).first()
+
     def get_network(self):
-        network = None
-        networks = self.search_networks()
-        if networks:
-            network = networks[0]
-        return network
+        network_id = self.get_network_id()
+        if network_id is None:
+            return None
+        return Network.objects.get(pk=network_id)
 
 
 class Network(
@@ -447,11 +536,10 @@ class Network(
 
         # change related ips and (sub)networks only if address has changed
         if self._has_address_changed or creating:
-            # after changing address, assign new ips to this network
-            self._assign_new_ips_to_network()
-            # change also ip addresses which are no longer in scope of current
-            # network
-            self._unassign_ips_from_network()
+            # after changing address, assign new ips to this network and ip
+            # addresses which are no longer in scope of current network to
+            # another network
+            self._reassign_ips()
             if update_subnetworks_parent:
                 self._update_subnetworks_parent(prev_subnetworks)
 
@@ -463,57 +551,100 @@ class Network(
             self.save()
             super().delete()
 
+    def _get_networks_in_range(self, min_ip, max_ip):
+        """
+        Return (id, min_ip, max_ip) of every network overlapping with
+        `min_ip`-`max_ip` range (including networks containing whole range).
+        """
+        return [
+            (pk, int(net_min_ip), int(net_max_ip))
+            for pk, net_min_ip, net_max_ip in Network.objects.filter(
+                min_ip__lte=max_ip, max_ip__gte=min_ip
+            ).values_list("pk", "min_ip", "max_ip")
+        ]
+
     def _update_subnetworks_parent(self, prev_subnetworks):
         """
         When address change, update information about parent in previous and
         current subnetworks.
+
+        New parent of every affected subnetwork is computed in memory and only
+        subnetworks which parent has changed are saved.
         """
-        # re-save previous subnetworks
-        for network in prev_subnetworks:
-            network.save(update_subnetworks_parent=False)
-        # re-save current subnetworks
-        for network in self.get_immediate_subnetworks():
-            network.save(update_subnetworks_parent=False)
+        subnetworks = {network.pk: network for network in prev_subnetworks}
+        subnetworks.update(
+            (network.pk, network) for network in self.get_immediate_subnetworks()
+        )
         # current network is intermediate network between previous parent and
-        # previous child - re-save child to assign current network as a parent
+        # previous child - child has to be re-saved to assign current network
+        # as a parent
         # example:
         # previous state:
         # * netX: 10.20.30.0/24 (parent)
         # * netY: 10.20.30.240/28 (child)
         # adding new network netZ 10.20.30.128/25
         # -> should change parent of netY to netZ
-        for network in self.__class__._default_manager.filter(
-            parent=self.parent, min_ip__gte=self.min_ip, max_ip__lte=self.max_ip
-        ):
-            network.save(update_subnetworks_parent=False)
+        subnetworks.update(
+            (network.pk, network)
+            for network in self.__class__._default_manager.filter(
+                parent=self.parent, min_ip__gte=self.min_ip, max_ip__lte=self.max_ip
+            )
+        )
+        subnetworks.pop(self.pk, None)
+        if not subnetworks:
+            return
+        networks = self._get_networks_in_range(
+            min(int(network.min_ip) for network in subnetworks.values()),
+            max(int(network.max_ip) for network in subnetworks.values()),
+        )
+        for network in subnetworks.values():
+            parent_id = get_smallest_network_containing_range(
+                int(network.min_ip),
+                int(network.max_ip),
+                networks,
+                exclude_id=network.pk,
+            )
+            if network.parent_id != parent_id:
+                network.save(update_subnetworks_parent=False)
 
-    def _assign_new_ips_to_network(self):
+    def _reassign_ips(self):
         """
-        Filter IP addresses in scope of this network and save them, to
-        (possibly) assign them to current network (according to rules in
-        IPAddress.save)
+        Assign IP addresses in scope of this network and IP addresses assigned
+        to this network (which might no longer be in its scope) to the
+        smallest network containing them.
+
+        New network of every affected IP is computed in memory and only
+        changed IPs are updated, using single UPDATE per new network (instead
+        of saving every IP, which searches for its network again).
         """
-        for ip in (
-            IPAddress.objects.exclude(
+        ips = list(
+            IPAddress.objects.filter(
+                Q(number__gte=self.min_ip, number__lte=self.max_ip) | Q(network=self)
+            ).values_list("pk", "number", "network_id")
+        )
+        if not ips:
+            return
+        numbers = [int(number) for _, number, _ in ips]
+        networks_by_number = get_smallest_networks_containing_numbers(
+            numbers, self._get_networks_in_range(min(numbers), max(numbers))
+        )
+        changed_ips = defaultdict(list)
+        for pk, number, network_id in ips:
+            new_network_id = networks_by_number[int(number)]
+            if new_network_id != network_id:
+                changed_ips[new_network_id].append(pk)
+        now = timezone.now()
+        for new_network_id, ip_ids in changed_ips.items():
+            for i in range(0, len(ip_ids), IP_REASSIGN_BATCH_SIZE):
+                IPAddress.objects.filter(
+                    pk__in=ip_ids[i : i + IP_REASSIGN_BATCH_SIZE]
+                ).update(network_id=new_network_id, modified=now)
+            ip_addresses_reassigned.send(
+                sender=self.__class__,
                 network=self,
+                new_network_id=new_network_id,
+                ip_ids=ip_ids,
             )
-            .exclude(network__in=self.get_subnetworks())
-            .filter(number__gte=self.min_ip, number__lte=self.max_ip)
-        ):
-            # call save instead of update - ip might be assigned to another
-            # (smaller) network, which became subnetwork of current network
-            ip.save()
-
-    def _unassign_ips_from_network(self):
-        """
-        Filter IPAddresses which are assigned to current network, but should
-        NOT be (their address is not in scope of current network) and save them
-        (to reassign them to another network).
-        """
-        for ip in IPAddress.objects.filter(
-            network=self, number__lt=self.min_ip, number__gt=self.max_ip
-        ):
-            ip.save()
 
     def get_subnetworks(self):
         return self.get_descendants()
@@ -521,30 +652,128 @@ class Network(
     def get_immediate_subnetworks(self):
         return self.get_children()
 
-    def get_first_free_ip(self):
-        used_ips = set(
-            IPAddress.objects.filter(
-                number__range=(self.min_ip, self.max_ip)
-            ).values_list("number", flat=True)
-        )
+    def _get_assignable_ip_range(self):
         # add one to omit network address
         min_ip = int(self.min_ip + 1 + self.reserved_from_beginning)
         # subtract 1 to omit broadcast address
         max_ip = int(self.max_ip - 1 - self.reserved_from_end)
-        free_ip_as_int = None
-        for free_ip_as_int in range(min_ip, max_ip + 1):
-            if free_ip_as_int not in used_ips:
-                next_free_ip = ipaddress.ip_address(free_ip_as_int)
-                if is_in_dnsaas(next_free_ip):
-                    logger.warning("IP %s is already in DNS", next_free_ip)
-                else:
-                    return next_free_ip
+        return min_ip, max_ip
+
+    def _count_used_ips(self, min_ip, max_ip):
+        return IPAddress.objects.filter(number__range=(min_ip, max_ip)).count()
+
+    def _find_first_free_ip_number(self, min_ip, max_ip):
+        """
+        Find the lowest not used IP number in `min_ip`-`max_ip` range.
+
+        Range is bisected using (index only) COUNT queries - when the lower
+        half is fully used, the first gap has to be in the upper half. This
+        takes O(log n) queries instead of fetching every used IP in range.
+        """
+        if min_ip > max_ip:
+            return None
+        if self._count_used_ips(min_ip, max_ip) == max_ip - min_ip + 1:
+            return None
+        while min_ip < max_ip:
+            middle = (min_ip + max_ip) // 2
+            if self._count_used_ips(min_ip, middle) == middle - min_ip + 1:
+                min_ip = middle + 1
+            else:
+                max_ip = middle
+        return min_ip
+
+    def _iter_free_ip_numbers(self):
+        """
+        Yield (lazily) not used IP numbers from the assignable range of the
+        network, in ascending order.
+        """
+        min_ip, max_ip = self._get_assignable_ip_range()
+        while min_ip <= max_ip:
+            min_ip = self._find_first_free_ip_number(min_ip, max_ip)
+            if min_ip is None:
+                return
+            # fetch used IPs only in a small window after the gap to not
+            # bisect again for every consecutive free IP
+            window_end = min(max_ip, min_ip + FREE_IP_SEARCH_WINDOW - 1)
+            used_ips = set(
+                int(number)
+                for number in IPAddress.objects.filter(
+                    number__range=(min_ip, window_end)
+                ).values_list("number", flat=True)
+            )
+            for number in range(min_ip, window_end + 1):
+                if number not in used_ips:
+                    yield number
+            min_ip = window_end + 1
+
+    def get_first_free_ips(self, count):
+        """
+        Return list of (at most) `count` first free IPs in the network,
+        respecting reserved addresses from the beginning and the end of the
+        network.
+
+        When DNSaaS integration is enabled, candidates are checked in DNSaaS
+        in batches (looking ahead over next few free IPs), so the number of
+        DNSaaS calls does not grow with every IP already present in DNS.
+        """
+        free_ips = []
+        if count <= 0:
+            return free_ips
+        lookahead = (
+            FREE_IP_DNSAAS_LOOKAHEAD if settings.ENABLE_DNSAAS_INTEGRATION else 0
+        )
+        free_ip_numbers = self._iter_free_ip_numbers()
+        while len(free_ips) < count:
+            candidates = [
+                ipaddress.ip_address(number)
+                for number in islice(
+                    free_ip_numbers, max(count - len(free_ips), lookahead)
+                )
+            ]
+            if not candidates:
+                break
+            ips_in_dnsaas = get_ips_in_dnsaas(candidates)
+            for candidate in candidates:
+                if str(candidate) in ips_in_dnsaas:
+                    logger.warning("IP %s is already in DNS", candidate)
+                    continue
+                free_ips.append(candidate)
+                if len(free_ips) >= count:
+                    break
+        return free_ips
+
+    def get_first_free_ip(self):
+        free_ips = self.get_first_free_ips(1)
+        return free_ips[0] if free_ips else None
 
     def issue_next_free_ip(self):
         # TODO: exception when any free IP found
         ip_address = self.get_first_free_ip()
         return IPAddress.objects.create(address=str(ip_address))
 
+    def issue_next_free_ips(self, count):
+        """
+        Create `count` IP addresses using first free IPs in the network.
+
+        All addresses are reserved in a single transaction, with network
+        locked for the time of issuing to prevent concurrent issuers from
+        getting the same addresses.
+        """
+        with transaction.atomic():
+            Network.objects.select_for_update().get(pk=self.pk)
+            free_ips = self.get_first_free_ips(count)
+            if len(free_ips) < count:
+                raise ValidationError(
+                    "Not enough free IP addresses in {} "
+                    "({} requested, {} available)".format(self, count, len(free_ips))
+                )
+            return [
+                IPAddress.objects.create(address=str(free_ip)) for free_ip in free_ips
+            ]
+
+    def _get_search_range(self):
+        return int(self.min_ip), int(self.max_ip), self.pk
+
     def search_networks(self):
         """
         Search networks (ancestors) order first by min_ip descending,
@@ -770,6 +999,10 @@ class IPAddress(
             self.ethernet = eth
             self.save()
 
+    def _get_search_range(self):
+        int_value = int(self.ip)
+        return int_value, int_value, None
+
     def search_networks(self):
         """
         Search networks (ancestors) order first by min_ip descending,
@@ -783,6 +1016,12 @@ class IPAddress(
         return nets
 
 
+@receiver(post_save, sender=Network)
+@receiver(post_delete, sender=Network)
+def invalidate_networks_index(sender, **kwargs):
+    networks_index.invalidate()
+
+
 @receiver(post_migrate)
 def rebuild_handler(sender, **kwargs):
     """
@@ -790,6 +1029,7 @@ def rebuild_handler(sender, **kwargs):
     """
     # post_migrate is called after each app's migrations
     if sender.name == "ralph." + Network._meta.app_label:
+        networks_index.clear()
         try:
             Network.objects.rebuild()
         except ProgrammingError:
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# This signal is sent when IP addresses were (in bulk) assigned to another
+# network, because address of the `network` has changed (or the network was
+# created or deleted). Signal is sent once for every new network, with
+# `new_network_id` (could be None) and `ip_ids` (list of IP addresses ids)
+# arguments. `post_save` is NOT sent for these IP addresses.
+ip_addresses_reassigned = Signal()
@@ -0,0 +1,49 @@
+from ipaddress import ip_network
+
+from ralph.networks.models.networks import IPAddress, Network
+from ralph.tests import RalphTestCase
+from ralph.tests.benchmarks import benchmark, measure
+
+
+@benchmark
+class NetworkIPsReassignBenchmark(RalphTestCase):
+    """
+    Compare reassigning IPs of synthetic /16 network (65k IPs) when
+    subnetwork covering all of them is created, with saving every IP
+    separately (previous behaviour).
+    """
+
+    def setUp(self):
+        self.parent = Network.objects.create(name="parent", address="10.0.0.0/8")
+        IPAddress.objects.bulk_create(
+            [
+                IPAddress(address=str(ip), number=int(ip), network=self.parent)
+                for ip in ip_network("10.20.0.0/16").hosts()
+            ],
+            batch_size=5000,
+        )
+
+    def test_reassign_ips_on_network_create(self):
+        with measure("bulk reassign", queries=True):
+            net = Network.objects.create(name="net", address="10.20.0.0/16")
+        self.assertEqual(net.ips.count(), 65534)
+
+    def test_reassign_ips_by_saving_every_ip(self):
+        # saving all 65k IPs one by one takes too long - time is extrapolated
+        # from the sample
+        sample_size = 2000
+        net = Network.objects.create(name="net", address="10.21.0.0/16")
+        Network.objects.filter(pk=net.pk).update(
+            address="10.20.0.0/16",
+            min_ip=int(ip_network("10.20.0.0/16").network_address),
+            max_ip=int(ip_network("10.20.0.0/16").broadcast_address),
+        )
+        net.refresh_from_db()
+        with measure(
+            "save every IP (extrapolated)", scale=65534 / sample_size, queries=True
+        ):
+            for ip in IPAddress.objects.filter(
+                number__gte=net.min_ip, number__lte=net.max_ip
+            )[:sample_size]:
+                ip.save()
+        self.assertEqual(net.ips.count(), sample_size)
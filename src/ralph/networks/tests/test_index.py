@@ -0,0 +1,181 @@
+from ipaddress import ip_address
+from unittest.mock import patch
+
+from ddt import data, ddt, unpack
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from ralph.networks.index import _clear_networks_index, networks_index
+from ralph.networks.models import IPAddress, Network
+from ralph.tests import RalphTestCase
+
+IP_IN_NET2 = int(ip_address("10.1.0.1"))
+
+
+@ddt
+class NetworksIndexTest(RalphTestCase):
+    def setUp(self):
+        super().setUp()
+        self.net1 = Network.objects.create(name="net1", address="10.0.0.0/8")
+        self.net2 = Network.objects.create(name="net2", address="10.1.0.0/16")
+        self.net3 = Network.objects.create(name="net3", address="10.1.1.0/24")
+        self.net4 = Network.objects.create(name="net4", address="10.1.1.128/25")
+        self.net5 = Network.objects.create(name="net5", address="10.2.0.0/16")
+        self.net6 = Network.objects.create(name="net6", address="2001:db8::/32")
+        self.net7 = Network.objects.create(name="net7", address="2001:db8:1::/48")
+        # simulate commit of networks changes
+        networks_index.clear()
+
+    def tearDown(self):
+        # networks created in the test are rolled back
+        networks_index.clear()
+        super().tearDown()
+
+    def _find(self, address, exclude=None):
+        network = Network(address=address)
+        network.min_ip = int(network.network_address)
+        network.max_ip = int(network.broadcast_address)
+        network_id = networks_index.find_network_id(
+            network.min_ip,
+            network.max_ip,
+            exclude_id=getattr(self, exclude).pk if exclude else None,
+        )
+        return network_id
+
+    @unpack
+    @data(
+        ("10.1.1.200/32", "net4"),
+        ("10.1.1.255/32", "net4"),
+        ("10.1.1.10/32", "net3"),
+        ("10.1.2.0/32", "net2"),
+        ("10.2.0.0/32", "net5"),
+        ("10.3.0.0/32", "net1"),
+        ("11.0.0.0/32", None),
+        ("9.255.255.255/32", None),
+        ("10.1.1.0/25", "net3"),
+        ("10.1.0.0/23", "net2"),
+        ("2001:db8:1::1/128", "net7"),
+        ("2001:db8:2::1/128", "net6"),
+        ("2001:dba::1/128", None),
+    )
+    def test_find_network_id(self, address, network):
+        self.assertEqual(
+            self._find(address), getattr(self, network).pk if network else None
+        )
+
+    @unpack
+    @data(
+        ("10.1.1.128/25", "net4", "net3"),
+        ("10.1.0.0/16", "net2", "net1"),
+        ("10.0.0.0/8", "net1", None),
+    )
+    def test_find_network_id_with_excluded_network(self, address, exclude, network):
+        self.assertEqual(
+            self._find(address, exclude=exclude),
+            getattr(self, network).pk if network else None,
+        )
+
+    def test_find_network_id_does_not_query_database_when_built(self):
+        networks_index.find_network_id(1)
+        with self.assertNumQueries(0):
+            for ip in ["10.1.1.1", "10.2.3.4", "192.168.1.1"]:
+                networks_index.find_network_id(int(IPAddress(address=ip).ip))
+
+    def _move_net4(self):
+        # update doesn't send any signal
+        Network.objects.filter(pk=self.net4.pk).update(
+            min_ip=int(ip_address("10.3.0.0")), max_ip=int(ip_address("10.3.0.255"))
+        )
+
+    @override_settings(NETWORKS_INDEX_VERSION_CHECK_INTERVAL=0)
+    def test_index_is_rebuilt_when_version_changes(self):
+        networks_index.find_network_id(1)
+        self._move_net4()
+        self.assertEqual(self._find("10.1.1.200/32"), self.net4.pk)
+        # other process changed networks
+        cache.set(networks_index.version_cache_key, "new-version")
+        self.assertEqual(self._find("10.1.1.200/32"), self.net3.pk)
+
+    @override_settings(NETWORKS_INDEX_VERSION_CHECK_INTERVAL=0)
+    def test_index_is_rebuilt_when_version_is_missing(self):
+        networks_index.find_network_id(1)
+        self._move_net4()
+        # ex. cache was flushed
+        cache.delete(networks_index.version_cache_key)
+        self.assertEqual(self._find("10.1.1.200/32"), self.net3.pk)
+
+    @override_settings(NETWORKS_INDEX_VERSION_CHECK_INTERVAL=60)
+    def test_version_is_checked_once_per_interval(self):
+        networks_index.find_network_id(1)
+        self._move_net4()
+        cache.set(networks_index.version_cache_key, "new-version")
+        with patch.object(cache, "get", wraps=cache.get) as cache_get_mock:
+            self.assertEqual(self._find("10.1.1.200/32"), self.net4.pk)
+            self.assertEqual(self._find("10.1.1.10/32"), self.net3.pk)
+        self.assertFalse(cache_get_mock.called)
+        with override_settings(NETWORKS_INDEX_VERSION_CHECK_INTERVAL=0):
+            # interval passed
+            self.assertEqual(self._find("10.1.1.200/32"), self.net3.pk)
+
+    def test_index_is_cleared_once_per_transaction(self):
+        for i in range(3):
+            Network.objects.create(
+                name="net{}".format(i + 8), address="10.3.{}.0/24".format(i)
+            )
+        self.net1.save()
+        self.assertEqual(
+            [
+                callback
+                for _, callback, _ in connection.run_on_commit
+                if callback is _clear_networks_index
+            ],
+            [_clear_networks_index],
+        )
+
+    def test_network_change_makes_index_unusable_until_commit(self):
+        self.assertTrue(networks_index.is_usable())
+        Network.objects.create(name="net8", address="10.1.1.192/26")
+        self.assertFalse(networks_index.is_usable())
+
+    @override_settings(NETWORKS_INDEX_ENABLED=True)
+    def test_ip_address_network_assigned_using_index(self):
+        networks_index.find_network_id(1)
+        ip = IPAddress(address="10.1.1.200")
+        with CaptureQueriesContext(connection) as queries:
+            ip.save()
+        self.assertEqual(ip.network_id, self.net4.pk)
+        self.assertFalse(
+            [query for query in queries if "networks_network" in query["sql"]]
+        )
+
+    @override_settings(NETWORKS_INDEX_ENABLED=True)
+    def test_network_parent_assigned_using_index(self):
+        net = Network(name="net8", address="10.1.1.192/26")
+        net.min_ip = int(net.network_address)
+        net.max_ip = int(net.broadcast_address)
+        self.assertEqual(net.get_network_id(), self.net4.pk)
+
+
+class NetworksIndexTransactionTest(TransactionTestCase):
+    def test_index_is_used_again_after_rollback(self):
+        net = Network.objects.create(name="net1", address="10.0.0.0/8")
+        self.assertTrue(networks_index.is_usable())
+        try:
+            with transaction.atomic():
+                Network.objects.create(name="net2", address="10.1.0.0/16")
+                self.assertFalse(networks_index.is_usable())
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertTrue(networks_index.is_usable())
+        self.assertEqual(networks_index.find_network_id(IP_IN_NET2), net.pk)
+
+    def test_index_is_invalidated_after_commit(self):
+        net1 = Network.objects.create(name="net1", address="10.0.0.0/8")
+        self.assertEqual(networks_index.find_network_id(IP_IN_NET2), net1.pk)
+        with transaction.atomic():
+            net2 = Network.objects.create(name="net2", address="10.1.0.0/16")
+        self.assertTrue(networks_index.is_usable())
+        self.assertEqual(networks_index.find_network_id(IP_IN_NET2), net2.pk)
@@ -1,10 +1,13 @@
 from ipaddress import ip_address, ip_network
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from ddt import data, ddt, unpack
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.db.models import F
 from django.test import override_settings, RequestFactory
+from django.test.utils import CaptureQueriesContext
 
 from ralph.admin.helpers import CastToInteger
 from ralph.assets.models import AssetLastHostname
@@ -16,7 +19,13 @@ from ralph.data_center.tests.factories import (
 )
 from ralph.networks.admin import NetworkAdmin
 from ralph.networks.filters import NetworkClassFilter
-from ralph.networks.models.networks import IPAddress, Network
+from ralph.networks.models.networks import (
+    get_ips_in_dnsaas,
+    get_smallest_networks_containing_numbers,
+    IPAddress,
+    Network,
+)
+from ralph.networks.signals import ip_addresses_reassigned
 from ralph.networks.tests.factories import (
     IPAddressFactory,
     NetworkEnvironmentFactory,
@@ -233,13 +242,14 @@ class NetworkTest(RalphTestCase):
     def test_get_first_free_ip_respect_DNSaaS(
         self, network_addr, dnsaas_enabled, records, first_free
     ):
-        def is_in_dnsaas_mocked(ip):
+        def get_ips_in_dnsaas_mocked(ips):
             if not dnsaas_enabled:
-                return False
-            return str(ip) in records
+                return set()
+            return {str(ip) for ip in ips if str(ip) in records}
 
         patcher = patch(
-            "ralph.networks.models.networks.is_in_dnsaas", is_in_dnsaas_mocked
+            "ralph.networks.models.networks.get_ips_in_dnsaas",
+            get_ips_in_dnsaas_mocked,
         )
         net = Network.objects.create(
             address=network_addr,
@@ -251,6 +261,142 @@ class NetworkTest(RalphTestCase):
             self.assertEqual(net.get_first_free_ip(), first_free)
             patcher.stop()
 
+    @unpack
+    @data(
+        ("192.168.1.0/29", 3, [], ["192.168.1.1", "192.168.1.2", "192.168.1.3"]),
+        (
+            "192.168.1.0/29",
+            3,
+            ["192.168.1.1", "192.168.1.3"],
+            ["192.168.1.2", "192.168.1.4", "192.168.1.5"],
+        ),
+        (
+            "192.168.1.0/29",
+            10,
+            ["192.168.1.2"],
+            [
+                "192.168.1.1",
+                "192.168.1.3",
+                "192.168.1.4",
+                "192.168.1.5",
+                "192.168.1.6",
+            ],
+        ),
+        ("192.168.1.0/29", 0, [], []),
+    )
+    def test_get_first_free_ips(self, network_addr, count, used, first_free):
+        net = Network.objects.create(
+            address=network_addr, reserved_from_beginning=0, reserved_from_end=0
+        )
+        for ip in used:
+            IPAddress.objects.create(address=ip, network=net)
+        self.assertEqual(
+            net.get_first_free_ips(count), [ip_address(ip) for ip in first_free]
+        )
+
+    def test_get_first_free_ip_skips_fully_used_ranges(self):
+        net = Network.objects.create(
+            address="10.20.0.0/22", reserved_from_beginning=0, reserved_from_end=0
+        )
+        IPAddress.objects.bulk_create(
+            [
+                IPAddress(address=str(ip), number=int(ip), network=net)
+                for ip in list(net.network.hosts())[:700]
+                if str(ip) != "10.20.1.150"
+            ]
+        )
+        self.assertEqual(
+            net.get_first_free_ips(3),
+            [
+                ip_address("10.20.1.150"),
+                ip_address("10.20.2.189"),
+                ip_address("10.20.2.190"),
+            ],
+        )
+
+    def test_get_first_free_ip_with_window_smaller_than_range(self):
+        net = Network.objects.create(
+            address="10.20.0.0/24", reserved_from_beginning=0, reserved_from_end=0
+        )
+        IPAddress.objects.create(address="10.20.0.3", network=net)
+        IPAddress.objects.create(address="10.20.0.6", network=net)
+        with patch("ralph.networks.models.networks.FREE_IP_SEARCH_WINDOW", 2):
+            self.assertEqual(
+                net.get_first_free_ips(5),
+                [
+                    ip_address("10.20.0.1"),
+                    ip_address("10.20.0.2"),
+                    ip_address("10.20.0.4"),
+                    ip_address("10.20.0.5"),
+                    ip_address("10.20.0.7"),
+                ],
+            )
+
+    def test_issue_next_free_ips(self):
+        net = Network.objects.create(
+            address="192.168.1.0/29", reserved_from_beginning=1, reserved_from_end=0
+        )
+        IPAddress.objects.create(address="192.168.1.3", network=net)
+        ips = net.issue_next_free_ips(3)
+        self.assertEqual(
+            [ip.address for ip in ips],
+            ["192.168.1.2", "192.168.1.4", "192.168.1.5"],
+        )
+        for ip in ips:
+            self.assertEqual(ip.network, net)
+        self.assertEqual(net.ips.count(), 4)
+
+    def test_issue_next_free_ips_not_enough_free_ips(self):
+        net = Network.objects.create(
+            address="192.168.1.0/29", reserved_from_beginning=0, reserved_from_end=0
+        )
+        IPAddress.objects.create(address="192.168.1.3", network=net)
+        with self.assertRaises(ValidationError):
+            net.issue_next_free_ips(6)
+        self.assertEqual(net.ips.count(), 1)
+
+    @override_settings(ENABLE_DNSAAS_INTEGRATION=True)
+    @patch("ralph.networks.models.networks.get_shared_dnsaas_client")
+    def test_get_first_free_ips_checks_dnsaas_in_batches(self, client_mock):
+        cache.clear()
+        client_mock.return_value.get_ips_with_a_records.side_effect = lambda ips: {
+            ip for ip in ips if ip.endswith((".1", ".2", ".3", ".5"))
+        }
+        net = Network.objects.create(
+            address="192.168.1.0/24", reserved_from_beginning=0, reserved_from_end=0
+        )
+        with patch("ralph.networks.models.networks.FREE_IP_DNSAAS_LOOKAHEAD", 8):
+            free_ips = net.get_first_free_ips(3)
+        self.assertEqual(
+            free_ips,
+            [
+                ip_address("192.168.1.4"),
+                ip_address("192.168.1.6"),
+                ip_address("192.168.1.7"),
+            ],
+        )
+        client_mock.return_value.get_ips_with_a_records.assert_called_once_with(
+            ["192.168.1.{}".format(i) for i in range(1, 9)]
+        )
+
+    @override_settings(ENABLE_DNSAAS_INTEGRATION=True)
+    @patch("ralph.networks.models.networks.get_shared_dnsaas_client")
+    def test_get_ips_in_dnsaas_caches_missing_ips(self, client_mock):
+        cache.clear()
+        client_mock.return_value.get_ips_with_a_records.return_value = {"10.0.0.1"}
+        self.assertEqual(get_ips_in_dnsaas(["10.0.0.1", "10.0.0.2"]), {"10.0.0.1"})
+        self.assertEqual(get_ips_in_dnsaas(["10.0.0.1", "10.0.0.2"]), {"10.0.0.1"})
+        self.assertEqual(
+            client_mock.return_value.get_ips_with_a_records.call_args_list[1][0],
+            (["10.0.0.1"],),
+        )
+
+    @override_settings(ENABLE_DNSAAS_INTEGRATION=False)
+    @patch("ralph.networks.models.networks.get_shared_dnsaas_client")
+    def test_get_ips_in_dnsaas_when_integration_disabled(self, client_mock):
+        self.assertEqual(get_ips_in_dnsaas(["10.0.0.1"]), set())
+        client_mock.assert_not_called()
+
     def test_min_and_max_ip_are_assigned(self):
         net = Network.objects.create(name="net", address="1.0.0.0/16")
 
@@ -308,6 +454,76 @@ class NetworkTest(RalphTestCase):
         ip.refresh_from_db()
         self.assertTrue(ip)
 
+    def test_network_address_change_should_reassign_ips_out_of_scope(self):
+        parent = Network.objects.create(name="parent", address="10.30.0.0/16")
+        net = Network.objects.create(name="net", address="10.30.1.0/24")
+        ip_in_scope = IPAddress.objects.create(address="10.30.1.200")
+        ip_out_of_scope = IPAddress.objects.create(address="10.30.1.10")
+        self.assertEqual(ip_out_of_scope.network, net)
+
+        net.address = "10.30.1.128/25"
+        net.save()
+
+        self.refresh_objects_from_db(ip_in_scope, ip_out_of_scope)
+        self.assertEqual(ip_in_scope.network, net)
+        self.assertEqual(ip_out_of_scope.network, parent)
+
+    def test_network_create_should_send_ip_addresses_reassigned_signal(self):
+        parent = Network.objects.create(name="parent", address="10.30.0.0/16")
+        ip1 = IPAddress.objects.create(address="10.30.1.1")
+        ip2 = IPAddress.objects.create(address="10.30.1.2")
+        IPAddress.objects.create(address="10.30.2.1")
+        receiver = MagicMock()
+        ip_addresses_reassigned.connect(receiver)
+        try:
+            net = Network.objects.create(name="net", address="10.30.1.0/24")
+        finally:
+            ip_addresses_reassigned.disconnect(receiver)
+
+        receiver.assert_called_once()
+        kwargs = receiver.call_args[1]
+        self.assertEqual(kwargs["network"], net)
+        self.assertEqual(kwargs["new_network_id"], net.pk)
+        self.assertCountEqual(kwargs["ip_ids"], [ip1.pk, ip2.pk])
+        self.assertEqual(parent.ips.count(), 1)
+
+    def test_network_create_queries_count_does_not_depend_on_ips_count(self):
+        def count_queries(address, ips_count):
+            net = Network.objects.create(name=address, address=address)
+            IPAddress.objects.bulk_create(
+                [
+                    IPAddress(address=str(ip), number=int(ip), network=net)
+                    for ip in list(net.network.hosts())[:ips_count]
+                ]
+            )
+            with CaptureQueriesContext(connection) as queries:
+                Network.objects.create(
+                    name="sub " + address, address=next(net.network.subnets(1))
+                )
+            return len(queries)
+
+        self.assertEqual(
+            count_queries("10.40.0.0/24", 10), count_queries("10.41.0.0/22", 500)
+        )
+
+    @unpack
+    @data(
+        (
+            [10, 20, 25, 30, 300],
+            [(1, 0, 255), (2, 16, 31), (3, 24, 27)],
+            [1, 2, 3, 2, None],
+        ),
+        ([5, 6], [(1, 0, 3), (2, 8, 11)], [None, None]),
+        ([0, 255], [(1, 0, 255), (2, 0, 127)], [2, 1]),
+    )
+    def test_get_smallest_networks_containing_numbers(
+        self, numbers, networks, expected
+    ):
+        self.assertEqual(
+            get_smallest_networks_containing_numbers(numbers, networks),
+            dict(zip(numbers, expected)),
+        )
+
 
 class NetworkEnvironmentTest(RalphTestCase):
     def test_issue_next_hostname(self):
@@ -1,9 +1,9 @@
 # -*- coding: utf-8 -*-
+from django.apps import apps
 from django.conf import settings
+from django.db.models.signals import post_save
 
 from ralph.apps import RalphAppConfig
-from ralph.notifications.sender import send_notification_for_model
-from ralph.signals import post_commit
 
 
 class NotificationConfig(RalphAppConfig):
@@ -15,6 +15,8 @@ class NotificationConfig(RalphAppConfig):
         super().ready()
         if not settings.ENABLE_EMAIL_NOTIFICATION:
             return
+        from ralph.notifications.sender import schedule_notification_for_model
+
         models = [
             "data_center.DataCenterAsset",
             "data_center.Cluster",
@@ -22,4 +24,8 @@ class NotificationConfig(RalphAppConfig):
             "virtual.CloudProject",
         ]
         for model in models:
-            post_commit(send_notification_for_model, model)
+            post_save.connect(
+                receiver=schedule_notification_for_model,
+                sender=apps.get_model(model),
+                dispatch_uid="schedule_notification_for_model_{}".format(model),
+            )
@@ -1,59 +1,179 @@
 # -*- coding: utf-8 -*-
+"""
+Notifications about changed service (environment) of objects.
+
+Changes of objects saved in single transaction are collected and sent after
+it's committed as digests - single message for all objects moved between the
+same service environments, sent to owners of both services. All messages are
+sent through single connection to the mail server.
+
+When `NOTIFICATIONS_IN_BACKGROUND` is set, messages are sent by the internal
+service (RQ worker) instead of the web worker.
+"""
+
 import logging
+from collections import defaultdict
 from urllib.parse import urljoin
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 from django.template.loader import render_to_string
 from threadlocals.threadlocals import get_current_user
 
+from ralph.assets.models import ServiceEnvironment
+from ralph.lib.external_services.base import InternalService
 from ralph.lib.metrics import statsd
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATIONS_SERVICE_NAME = "NOTIFICATIONS"
+
+
+class NotificationsBatch(object):
+    """
+    Service changes of objects saved in single transaction (savepoint),
+    sent when it's committed.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        # (content type id, object id) -> (old service env id, new service env id)
+        self.changes = {}
+
+    def add(self, instance):
+        key = (ContentType.objects.get_for_model(instance).id, instance.pk)
+        old_service_env_id = self.changes.get(
+            key, (instance._previous_state["service_env_id"],)
+        )[0]
+        self.changes[key] = (old_service_env_id, instance.service_env_id)
+
+    def __call__(self):
+        notifications = [
+            [content_type_id, object_id, old_id, new_id]
+            for (content_type_id, object_id), (old_id, new_id) in self.changes.items()
+            if old_id and old_id != new_id
+        ]
+        if not notifications:
+            return
+        if settings.NOTIFICATIONS_IN_BACKGROUND:
+            InternalService(NOTIFICATIONS_SERVICE_NAME).run_async(
+                notifications=notifications, user_id=self.user_id
+            )
+        else:
+            send_service_change_notifications(notifications, self.user_id)
+
+
+def schedule_notification_for_model(sender, instance, raw=False, **kwargs):
+    """
+    Add instance to the batch of notifications sent after current transaction
+    (savepoint) is committed.
+    """
+    if raw:
+        return
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids)
+    for callback_savepoint_ids, callback, *_ in connection.run_on_commit:
+        if (
+            isinstance(callback, NotificationsBatch)
+            and callback_savepoint_ids == savepoint_ids
+        ):
+            callback.add(instance)
+            return
+    user = get_current_user()
+    batch = NotificationsBatch(getattr(user, "pk", None))
+    batch.add(instance)
+    transaction.on_commit(batch)
+
+
+def _get_objects(notifications):
+    object_ids = defaultdict(list)
+    for content_type_id, object_id, _, _ in notifications:
+        object_ids[content_type_id].append(object_id)
+    objects = {}
+    for content_type_id, ids in object_ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        for pk, obj in model._default_manager.in_bulk(ids).items():
+            objects[(content_type_id, pk)] = obj
+    return objects
+
+
+def _get_message(old_service_env, new_service_env, objects, user):
+    owners = []
+    for field in ["business_owners", "technical_owners"]:
+        owners.extend(getattr(old_service_env.service, field).all())
+        owners.extend(getattr(new_service_env.service, field).all())
+    emails = set([owner.email for owner in owners if owner.email])
+    if not emails:
+        return None
+    logger.info(
+        "Sending mail notification for {} objects".format(len(objects)),
+        extra={
+            "type": "SEND_MAIL_NOTIFICATION_FOR_MODEL",
+            "instance_ids": [obj.id for obj in objects],
+            "notification_type": "service_change",
+        },
+    )
+    objects_with_urls = [
+        (obj, urljoin(settings.RALPH_HOST_URL, obj.get_absolute_url()))
+        for obj in objects
+    ]
+    context = {
+        "old_service_env": old_service_env,
+        "new_service_env": new_service_env,
+        "objects": objects_with_urls,
+        "object": objects_with_urls[0][0],
+        "object_url": objects_with_urls[0][1],
+        "user": user,
+        "settings": settings,
+    }
+    html_content = render_to_string("notifications/html/message.html", context)
+    text_content = render_to_string("notifications/txt/message.txt", context)
+    if len(objects) == 1:
+        subject = "Device has been assigned to Service: {} ({})".format(
+            new_service_env.service, objects[0]
+        )
+    else:
+        subject = "{} devices have been assigned to Service: {}".format(
+            len(objects), new_service_env.service
+        )
+    msg = EmailMultiAlternatives(
+        subject, text_content, settings.EMAIL_FROM, list(emails)
+    )
+    msg.attach_alternative(html_content, "text/html")
+    return msg
+
 
 @statsd.timer("notification")
-def send_notification_for_model(instance):
-    ServiceEnvironment = instance._meta.get_field("service_env").related_model
-    old_service_env_id = instance._previous_state["service_env_id"]
-    new_service_env_id = instance.service_env_id
-    if old_service_env_id and old_service_env_id != new_service_env_id:
-        logger.info(
-            "Sending mail notification for {}".format(instance),
-            extra={
-                "type": "SEND_MAIL_NOTIFICATION_FOR_MODEL",
-                "instance_id": instance.id,
-                "content_type": instance.content_type.name,
-                "notification_type": "service_change",
-            },
+def send_service_change_notifications(notifications, user_id=None):
+    """
+    Send notifications about changed service environments of objects.
+
+    Args:
+        notifications: list of (content type id, object id, old service env id,
+            new service env id) lists.
+        user_id: id of the user who changed objects.
+    """
+    service_envs = (
+        ServiceEnvironment.objects.select_related("service")
+        .prefetch_related("service__business_owners", "service__technical_owners")
+        .in_bulk({pk for notification in notifications for pk in notification[2:]})
+    )
+    objects = _get_objects(notifications)
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    changes = defaultdict(list)
+    for content_type_id, object_id, old_id, new_id in notifications:
+        obj = objects.get((content_type_id, object_id))
+        if obj is not None and old_id in service_envs and new_id in service_envs:
+            changes[(old_id, new_id)].append(obj)
+    messages = []
+    for (old_id, new_id), changed_objects in changes.items():
+        msg = _get_message(
+            service_envs[old_id], service_envs[new_id], changed_objects, user
         )
-        old_service_env = ServiceEnvironment.objects.get(pk=old_service_env_id)
-        new_service_env = ServiceEnvironment.objects.get(pk=new_service_env_id)
-
-        owners = []
-        for field in ["business_owners", "technical_owners"]:
-            owners.extend(list(getattr(old_service_env.service, field).all()))
-            owners.extend(list(getattr(new_service_env.service, field).all()))
-
-        emails = set([owner.email for owner in owners if owner.email])
-        if emails:
-            context = {
-                "old_service_env": old_service_env,
-                "new_service_env": new_service_env,
-                "object": instance,
-                "user": get_current_user(),
-                "settings": settings,
-                "object_url": urljoin(
-                    settings.RALPH_HOST_URL, instance.get_absolute_url()
-                ),
-            }
-            html_content = render_to_string("notifications/html/message.html", context)
-            text_content = render_to_string("notifications/txt/message.txt", context)
-            subject = "Device has been assigned to Service: {} ({})".format(
-                new_service_env.service, instance
-            )
-            msg = EmailMultiAlternatives(
-                subject, text_content, settings.EMAIL_FROM, list(emails)
-            )
-            msg.attach_alternative(html_content, "text/html")
-            msg.send()
+        if msg:
+            messages.append(msg)
+    if messages:
+        get_connection().send_messages(messages)
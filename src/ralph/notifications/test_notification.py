@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 from django.core import mail
+from django.core.mail import get_connection
 from django.db import transaction
-from django.test import TransactionTestCase
+from django.test import override_settings, TransactionTestCase
+from mock import patch
 
 from ralph.accounts.tests.factories import UserFactory
 from ralph.assets.tests.factories import ServiceEnvironmentFactory, ServiceFactory
 from ralph.data_center.models import DataCenterAsset
 from ralph.data_center.tests.factories import DataCenterAssetFactory
+from ralph.notifications.sender import send_service_change_notifications
 
 
 class NotificationTest(TransactionTestCase):
@@ -34,3 +37,74 @@ class NotificationTest(TransactionTestCase):
             mail.outbox[0].subject,
         )
         self.assertCountEqual(mail.outbox[0].to, ["test1@test.pl", "test2@test.pl"])
+
+
+class BatchedNotificationTest(TransactionTestCase):
+    def setUp(self):
+        self.old_service = ServiceFactory(name="test")
+        self.old_service.business_owners.add(UserFactory(email="test1@test.pl"))
+        self.new_service = ServiceFactory(name="prod")
+        self.new_service.technical_owners.add(UserFactory(email="test2@test.pl"))
+        self.old_service_env = ServiceEnvironmentFactory(service=self.old_service)
+        self.new_service_env = ServiceEnvironmentFactory(service=self.new_service)
+        DataCenterAssetFactory.create_batch(3, service_env=self.old_service_env)
+        # fetch DCAs to start with clean state
+        self.dcas = list(DataCenterAsset.objects.order_by("pk"))
+
+    def _change_service_env(self, dcas, service_env):
+        for dca in dcas:
+            dca.service_env = service_env
+            dca.save()
+
+    def test_notifications_are_coalesced_in_transaction(self):
+        with patch(
+            "ralph.notifications.sender.get_connection", wraps=get_connection
+        ) as get_connection_mock:
+            with transaction.atomic():
+                self._change_service_env(self.dcas, self.new_service_env)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            mail.outbox[0].subject, "3 devices have been assigned to Service: prod"
+        )
+        self.assertCountEqual(mail.outbox[0].to, ["test1@test.pl", "test2@test.pl"])
+        for dca in self.dcas:
+            self.assertIn(dca.get_absolute_url(), mail.outbox[0].body)
+        self.assertEqual(get_connection_mock.call_count, 1)
+
+    def test_notification_per_service_change(self):
+        other_service_env = ServiceEnvironmentFactory(service=self.new_service)
+        with transaction.atomic():
+            self._change_service_env(self.dcas[:2], self.new_service_env)
+            self._change_service_env(self.dcas[2:], other_service_env)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertCountEqual(
+            [message.subject for message in mail.outbox],
+            [
+                "2 devices have been assigned to Service: prod",
+                "Device has been assigned to Service: prod ({})".format(self.dcas[2]),
+            ],
+        )
+
+    def test_notification_is_not_sent_when_transaction_is_rolled_back(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self._change_service_env(self.dcas, self.new_service_env)
+                raise ValueError()
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_notification_is_not_sent_when_service_env_is_restored(self):
+        with transaction.atomic():
+            self._change_service_env(self.dcas[:1], self.new_service_env)
+            self._change_service_env(self.dcas[:1], self.old_service_env)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(NOTIFICATIONS_IN_BACKGROUND=True)
+    @patch("ralph.notifications.sender.InternalService")
+    def test_notifications_are_sent_in_background(self, internal_service_mock):
+        with transaction.atomic():
+            self._change_service_env(self.dcas, self.new_service_env)
+        self.assertEqual(len(mail.outbox), 0)
+        run_async_mock = internal_service_mock.return_value.run_async
+        run_async_mock.assert_called_once()
+        send_service_change_notifications(**run_async_mock.call_args[1])
+        self.assertEqual(len(mail.outbox), 1)
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import csv
+import io
+
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 
@@ -31,7 +34,7 @@ from ralph.supports.models import BaseObjectsSupport
 from ralph.supports.tests.factories import SupportFactory
 from ralph.tests import RalphTestCase
 from ralph.tests.factories import UserFactory
-from ralph.tests.mixins import ClientMixin
+from ralph.tests.mixins import ClientMixin, TemporaryMediaRootMixin
 
 
 class TestReportCategoryTreeView(ClientMixin, RalphTestCase):
@@ -166,7 +169,7 @@ class TestReportCategoryTreeView(ClientMixin, RalphTestCase):
         self.assertEqual(item[0]["count"], 3)
 
 
-class TestReportAssetAndLicence(RalphTestCase):
+class TestReportAssetAndLicence(ClientMixin, RalphTestCase):
     def setUp(self):
         self.model = DataCenterAssetModelFactory(
             category=CategoryFactory(name="Keyboard"),
@@ -240,6 +243,34 @@ class TestReportAssetAndLicence(RalphTestCase):
         with self.assertNumQueries(3):
             list(licence_relation.prepare(BackOfficeAsset))
 
+    def test_asset_relation_in_chunks(self):
+        dc_2 = DataCenterAssetFactory(model=self.model)
+        dc_3 = DataCenterAssetFactory(model=self.model)
+        asset_relation = AssetRelationsReport()
+        asset_relation.chunk_size = 2
+        # 2 chunks, each with tags prefetched
+        with self.assertNumQueries(4):
+            report_result = list(asset_relation.prepare(DataCenterAsset))
+        self.assertEqual(
+            [row[0] for row in report_result[1:]],
+            [str(self.dc_1.id), str(dc_2.id), str(dc_3.id)],
+        )
+        self.assertEqual(report_result[1][-1], "tag1,tag2")
+
+    def test_csv_report_is_streamed(self):
+        self.login_as_user()
+        response = self.client.get(
+            reverse("asset-relations"), {"csv": 1, "asset_type": "dc"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(
+            csv.reader(
+                io.StringIO(b"".join(response.streaming_content).decode("utf-8"))
+            )
+        )
+        self.assertEqual(rows, list(AssetRelationsReport().prepare(DataCenterAsset)))
+
     def test_licence_relation(self):
         licence_relation = LicenceRelationsReport()
         report_result = list(licence_relation.prepare(DataCenterAsset))
@@ -320,7 +351,7 @@ class TestReportAssetAndLicence(RalphTestCase):
         self.assertEqual(report_result, result)
 
 
-class TestAssetsSupportsReport(RalphTestCase):
+class TestAssetsSupportsReport(TemporaryMediaRootMixin, RalphTestCase):
     def setUp(self):
         self.dc_1 = DataCenterAssetFactory()
         self.dc_2 = DataCenterAssetFactory()
@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
+import csv
 import logging
 
-import tablib
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Count, Prefetch
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 from django.utils.encoding import smart_str
 from django.utils.translation import gettext_lazy as _
@@ -15,6 +15,7 @@ from ralph.admin.mixins import RalphTemplateView
 from ralph.assets.models.assets import Asset, AssetModel
 from ralph.assets.models.choices import ObjectModelType
 from ralph.back_office.models import BackOfficeAsset
+from ralph.helpers import iterate_in_chunks
 from ralph.data_center.models.physical import DataCenter, DataCenterAsset
 from ralph.licences.models import BaseObjectLicence, Licence, LicenceUser
 from ralph.operations.models import Failure, OperationType
@@ -35,24 +36,40 @@ def get_choice_name(choices_class, key, default="------"):
         return "Does not exist for key {}".format(key)
 
 
+class Echo(object):
+    """File-like object returning written value instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
 class CSVReportMixin(object):
     """CSV report mixin.
 
     Adding the required method get_resposne
     """
 
+    # number of objects fetched from the database at once
+    chunk_size = 1000
+
     def get_response(self, request, result):
         """Get django response method.
 
+        Rows are consumed lazily and streamed to the client, so the whole
+        report is never kept in memory.
+
         Args:
             request: Django request object
-            result: data list
+            result: iterable of rows (first one is a header)
 
         Returns:
             Django response object
         """
-        data = tablib.Dataset(*result[1:], headers=result[0])
-        response = HttpResponse(data.csv, content_type="text/csv;charset=utf-8")
+        writer = csv.writer(Echo())
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in result),
+            content_type="text/csv;charset=utf-8",
+        )
         response["Content-Disposition"] = "attachment;filename={}".format(self.filename)
         return response
 
@@ -130,7 +147,7 @@ class ReportDetail(RalphTemplateView):
         return [self.template_name]
 
     def get_result(self, request, model, *args, **kwargs):
-        return list(self.prepare(model, *args, **kwargs))
+        return self.prepare(model, *args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
         try:
@@ -393,7 +410,9 @@ class AssetRelationsReport(BaseRelationsReport):
             select_related = self.dc_select_related
 
         yield headers + self.extra_headers
-        for asset in queryset.select_related(*select_related):
+        for asset in iterate_in_chunks(
+            queryset.select_related(*select_related), self.chunk_size
+        ):
             row = [str(getattr_dunder(asset, column)) for column in headers]
             row += self.get_extra_columns(asset)
             yield row
@@ -489,7 +508,9 @@ class AssetSupportsReport(BaseRelationsReport):
             )
 
         yield headers + self.extra_headers
-        for bos in queryset.select_related(*select_related):
+        for bos in iterate_in_chunks(
+            queryset.select_related(*select_related), self.chunk_size
+        ):
             row = [str(getattr_dunder(bos, column)) for column in headers]
             row += self.get_extra_columns(bos)
             yield row
@@ -609,7 +630,7 @@ class LicenceRelationsReport(BaseRelationsReport):
             ),
         )
 
-        for licence in queryset:
+        for licence in iterate_in_chunks(queryset, self.chunk_size):
             row = [
                 smart_str(getattr_dunder(licence, column))
                 for column in self.licences_headers
@@ -5,6 +5,7 @@ from ralph.settings import (
     REDIS_CONNECTION,
     INSTALLED_APPS,
     HERMES,
+    LOGGING,
     RQ_QUEUES,
     RALPH_INTERNAL_SERVICES,
 )
@@ -46,6 +47,13 @@ ROOT_URLCONF = "ralph.urls.test"
 # see `ralph.tests.mixins.ReloadUrlsMixin` for details
 URLCONF_MODULES = ["ralph.urls.base", ROOT_URLCONF]
 
+# results of benchmarks (see `ralph.tests.benchmarks`)
+LOGGING["loggers"]["ralph.benchmarks"] = {
+    "handlers": ["console"],
+    "level": "INFO",
+    "propagate": False,
+}
+
 # Uncomment lines below if you want some additional output from loggers
 # during tests.
 # LOGGING['loggers']['ralph'].update(
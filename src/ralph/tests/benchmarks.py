@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers of (opt-in) benchmarks.
+
+Benchmarks are slow, so they are skipped unless `RUN_BENCHMARKS` env is set.
+Results are logged by `ralph.benchmarks` logger (to console in tests) - compare
+them with numbers recorded in the commit message of the benchmarked change
+(measured before and after it, on the same machine and database).
+"""
+
+import logging
+import os
+import time
+import tracemalloc
+import unittest
+from contextlib import contextmanager, ExitStack
+
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger("ralph.benchmarks")
+
+RUN_BENCHMARKS = os.environ.get("RUN_BENCHMARKS", False)
+
+benchmark = unittest.skipUnless(
+    RUN_BENCHMARKS, "Set RUN_BENCHMARKS=1 env to run benchmarks"
+)
+
+
+@contextmanager
+def measure(name, scale=1, queries=False, memory=False, using=DEFAULT_DB_ALIAS):
+    """
+    Measure time of the block and log it as the result of `name` benchmark.
+
+    When `queries` is set, number of database queries (run in `using`
+    connection) is logged too, when `memory` is set - peak of memory
+    allocated in the block. Time and number of queries are multiplied by
+    `scale` (ex. 1 / repeat, to log single run of repeated block).
+    """
+    with ExitStack() as stack:
+        if queries:
+            captured = stack.enter_context(CaptureQueriesContext(connections[using]))
+        if memory:
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+        start = time.perf_counter()
+        yield
+        results = ["{:.3g}s".format((time.perf_counter() - start) * scale)]
+        if queries:
+            results.append("{} queries".format(int(len(captured) * scale)))
+        if memory:
+            _, peak = tracemalloc.get_traced_memory()
+            results.append("peak memory {:.1f} MiB".format(peak / 2**20))
+    logger.info("%s: %s", name, ", ".join(results))
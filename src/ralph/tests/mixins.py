@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
+import shutil
 import sys
+import tempfile
 from importlib import import_module, reload
 
 from django.conf import settings
+from django.test import override_settings
 from django.urls import clear_url_caches
 
 from ralph.tests.factories import UserFactory
@@ -19,6 +22,23 @@ class ClientMixin(object):
         return self.client.login(username=user.username, password=password)
 
 
+class TemporaryMediaRootMixin(object):
+    """
+    Use this mixin to store files (ex. attachments) saved in tests in
+    temporary directory (removed after tests of the class) instead of
+    MEDIA_ROOT.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_root_override = override_settings(MEDIA_ROOT=media_root)
+        media_root_override.enable()
+        cls.addClassCleanup(media_root_override.disable)
+        super().setUpClass()
+
+
 class ReloadUrlsMixin(object):
     """
     Use this mixin if you register dynamically models to admin.
@@ -10,6 +10,7 @@ from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.core.management.base import BaseCommand
 from django.db import IntegrityError, transaction
 from reversion import revisions
+from taggit.models import Tag
 
 from ralph.data_center.models.physical import DataCenterAsset
 from ralph.lib.openstack.client import (
@@ -29,12 +30,17 @@ class SynchronizationType(Enum):
 
 
 class RalphClient:
+    # number of new hosts saved in a single transaction (and revision) in bulk
+    # mode
+    bulk_batch_size = 500
+
     def __init__(
         self,
         openstack_provider_name,
         ironic_serial_number_param,
         ralph_serial_number_param,
         changes_since=None,
+        bulk=False,
     ):
         self.cloud_provider = self._get_or_create_cloud_provider(
             openstack_provider_name
@@ -43,6 +49,7 @@ class RalphClient:
         self.ironic_serial_number_param = ironic_serial_number_param
         self.ralph_serial_number_param = ralph_serial_number_param
         self.DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+        self.bulk = bulk
         self.summary = defaultdict(int)
         if changes_since:
             self.summary["sync_type"] = SynchronizationType.INCREMENTAL.name
@@ -326,6 +333,195 @@ class RalphClient:
                     self.summary["mod_instances"] += 1
             self.summary["total_instances"] += 1
 
+    def _preload_bulk_data(self, openstack_projects):
+        """
+        Fetch projects, hosts and hypervisors required to reconcile servers
+        in bulk mode (flavors are fetched by `_get_flavor_objects`).
+        """
+        self._projects = {}
+        for project in CloudProject.objects.filter(project_id__in=openstack_projects):
+            # workaround for projects with the same id in multiple providers
+            if (
+                project.project_id in self._projects
+                and project.cloudprovider_id != self.cloud_provider.id
+            ):
+                continue
+            self._projects[project.project_id] = project
+
+        self._hosts = {
+            host.host_id: host
+            for host in CloudHost.objects.filter(
+                cloudprovider=self.cloud_provider
+            ).select_related("parent")
+        }
+
+        hypervisor_names = {
+            server["hypervisor"]
+            for project in openstack_projects.values()
+            for server in project["servers"].values()
+        }
+        self._hypervisors = {}
+        duplicated_hypervisors = set()
+        for asset in DataCenterAsset.objects.filter(hostname__in=hypervisor_names):
+            if asset.hostname in self._hypervisors:
+                duplicated_hypervisors.add(asset.hostname)
+            self._hypervisors[asset.hostname] = asset
+        for hostname in duplicated_hypervisors:
+            self._hypervisors[hostname] = None
+
+    def _get_preloaded_hypervisor(self, host_name, server_id):
+        """get or None for CloudHost hypervisor (bulk mode)"""
+        hypervisor = self._hypervisors.get(host_name)
+        if hypervisor is None:
+            logger.warning("Hypervisor %s not found for %s", host_name, server_id)
+        return hypervisor
+
+    @staticmethod
+    def _get_server_changes(obj, openstack_server, project, flavor, hypervisor):
+        """Return changed fields of a CloudHost (field attname: new value)"""
+        expected = {
+            "hostname": openstack_server["hostname"],
+            "cloudflavor_id": flavor.pk,
+            "hypervisor_id": hypervisor.pk if hypervisor else None,
+            "image_name": openstack_server["image"],
+            "parent_id": project.pk,
+        }
+        return {
+            field: value
+            for field, value in expected.items()
+            if getattr(obj, field) != value
+        }
+
+    def _bulk_update_server(
+        self, obj, openstack_server, ralph_server, project, flavor, hypervisor
+    ):
+        """
+        Apply all changes of a CloudHost with a single save and revision.
+        """
+        changes = self._get_server_changes(
+            obj, openstack_server, project, flavor, hypervisor
+        )
+        add_tag = openstack_server["tag"] not in ralph_server["tags"]
+        ips_changed = openstack_server["ips"] != ralph_server["ips"]
+        if not (changes or add_tag or ips_changed):
+            return False
+
+        # changes are keyed by attnames (ex. cloudflavor_id)
+        modified_fields = [obj._meta.get_field(field).name for field in changes]
+        if ips_changed:
+            modified_fields.append("ip addresses")
+        with transaction.atomic(), revisions.create_revision():
+            if changes:
+                logger.info("Updating %s for %s", changes, obj.host_id)
+                for field, value in changes.items():
+                    setattr(obj, field, value)
+                obj.save()
+            if add_tag:
+                obj.tags.add(openstack_server["tag"])
+            if ips_changed:
+                obj.ip_addresses = openstack_server["ips"]
+            revisions.set_comment("Modify {}".format(", ".join(modified_fields)))
+        return bool(modified_fields)
+
+    def _bulk_add_tags(self, objects_tags):
+        """Tag objects (list of (object, tag name) pairs) at once"""
+        tags = {
+            name: Tag.objects.get_or_create(name=name)[0]
+            for name in {name for _, name in objects_tags}
+        }
+        through = CloudHost.tags.through
+        through.objects.bulk_create(
+            [
+                through(tag=tags[name], **through.lookup_kwargs(obj))
+                for obj, name in objects_tags
+            ]
+        )
+
+    def _bulk_add_servers(self, new_servers):
+        """
+        Add new servers (list of (openstack server, server id, project,
+        flavor, hypervisor) tuples) in batches - every batch is saved in
+        a single transaction and revision.
+        """
+        for start in range(0, len(new_servers), self.bulk_batch_size):
+            batch = new_servers[start : start + self.bulk_batch_size]
+            hosts_tags = []
+            hosts_ips = []
+            with transaction.atomic(), revisions.create_revision():
+                for openstack_server, server_id, project, flavor, hypervisor in batch:
+                    logger.info(
+                        "Creating new server %s (%s)",
+                        server_id,
+                        openstack_server["hostname"],
+                    )
+                    new_server = CloudHost(
+                        hostname=openstack_server["hostname"],
+                        cloudflavor=flavor,
+                        parent=project,
+                        host_id=server_id,
+                        hypervisor=hypervisor,
+                        cloudprovider=self.cloud_provider,
+                        image_name=openstack_server["image"],
+                    )
+                    new_server.save()
+                    # workaround - created field has auto_now_add attribute
+                    new_server.created = datetime.strptime(
+                        openstack_server["created"], self.DATETIME_FORMAT
+                    )
+                    new_server.save(update_fields=["created"])
+                    hosts_tags.append((new_server, openstack_server["tag"]))
+                    hosts_ips.append((new_server, openstack_server["ips"]))
+                self._bulk_add_tags(hosts_tags)
+                CloudHost.assign_ip_addresses(hosts_ips)
+                revisions.set_comment("Add {} servers".format(len(batch)))
+            self.summary["new_instances"] += len(batch)
+
+    def _bulk_add_or_update_servers(self, openstack_projects, ralph_projects):
+        """
+        Add/modify servers of all projects using data fetched upfront instead
+        of querying for every server.
+        """
+        self._preload_bulk_data(openstack_projects)
+        flavors = self._get_flavor_objects()
+        ralph_servers = {
+            server_id: server
+            for project in ralph_projects.values()
+            for server_id, server in project["servers"].items()
+        }
+        new_servers = []
+        for project_id, openstack_project in openstack_projects.items():
+            for server_id, server in openstack_project["servers"].items():
+                # servers with DELETED status are removed by `_delete_servers`
+                if server["status"] == "DELETED":
+                    continue
+                self.summary["total_instances"] += 1
+                project = self._projects.get(project_id)
+                if project is None:
+                    logger.warning(
+                        "Unable to assign project id of %s for host %s.",
+                        project_id,
+                        server,
+                    )
+                    continue
+                try:
+                    flavor = flavors[server["flavor_id"]]
+                except KeyError:
+                    logger.warning(
+                        "Flavor %s not found for host %s", server["flavor_id"], server
+                    )
+                    continue
+                hypervisor = self._get_preloaded_hypervisor(
+                    server["hypervisor"], server_id
+                )
+                obj = self._hosts.get(server_id)
+                if obj is None:
+                    new_servers.append((server, server_id, project, flavor, hypervisor))
+                elif self._bulk_update_server(
+                    obj, server, ralph_servers[server_id], project, flavor, hypervisor
+                ):
+                    self.summary["mod_instances"] += 1
+        self._bulk_add_servers(new_servers)
+
     def _calculate_servers_to_delete(
         self, openstack_project_servers, openstack_project_id, ralph_projects
     ):
@@ -439,6 +635,14 @@ class RalphClient:
                 openstack_flavors[flavor_id], flavor_id, ralph_flavors
             )
 
+        if self.bulk:
+            for project_id in openstack_projects:
+                self._add_or_update_projects(
+                    openstack_projects[project_id], project_id, ralph_projects
+                )
+            self._bulk_add_or_update_servers(openstack_projects, ralph_projects)
+            return
+
         for project_id in openstack_projects:
             self._add_or_update_projects(
                 openstack_projects[project_id], project_id, ralph_projects
@@ -614,6 +818,12 @@ class Command(BaseCommand):
             help="Synchronize only most recent changes. Specify number of "
             "minutes to go back in time. 0 means synchronize everything.",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Reconcile servers in bulk (fetch Ralph data upfront, save "
+            "every changed host once and add new hosts in batches)",
+        )
 
     def handle(self, *args, **options):
         try:
@@ -626,6 +836,7 @@ class Command(BaseCommand):
             ironic_serial_number_param = options["node_serial_number_parameter"]
             ralph_serial_number_param = options["asset_serial_number_parameter"]
             changes_since = options["changes_since"]
+            bulk = options["bulk"]
             openstack_search_options = None
             if changes_since:
                 openstack_search_options = {
@@ -648,6 +859,7 @@ class Command(BaseCommand):
                 ironic_serial_number_param,
                 ralph_serial_number_param,
                 changes_since,
+                bulk,
             )
             ralph_projects = ralph.get_ralph_projects()
             ralph_flavors = ralph.get_ralph_flavors()
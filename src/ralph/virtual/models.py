@@ -242,48 +242,66 @@ class CloudHost(
     def ip_addresses(self, value):
         # value is a list (of ips) or dict (of ip:hostname pairs)
         # when value is a dict, set will work on keys only
-        for ip in set(value) - set(self.ip_addresses):
-            try:
-                new_ip = IPAddress.objects.get(address=ip)
-                if new_ip.base_object is None:
-                    new_ip.base_object = self
-                    new_ip.save()
-                else:
+        self.assign_ip_addresses([(self, value)])
+
+        to_delete = set(self.ip_addresses) - set(value)
+        for ip in to_delete:
+            logger.warning("Deleting %s from %s", ip, self)
+        Ethernet.objects.filter(
+            base_object=self, ipaddress__address__in=to_delete
+        ).delete()
+
+    @classmethod
+    def assign_ip_addresses(cls, hosts_ips):
+        """
+        Assign IP addresses to cloud hosts (list of (host, ips) pairs), fetching
+        already existing IP addresses with a single query.
+
+        Ips is a list (of ips) or dict (of ip:hostname pairs) - when it's
+        a dict, hostnames of IP addresses are refreshed too. IP address used by
+        another asset is not reassigned, missing one is created (with new
+        ethernet of the host). IP addresses of the host missing in ips are
+        not removed.
+        """
+        existing_ips = {
+            ip.address: ip
+            for ip in IPAddress.objects.filter(
+                address__in={address for _, ips in hosts_ips for address in ips}
+            ).select_related("ethernet")
+        }
+        for host, ips in hosts_ips:
+            for address in ips:
+                ip = existing_ips.get(address)
+                changed = False
+                if ip is None:
+                    logger.info("Creating new IP {} for {}".format(address, host))
+                    ip = existing_ips[address] = IPAddress(
+                        ethernet=Ethernet.objects.create(base_object=host),
+                        address=address,
+                    )
+                    changed = True
+                elif ip.ethernet is None or ip.ethernet.base_object_id is None:
+                    ip.base_object = host
+                    changed = True
+                elif ip.ethernet.base_object_id != host.pk:
                     logger.warning(
                         "Cannot assign IP %s to %s - it is already in use by "
                         "another asset",
-                        ip,
-                        self.hostname,
+                        address,
+                        host.hostname,
                     )
-            except ObjectDoesNotExist:
-                logger.info("Creating new IP {} for {}".format(ip, self))
-                new_ip = IPAddress(
-                    ethernet=Ethernet.objects.create(base_object=self), address=ip
-                )
-                new_ip.save()
-        # refresh hostnames
-        if isinstance(value, dict):
-            for address, hostname in value.items():
-                try:
-                    ip = IPAddress.objects.get(address=address)
-                except IPAddress.DoesNotExist:
-                    logger.debug("IP {} not found".format(address))
-                else:
-                    if ip.hostname != hostname:
+                # refresh hostnames
+                if isinstance(ips, dict) and ip.hostname != ips[address]:
+                    if ip.pk:
                         logger.info(
                             "Setting {} for IP {} (previous value: {})".format(
-                                hostname, address, ip.hostname
+                                ips[address], address, ip.hostname
                             )
                         )
-                        ip.hostname = hostname
-                        ip.save()
-
-        to_delete = set(self.ip_addresses) - set(value)
-        for ip in to_delete:
-            logger.warning("Deleting %s from %s", ip, self)
-        Ethernet.objects.filter(
-            base_object=self, ipaddress__address__in=to_delete
-        ).delete()
+                    ip.hostname = ips[address]
+                    changed = True
+                if changed:
+                    ip.save()
 
     @property
     def cloudproject(self):
@@ -158,6 +158,22 @@ class OpenstackModelsTestCase(RalphTestCase):
         )
         self.assertEqual(set(self.cloud_host.ip_addresses), set(ip_addresses2))
 
+    def test_assign_ip_addresses_to_many_hosts(self):
+        other_host = CloudHostFactory(parent=self.cloud_project)
+        self.cloud_host.ip_addresses = ["10.0.0.1"]
+        CloudHost.assign_ip_addresses(
+            [
+                (other_host, {"10.0.0.1": "used.mydc.net", "10.0.0.2": "a.mydc.net"}),
+                (self.cloud_host, ["10.0.0.3"]),
+            ]
+        )
+        self.assertEqual(set(other_host.ip_addresses), {"10.0.0.2"})
+        # IP used by another host is not reassigned, assigned IPs are kept
+        self.assertEqual(set(self.cloud_host.ip_addresses), {"10.0.0.1", "10.0.0.3"})
+        self.assertEqual(
+            IPAddress.objects.get(address="10.0.0.2").hostname, "a.mydc.net"
+        )
+
     def test_service_env_inheritance_on_project_change(self):
         self.cloud_project.service_env = self.service_env[0]
         self.cloud_project.save()
@@ -5,6 +5,7 @@ from datetime import datetime
 import mock
 from django.core.exceptions import ObjectDoesNotExist
 from django.test.utils import override_settings
+from reversion.models import Version
 
 from ralph.assets.models.components import ComponentModel
 from ralph.assets.tests.factories import DataCenterAssetModelFactory
@@ -159,6 +160,93 @@ class TestOpenstackSync(RalphTestCase):
                 self.assertIn(host["tag"], ralph_host.tags.names())
                 self.assertEqual(set(host["ips"]), set(ips))
 
+    def test_check_ralph_update_bulk(self):
+        self.ralph_client.bulk = True
+        self.test_check_ralph_update()
+        host = CloudHost.objects.get(host_id="host_os_1")
+        self.assertEqual(
+            host.created,
+            datetime.strptime(
+                OPENSTACK_DATA["project_os_id1"]["servers"]["host_os_1"]["created"],
+                self.ralph_client.DATETIME_FORMAT,
+            ),
+        )
+
+    def test_check_process_servers_bulk(self):
+        ralph_projects = self.ralph_client.get_ralph_servers_data(
+            self.ralph_client.get_ralph_projects()
+        )
+        self.ralph_client._bulk_add_or_update_servers(
+            {self.cloud_project_1.project_id: {"servers": OPENSTACK_INSTANCES}},
+            ralph_projects,
+        )
+        for host_id, test_host in OPENSTACK_INSTANCES.items():
+            if test_host["status"] == "DELETED":
+                self.assertFalse(CloudHost.objects.filter(host_id=host_id).exists())
+                continue
+            host = CloudHost.objects.get(host_id=host_id)
+            self.assertEqual(host.hostname, test_host["hostname"])
+            self.assertEqual(host.image_name, test_host["image"])
+            self.assertEqual(host.parent_id, self.cloud_project_1.pk)
+            self.assertIn(test_host["tag"], host.tags.names())
+            self.assertEqual(set(host.ip_addresses), set(test_host["ips"]))
+            self.assertEqual(host.hypervisor.hostname, test_host["hypervisor"])
+        self.assertEqual(self.ralph_client.summary["new_instances"], 2)
+        self.assertEqual(self.ralph_client.summary["mod_instances"], 1)
+
+    def test_bulk_update_server_saves_all_changes_in_single_revision(self):
+        # flavors are assigned by factory in order depending on other tests
+        self.host.cloudflavor = CloudFlavor.objects.exclude(
+            flavor_id=OPENSTACK_INSTANCES["host_id1"]["flavor_id"]
+        ).first()
+        self.host.save()
+        versions_count = Version.objects.get_for_object(self.host).count()
+        ralph_projects = self.ralph_client.get_ralph_servers_data(
+            self.ralph_client.get_ralph_projects()
+        )
+        self.ralph_client._bulk_add_or_update_servers(
+            {
+                self.cloud_project_2.project_id: {
+                    "servers": {"host_id1": OPENSTACK_INSTANCES["host_id1"]}
+                }
+            },
+            ralph_projects,
+        )
+        versions = Version.objects.get_for_object(self.host)
+        self.assertEqual(versions.count(), versions_count + 1)
+        self.assertEqual(
+            versions[0].revision.comment,
+            "Modify hostname, cloudflavor, hypervisor, image_name, parent, "
+            "ip addresses",
+        )
+        self.host.refresh_from_db()
+        self.assertEqual(self.host.parent_id, self.cloud_project_2.pk)
+
+    def test_bulk_update_server_skips_unchanged_host(self):
+        ralph_projects = self.ralph_client.get_ralph_servers_data(
+            self.ralph_client.get_ralph_projects()
+        )
+        openstack_server = {
+            "hostname": self.host.hostname,
+            "hypervisor": None,
+            "flavor_id": self.host.cloudflavor.flavor_id,
+            "tag": "tag1",
+            "ips": ralph_projects["project_id1"]["servers"]["host_id1"]["ips"],
+            "image": self.host.image_name,
+            "status": "ACTIVE",
+        }
+        self.host.tags.add("tag1")
+        ralph_projects = self.ralph_client.get_ralph_servers_data(
+            self.ralph_client.get_ralph_projects()
+        )
+        with mock.patch.object(CloudHost, "save") as save_mock:
+            self.ralph_client._bulk_add_or_update_servers(
+                {"project_id1": {"servers": {"host_id1": openstack_server}}},
+                ralph_projects,
+            )
+        self.assertFalse(save_mock.called)
+        self.assertEqual(self.ralph_client.summary["mod_instances"], 0)
+
     def test_check_ralph_delete(self):
         ralph_projects = self.ralph_client.get_ralph_servers_data(
             self.ralph_client.get_ralph_projects()